@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Historical backtest runner for Models A-D and the starter logistic model.
+
+Replays every model week by week over whole seasons of nflverse play-by-play,
+using only information available before kickoff:
+- Team EPA for week k is accumulated from weeks < k of the same season.
+- The starter logistic model is trained on the previous season only, and its
+  rolling features are built from prior games (shift(1)).
+- Lines and final scores come from the PBP file itself (spread_line, total_line,
+  home_score, away_score), so no separate schedule download is needed.
+
+Seasons are processed in parallel with a process pool (one season per worker).
+The parent resolves every PBP file through the cache before the pool starts, so
+workers only read parquet files and never touch the cache manifest. All
+predictions land in one long parquet table:
+
+    season, week, game_id, away_team, home_team, favorite_team, underdog_team,
+    spread, total_line, model, prediction, predicted_cover, confidence,
+    cover_prob, underdog_margin, underdog_covered, push, hit
+
+`hit` is 1/0 when the model picked a side and the game did not push, NaN otherwise.
+
+Usage:
+    python3 models/backtest_runner.py                       # every cached season
+    python3 models/backtest_runner.py --seasons 2018-2024 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(MODELS_DIR)
+sys.path.append(MODELS_DIR)
+sys.path.append(os.path.join(REPO_ROOT, "scripts"))
+
+from model_engine import build_slate, run_models
+from pbp_cache import get_pbp_cache, read_pbp_files
+
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "data", "backtest_results.parquet")
+DEFAULT_MODELS = ["A", "B", "C", "D"]
+
+BACKTEST_PBP_COLUMNS = [
+    "game_id", "season", "week", "season_type", "game_date",
+    "home_team", "away_team", "home_score", "away_score", "spread_line", "total_line",
+    "posteam", "defteam", "epa", "pass", "rush",
+]
+
+RESULT_COLUMNS = [
+    "season", "week", "game_id", "away_team", "home_team", "favorite_team", "underdog_team",
+    "spread", "total_line", "model", "prediction", "predicted_cover", "confidence",
+    "cover_prob", "underdog_margin", "underdog_covered", "push", "hit",
+]
+
+
+# -----------------------------
+# Season data
+# -----------------------------
+
+def season_games(pbp: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per game with lines, final score and favorite/underdog sides.
+
+    nflverse spread_line is positive when the home team is favored; the slate
+    uses the favorite-perspective line (negative) like schedule/week*_odds.csv.
+    """
+    games = (
+        pbp.groupby("game_id")
+           .agg(
+               season=("season", "first"),
+               week=("week", "first"),
+               game_date=("game_date", "first"),
+               home_team=("home_team", "first"),
+               away_team=("away_team", "first"),
+               home_score=("home_score", "max"),
+               away_score=("away_score", "max"),
+               nflverse_spread=("spread_line", "first"),
+               total_line=("total_line", "first"),
+           )
+           .reset_index()
+           .dropna(subset=["nflverse_spread", "home_score", "away_score"])
+    )
+    home_fav = games["nflverse_spread"] >= 0
+    games["favorite_team"] = np.where(home_fav, games["home_team"], games["away_team"])
+    games["underdog_team"] = np.where(home_fav, games["away_team"], games["home_team"])
+    games["spread_line"] = -games["nflverse_spread"].abs()
+
+    fav_score = np.where(home_fav, games["home_score"], games["away_score"])
+    dog_score = np.where(home_fav, games["away_score"], games["home_score"])
+    games["underdog_margin"] = dog_score - fav_score
+    ats = games["underdog_margin"] + games["spread_line"].abs()
+    games["underdog_covered"] = (ats > 0).astype(int)
+    games["push"] = (ats == 0).astype(int)
+    return games.sort_values(["week", "game_id"]).reset_index(drop=True)
+
+
+def team_epa_before_week(pbp: pd.DataFrame) -> pd.DataFrame:
+    """
+    Team EPA per play accumulated over all weeks strictly before each week.
+
+    Returns one row per (team, week) with the model_engine EPA columns
+    (overall, pass and rush; offense and defense allowed). Uses pass/rush plays
+    with a recorded EPA.
+    """
+    plays = pbp[pbp["epa"].notna() & ((pbp["pass"] == 1) | (pbp["rush"] == 1))].copy()
+    plays["pass_play"] = (plays["pass"] == 1).astype(int)
+    plays["rush_play"] = (plays["rush"] == 1).astype(int)
+    plays["pass_epa"] = plays["epa"].where(plays["pass_play"] == 1, 0.0)
+    plays["rush_epa"] = plays["epa"].where(plays["rush_play"] == 1, 0.0)
+
+    weeks = np.sort(pbp["week"].unique())
+    sums = ["epa", "pass_epa", "rush_epa", "pass_play", "rush_play"]
+
+    def cumulative(side: str) -> pd.DataFrame:
+        agg = plays.groupby([side, "week"])[sums].sum()
+        agg["plays"] = plays.groupby([side, "week"]).size()
+        teams = agg.index.get_level_values(0).unique()
+        grid = pd.MultiIndex.from_product([teams, weeks], names=["team", "week"])
+        agg = agg.rename_axis(["team", "week"]).reindex(grid, fill_value=0)
+        # Inclusive cumsum, then shift one week so week k only sees weeks < k
+        return agg.groupby(level="team").cumsum().groupby(level="team").shift(1)
+
+    off = cumulative("posteam")
+    deff = cumulative("defteam")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = pd.DataFrame({
+            "epa_off_per_play": off["epa"] / off["plays"],
+            "epa_pass_off": off["pass_epa"] / off["pass_play"],
+            "epa_rush_off": off["rush_epa"] / off["rush_play"],
+            "epa_def_allowed_per_play": deff["epa"] / deff["plays"],
+            "epa_pass_def_allowed": deff["pass_epa"] / deff["pass_play"],
+            "epa_rush_def_allowed": deff["rush_epa"] / deff["rush_play"],
+        })
+    return out.replace([np.inf, -np.inf], np.nan).reset_index()
+
+
+def _long_results(scored: pd.DataFrame, models: List[str]) -> pd.DataFrame:
+    blocks = []
+    for name in models:
+        prefix = f"model_{name.lower()}_"
+        block = scored[[
+            "season", "week", "game_id", "away_team", "home_team", "favorite_team", "underdog_team",
+            "spread", "total_line", "underdog_margin", "underdog_covered", "push",
+        ]].copy()
+        block["model"] = name
+        for col in ("prediction", "predicted_cover", "confidence", "cover_prob"):
+            block[col] = scored[prefix + col].to_numpy()
+        blocks.append(block)
+    return pd.concat(blocks, ignore_index=True)
+
+
+# -----------------------------
+# Starter logistic model
+# -----------------------------
+
+def _starter_predictions(season: int, games: pd.DataFrame, paths: Dict[int, str]) -> Optional[pd.DataFrame]:
+    """Train the starter logistic model on season-1 and predict underdog covers for `season`."""
+    from sklearn.linear_model import LogisticRegression
+
+    from nfl_cover_model_starter import (
+        PBP_COLUMNS,
+        add_rolling_features,
+        build_team_game_rows,
+        is_rolling_feature,
+        join_schedule,
+    )
+
+    prior = season - 1
+    if prior not in paths:
+        print(f"  {season}: no {prior} PBP cached; skipping starter model")
+        return None
+
+    columns = sorted(set(PBP_COLUMNS) | set(BACKTEST_PBP_COLUMNS))
+    pbp = read_pbp_files({prior: paths[prior], season: paths[season]}, columns=columns, filters={"season_type": "REG"})
+    sched = season_games(pbp)
+    # join_schedule expects the home-team line with negative = favored
+    sched = sched.assign(spread_line=-sched["nflverse_spread"], game_date=pd.to_datetime(sched["game_date"]))
+    df = add_rolling_features(join_schedule(build_team_game_rows(pbp), sched), windows=(3, 5))
+
+    x_cols = ["is_home", "team_line", "total_line"] + [c for c in df.columns if is_rolling_feature(c)]
+    train = df[(df["season"] == prior) & (df["push"] == 0)]
+    test = df[(df["season"] == season) & (df["team_line"] > 0)]
+    if train.empty or test.empty:
+        return None
+
+    medians = train[x_cols].median()
+    clf = LogisticRegression(max_iter=2000)
+    clf.fit(train[x_cols].fillna(medians).to_numpy(), train["cover_label"].to_numpy())
+    probs = clf.predict_proba(test[x_cols].fillna(medians).to_numpy())[:, 1]
+
+    preds = pd.DataFrame({"game_id": test["game_id"].to_numpy(), "cover_prob": probs})
+    out = games.merge(preds, on="game_id", how="left")
+    out["spread"] = out["spread_line"].abs()
+    out["model"] = "starter"
+    out["predicted_cover"] = out["cover_prob"] >= 0.5
+    out["prediction"] = np.where(out["cover_prob"].isna(), None, np.where(out["predicted_cover"], "Cover", "No Cover"))
+    out["confidence"] = None
+    return out
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+
+def resolve_paths(seasons: List[int], include_starter: bool = True) -> Dict[int, str]:
+    """PBP file per season (plus each prior season the starter model trains on, when cached)."""
+    cache = get_pbp_cache()
+    needed = set(seasons)
+    if include_starter:
+        available = set(cache.available_seasons())
+        needed |= {s - 1 for s in seasons if s - 1 in available}
+    return cache.paths_for(sorted(needed))
+
+
+def run_season(season: int, models: Optional[List[str]] = None, include_starter: bool = True,
+               paths: Optional[Dict[int, str]] = None) -> pd.DataFrame:
+    """
+    Backtest one season; returns the long results table for that season.
+
+    `paths` maps season -> PBP parquet file (see resolve_paths); resolved
+    through the cache when omitted.
+    """
+    models = models or DEFAULT_MODELS
+    paths = paths if paths is not None else resolve_paths([season], include_starter)
+    start = time.perf_counter()
+    pbp = read_pbp_files({season: paths[season]}, columns=BACKTEST_PBP_COLUMNS, filters={"season_type": "REG"})
+    games = season_games(pbp)
+    epa_asof = team_epa_before_week(pbp)
+
+    weekly = []
+    for week, week_games in games.groupby("week"):
+        epa = epa_asof[epa_asof["week"] == week].drop(columns=["week"])
+        weekly.append(run_models(build_slate(week_games, epa), models))
+    results = _long_results(pd.concat(weekly, ignore_index=True), models)
+
+    if include_starter:
+        starter = _starter_predictions(season, games, paths)
+        if starter is not None:
+            results = pd.concat([results, starter.reindex(columns=results.columns)], ignore_index=True)
+
+    picked = results["prediction"].notna() & (results["push"] == 0)
+    results["hit"] = np.where(picked, (results["predicted_cover"] == results["underdog_covered"].astype(bool)).astype(float), np.nan)
+    print(f"  {season}: {len(games)} games scored in {time.perf_counter() - start:.2f}s")
+    return results[RESULT_COLUMNS]
+
+
+def _run_season_job(args):
+    season, models, include_starter, paths = args
+    return run_season(season, models, include_starter, paths)
+
+
+def run_backtest(
+    seasons: List[int],
+    models: Optional[List[str]] = None,
+    include_starter: bool = True,
+    workers: Optional[int] = None,
+    output_path: Optional[str] = DEFAULT_OUTPUT,
+) -> pd.DataFrame:
+    """Backtest several seasons in parallel and write one parquet results table."""
+    models = models or DEFAULT_MODELS
+    # All cache reads/writes happen here, before any worker starts
+    paths = resolve_paths(seasons, include_starter)
+    jobs = [(season, models, include_starter, paths) for season in seasons]
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+
+    if workers <= 1:
+        frames = [_run_season_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(_run_season_job, jobs))
+
+    results = pd.concat(frames, ignore_index=True)
+    for col in ("model", "confidence", "favorite_team", "underdog_team", "home_team", "away_team"):
+        results[col] = results[col].astype("category")
+
+    if output_path:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        results.to_parquet(output_path, index=False)
+        print(f"✅ Saved {len(results)} backtest predictions to {output_path}")
+    return results
+
+
+def summarize(results: pd.DataFrame, by_season: bool = False) -> pd.DataFrame:
+    """ATS hit rate per model (per model-season with `by_season`)."""
+    scored = results.dropna(subset=["hit"])
+    keys = ["model", "season"] if by_season else ["model"]
+    summary = scored.groupby(keys, observed=True)["hit"].agg(picks="count", hits="sum", ats_rate="mean")
+    return summary.reset_index()
+
+
+def _parse_seasons(spec: Optional[str]) -> List[int]:
+    if not spec:
+        return get_pbp_cache().available_seasons()
+    seasons = []
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        seasons.extend(range(int(first), int(last or first) + 1))
+    return seasons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest Models A-D and the starter model over historical seasons")
+    parser.add_argument("--seasons", help="e.g. 2018-2024 or 2021,2023 (default: every cached season)")
+    parser.add_argument("--models", default=",".join(DEFAULT_MODELS), help="model_engine models to replay")
+    parser.add_argument("--no-starter", action="store_true", help="skip the starter logistic model")
+    parser.add_argument("--workers", type=int, help="process pool size (default: one per season, up to CPU count)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--by-season", action="store_true", help="also print the hit rate per model-season")
+    args = parser.parse_args()
+
+    seasons = _parse_seasons(args.seasons)
+    print(f"=== Backtesting seasons {seasons} ===")
+    start = time.perf_counter()
+    results = run_backtest(
+        seasons,
+        models=args.models.split(","),
+        include_starter=not args.no_starter,
+        workers=args.workers,
+        output_path=args.output,
+    )
+    print(f"\n=== ATS hit rate ({time.perf_counter() - start:.1f}s) ===")
+    print(summarize(results).to_string(index=False))
+    if args.by_season:
+        print("\n=== ATS hit rate per season ===")
+        print(summarize(results, by_season=True).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Keyed multi-model consensus for underdog cover picks.
+
+Model outputs (prediction_artifacts.py long schema, or per-model frames in any
+layout to_artifact() understands) are aligned on a game key -- season, week
+and the integer team ids of the away and home teams -- instead of row
+position, and every statistic is one groupby over the long table:
+
+    n_models            models with a pick for the game
+    cover_votes         models picking the underdog to cover
+    weighted_cover      weighted share of underdog picks (weights default to 1)
+    consensus           UNDERDOG / FAVORITE / SPLIT (weighted share vs `threshold`)
+    unanimous           every model picked the same side
+    disagreement        at least one model on each side
+    high_conf_count     picks with HIGH / VERY_HIGH confidence
+    high_conf_conflict  high-confidence picks on both sides
+    line_mismatch       models were run against different spreads
+
+plus model_<name>_prediction / _confidence / _probability columns for any
+number of models. A whole season of artifacts is one read and one pass.
+
+Usage:
+    python3 models/consensus.py                          # every stored week
+    python3 models/consensus.py --weeks 7 --models A B_v2 C D --weights A=2
+"""
+
+import os
+import sys
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(MODELS_DIR)
+sys.path.append(os.path.join(os.path.dirname(MODELS_DIR), "scripts"))
+
+from prediction_artifacts import COLUMNS, DEFAULT_SEASON, to_artifact
+from team_registry import team_ids
+
+GAME_KEY = ["season", "week", "away_id", "home_id"]
+GAME_COLUMNS = ["game", "away_team", "home_team", "favorite", "underdog", "spread", "total"]
+HIGH_CONFIDENCE = ["HIGH", "VERY_HIGH"]
+
+
+def long_from_frames(frames: Mapping[str, pd.DataFrame], week: int, season: int = DEFAULT_SEASON) -> pd.DataFrame:
+    """Long prediction table from {model name: per-model predictions frame} for one week."""
+    blocks = []
+    for model, frame in frames.items():
+        block = frame if list(frame.columns) == COLUMNS else to_artifact(frame)
+        blocks.append(block.assign(season=season, week=week, model=model))
+    return pd.concat(blocks, ignore_index=True)
+
+
+def build_consensus(
+    predictions: pd.DataFrame,
+    weights: Optional[Mapping[str, float]] = None,
+    threshold: float = 0.75,
+    models: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    One row per game with agreement counts, weighted consensus, disagreement
+    flags and per-model pick columns.
+
+    UNDERDOG when the weighted underdog share is >= `threshold`, FAVORITE when
+    it is <= 1 - threshold, SPLIT otherwise (3/4 and 1/4 for four equal models).
+    """
+    df = predictions.copy()
+    if "season" not in df.columns:
+        df["season"] = DEFAULT_SEASON
+    df["model"] = df["model"].astype(str)
+    if models is not None:
+        df = df[df["model"].isin(list(models))]
+    df["away_id"] = team_ids(df["away_team"])
+    df["home_id"] = team_ids(df["home_team"])
+    unknown = (df["away_id"] < 0) | (df["home_id"] < 0)
+    if unknown.any():
+        print(f"⚠️  {int(unknown.sum())} predictions with unrecognized teams skipped")
+        df = df[~unknown]
+    df = df[df["predicted_cover"].notna()].drop_duplicates(GAME_KEY + ["model"], keep="last")
+
+    weights = weights or {}
+    df["weight"] = df["model"].map(lambda m: float(weights.get(m, 1.0)))
+    df["vote"] = df["predicted_cover"].astype(bool).astype(int)
+    df["high"] = df["confidence"].astype(object).isin(HIGH_CONFIDENCE)
+    df["w_vote"] = df["weight"] * df["vote"]
+    df["high_cover"] = df["high"] & (df["vote"] == 1)
+    df["high_fade"] = df["high"] & (df["vote"] == 0)
+
+    grouped = df.groupby(GAME_KEY, sort=True)
+    games = grouped[GAME_COLUMNS].first()
+    stats = grouped.agg(
+        n_models=("vote", "size"),
+        cover_votes=("vote", "sum"),
+        weight_sum=("weight", "sum"),
+        w_votes=("w_vote", "sum"),
+        high_conf_count=("high", "sum"),
+        high_cover=("high_cover", "any"),
+        high_fade=("high_fade", "any"),
+        spread_min=("spread", "min"),
+        spread_max=("spread", "max"),
+    )
+    out = games.join(stats)
+    out["weighted_cover"] = out["w_votes"] / out["weight_sum"]
+    out["consensus"] = np.select(
+        [out["weighted_cover"] >= threshold, out["weighted_cover"] <= 1 - threshold],
+        ["UNDERDOG", "FAVORITE"], default="SPLIT",
+    )
+    out["agreement"] = (out["cover_votes"].astype(str) + "/" + out["n_models"].astype(str)
+                        + " models predict UNDERDOG cover")
+    out["unanimous"] = (out["cover_votes"] == 0) | (out["cover_votes"] == out["n_models"])
+    out["disagreement"] = ~out["unanimous"]
+    out["high_conf_conflict"] = out["high_cover"] & out["high_fade"]
+    out["line_mismatch"] = (out["spread_max"] - out["spread_min"]).fillna(0) > 0
+
+    # Per-model columns for any number of models
+    picks = df.set_index(GAME_KEY + ["model"])
+    wide = pd.DataFrame({
+        "prediction": np.where(picks["vote"] == 1, "Cover", "No Cover"),
+        "confidence": picks["confidence"].astype(object).to_numpy(),
+        "probability": picks["probability"].to_numpy(),
+    }, index=picks.index).unstack("model")
+    order = list(models) if models is not None else sorted(df["model"].unique())
+    wide = wide.reindex(columns=pd.MultiIndex.from_product([["prediction", "confidence", "probability"], order]))
+    wide.columns = [f"model_{model.lower()}_{field}" for field, model in wide.columns]
+    wide = wide[[f"model_{m.lower()}_{f}" for m in order for f in ("prediction", "confidence", "probability")]]
+
+    out = out.drop(columns=["weight_sum", "w_votes", "high_cover", "high_fade", "spread_min", "spread_max"])
+    return out.join(wide).reset_index().drop(columns=["away_id", "home_id"])
+
+
+def summary(consensus: pd.DataFrame) -> pd.DataFrame:
+    """Games per consensus label (and disagreement counts) per week."""
+    table = consensus.groupby(["season", "week", "consensus"]).size().unstack("consensus", fill_value=0).rename_axis(columns=None)
+    table["disagreements"] = consensus.groupby(["season", "week"])["disagreement"].sum()
+    table["high_conf_conflicts"] = consensus.groupby(["season", "week"])["high_conf_conflict"].sum()
+    return table.reset_index()
+
+
+def main():
+    import argparse
+
+    from prediction_artifacts import read_predictions
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--season", type=int, default=DEFAULT_SEASON)
+    parser.add_argument("--weeks", type=int, nargs="*")
+    parser.add_argument("--models", nargs="*")
+    parser.add_argument("--weights", nargs="*", default=[], help="model weights, e.g. A=2 B_v2=1.5")
+    parser.add_argument("--threshold", type=float, default=0.75)
+    parser.add_argument("--output", help="write the consensus table to this CSV")
+    args = parser.parse_args()
+
+    predictions = read_predictions(weeks=args.weeks, models=args.models, season=args.season)
+    if predictions.empty:
+        print("❌ No prediction artifacts found (run: python3 models/prediction_artifacts.py import)")
+        return
+    weights = {name: float(value) for name, value in (w.split("=", 1) for w in args.weights)}
+    consensus = build_consensus(predictions, weights=weights, threshold=args.threshold, models=args.models)
+
+    print(f"=== {args.season} consensus: {len(consensus)} games, {predictions['model'].nunique()} models ===")
+    print(summary(consensus).to_string(index=False))
+    conflicts = consensus[consensus["high_conf_conflict"]]
+    if len(conflicts):
+        print(f"\n⚠️  {len(conflicts)} games with high-confidence picks on both sides:")
+        print(conflicts[["week", "game", "underdog", "agreement"]].to_string(index=False))
+    if args.output:
+        consensus.to_csv(args.output, index=False)
+        print(f"\n✅ Saved consensus table to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Vectorized evaluation of cover predictions against final scores.
+
+Predictions (prediction_artifacts.py long schema, or any frame with
+away_team/home_team/favorite and spread columns) are joined to game results
+with one hash merge on normalized team keys, and every flag is computed with
+array operations:
+
+    underdog_margin   underdog score - favorite score
+    underdog_covered  underdog margin + spread > 0
+    push              underdog margin + spread == 0
+    underdog_won, favorite_won, tie
+    correct           predicted_cover == underdog_covered (NaN on pushes / no pick)
+
+Team names may be nicknames ("Rams"), full names ("Los Angeles Rams") or
+abbreviations in either nflverse or sportsbook spelling ("LA", "LAR"); all are
+reduced to integer team ids (scripts/team_registry.py) before joining.
+
+Usage:
+    python3 models/cover_evaluator.py                    # every stored week, all models
+    python3 models/cover_evaluator.py --weeks 5 6 --by confidence
+"""
+
+import os
+import sys
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from team_registry import normalize_team, team_ids
+
+RESULT_COLUMNS = ["game_id", "season", "week", "away_team", "home_team", "away_score", "home_score"]
+PBP_RESULT_COLUMNS = ["game_id", "season", "season_type", "week", "away_team", "home_team", "away_score", "home_score"]
+
+def team_key(teams: pd.Series) -> pd.Series:
+    """Normalize nicknames, full names and abbreviations to nflverse abbreviations."""
+    return normalize_team(teams)
+
+
+def results_from_pbp(pbp: pd.DataFrame) -> pd.DataFrame:
+    """One row per game with final scores from play-by-play."""
+    games = (
+        pbp.groupby("game_id")
+           .agg(season=("season", "first"), week=("week", "first"),
+                away_team=("away_team", "first"), home_team=("home_team", "first"),
+                away_score=("away_score", "max"), home_score=("home_score", "max"))
+           .reset_index()
+    )
+    return games[RESULT_COLUMNS]
+
+
+def load_results(season: int = 2025, weeks: Optional[Iterable[int]] = None, refresh: bool = False) -> pd.DataFrame:
+    """Regular season final scores for `season` (and `weeks`) through the shared PBP cache."""
+    from pbp_cache import read_pbp
+
+    filters = [("season_type", "==", "REG")]
+    if weeks is not None:
+        filters.append(("week", "in", [int(w) for w in weeks]))
+    return results_from_pbp(read_pbp([season], columns=PBP_RESULT_COLUMNS, filters=filters, refresh=refresh))
+
+
+def attach_results(predictions: pd.DataFrame, results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Left-join final scores onto predictions and add the game outcome flags.
+
+    Joins on (away, home) team keys, plus season and week when both frames
+    have them. Rows without a matching result get matched=False and NaN flags.
+    """
+    preds = predictions.copy()
+    preds["_away_key"] = team_ids(preds["away_team"])
+    preds["_home_key"] = team_ids(preds["home_team"])
+
+    # Integer team-id keys; results with unknown teams can never match
+    res = results.copy()
+    res["_away_key"] = team_ids(res["away_team"])
+    res["_home_key"] = team_ids(res["home_team"])
+    res = res[(res["_away_key"] >= 0) & (res["_home_key"] >= 0)]
+    keys = ["_away_key", "_home_key"] + [c for c in ("season", "week") if c in preds.columns and c in res.columns]
+    for col in ("season", "week"):
+        if col in keys:
+            preds[col] = preds[col].astype("int64")
+            res[col] = res[col].astype("int64")
+    score_cols = [c for c in ("game_id", "away_score", "home_score") if c in res.columns]
+    merged = preds.merge(res[keys + score_cols].drop_duplicates(keys), on=keys, how="left", validate="many_to_one")
+
+    away_score = merged["away_score"].to_numpy(dtype="float64")
+    home_score = merged["home_score"].to_numpy(dtype="float64")
+    fav_col = next(c for c in ("favorite", "favorite_team", "Favorite") if c in merged.columns)
+    fav_home = team_ids(merged[fav_col]) == merged["_home_key"].to_numpy()
+    spread_col = next(c for c in ("spread", "spread_line", "Spread") if c in merged.columns)
+    spread = np.abs(pd.to_numeric(merged[spread_col], errors="coerce").to_numpy(dtype="float64"))
+
+    fav_score = np.where(fav_home, home_score, away_score)
+    dog_score = np.where(fav_home, away_score, home_score)
+    margin = dog_score - fav_score
+    ats = margin + spread
+    matched = ~np.isnan(margin)
+
+    merged["matched"] = matched
+    merged["underdog_margin"] = margin
+    merged["underdog_covered"] = np.where(matched, ats > 0, np.nan)
+    merged["push"] = np.where(matched, ats == 0, np.nan)
+    merged["underdog_won"] = np.where(matched, margin > 0, np.nan)
+    merged["favorite_won"] = np.where(matched, margin < 0, np.nan)
+    merged["tie"] = np.where(matched, margin == 0, np.nan)
+    return merged.drop(columns=["_away_key", "_home_key"])
+
+
+def evaluate(predictions: pd.DataFrame, results: pd.DataFrame) -> pd.DataFrame:
+    """attach_results() plus `correct` (1/0, NaN for pushes, unmatched games and missing picks)."""
+    out = attach_results(predictions, results)
+    pick = out["predicted_cover"]
+    graded = out["matched"].to_numpy() & (out["push"] != 1).to_numpy() & pick.notna().to_numpy()
+    hit = pick.astype("float64").to_numpy() == out["underdog_covered"].to_numpy()
+    out["correct"] = np.where(graded, hit.astype("float64"), np.nan)
+    return out
+
+
+def accuracy(evaluated: pd.DataFrame, by: Sequence[str] = ("model",)) -> pd.DataFrame:
+    """Graded picks, correct picks, accuracy and pushes per group."""
+    grouped = evaluated.groupby(list(by), observed=True, dropna=False)
+    table = grouped.agg(
+        games=("matched", "size"),
+        matched=("matched", "sum"),
+        graded=("correct", "count"),
+        correct=("correct", "sum"),
+        pushes=("push", "sum"),
+    )
+    table["accuracy"] = (table["correct"] / table["graded"].where(table["graded"] > 0)).round(3)
+    return table.astype({"matched": "int64", "correct": "int64", "pushes": "int64"}).reset_index()
+
+
+def main():
+    import argparse
+
+    from prediction_artifacts import read_predictions
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--season", type=int, default=2025)
+    parser.add_argument("--weeks", type=int, nargs="*")
+    parser.add_argument("--models", nargs="*")
+    parser.add_argument("--by", nargs="*", default=[], help="extra grouping columns (e.g. confidence)")
+    args = parser.parse_args()
+
+    predictions = read_predictions(weeks=args.weeks, models=args.models, season=args.season)
+    if predictions.empty:
+        print("❌ No prediction artifacts found (run: python3 models/prediction_artifacts.py import)")
+        return
+    weeks = sorted(predictions["week"].unique())
+    results = load_results(args.season, weeks)
+    evaluated = evaluate(predictions, results)
+
+    unmatched = evaluated.loc[~evaluated["matched"], ["week", "model", "game"]]
+    if len(unmatched):
+        print(f"⚠️  {len(unmatched)} predictions without a final score (games not played yet?)")
+
+    print(f"\n=== {args.season} cover accuracy by week and model ===")
+    print(accuracy(evaluated, by=["week", "model"] + args.by).to_string(index=False))
+    print(f"\n=== {args.season} season to date ===")
+    print(accuracy(evaluated, by=["model"] + args.by).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
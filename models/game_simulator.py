@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Vectorized Monte Carlo game simulator for cover, push and total probabilities.
+
+Each game on a slate (model_engine.build_slate output) gets an expected score
+per side from team EPA:
+
+    points = LEAGUE_POINTS + PLAYS_PER_TEAM * (offense EPA/play + opponent defense EPA allowed/play) / 2
+             +/- HOME_FIELD / 2
+
+and a scoring variance proportional to those points (SCORE_VARIANCE_PER_POINT,
+calibrated so an average game has the historical ~13.5 point margin SD).
+Scores are drawn as one (games x simulations) NumPy array per side, rounded to
+whole points, so pushes on integer spreads/totals come out naturally. From the
+simulated scores:
+
+    cover_prob        underdog covers (favorite margin < spread)
+    push_prob         favorite margin == spread
+    fav_cover_prob    favorite covers
+    over_prob / under_prob / total_push_prob against the total line
+    dog_win_prob      underdog wins outright
+
+Games are simulated in blocks with independent seeds derived from one
+SeedSequence, so results are reproducible and do not depend on how many
+worker processes the blocks are spread over.
+
+Usage:
+    python3 models/game_simulator.py                                  # week 6 slate, 100k sims
+    python3 models/game_simulator.py --odds schedule/week7_2025_odds.csv --sims 200000 --workers 4
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(MODELS_DIR)
+sys.path.append(MODELS_DIR)
+
+from model_engine import _missing_to_nan, _result, build_slate
+
+LEAGUE_POINTS = 22.0       # average points per team per game
+PLAYS_PER_TEAM = 62.0      # offensive snaps per team per game (EPA/play -> points)
+HOME_FIELD = 1.5           # points
+# Score variance per expected point: 22 points -> SD ~9.5 per team -> ~13.5 margin SD
+SCORE_VARIANCE_PER_POINT = 4.1
+
+DEFAULT_SIMS = 100_000
+BLOCK_GAMES = 32           # games per simulation block (memory: 2 x block x sims float32)
+
+OUTPUT_COLUMNS = [
+    "fav_points", "dog_points", "expected_margin", "expected_total",
+    "cover_prob", "push_prob", "fav_cover_prob",
+    "over_prob", "under_prob", "total_push_prob", "dog_win_prob",
+]
+# Outputs measured against total_line (NaN when the game has no total)
+TOTAL_COLUMNS = ["over_prob", "under_prob", "total_push_prob"]
+
+
+def expected_points(slate: pd.DataFrame, home_field: float = HOME_FIELD) -> pd.DataFrame:
+    """Mean and SD of each side's score from the slate's dog_*/fav_* EPA columns."""
+    fav_off = slate["fav_epa_off_per_play"].to_numpy(dtype="float64")
+    fav_def = slate["fav_epa_def_allowed_per_play"].to_numpy(dtype="float64")
+    dog_off = slate["dog_epa_off_per_play"].to_numpy(dtype="float64")
+    dog_def = slate["dog_epa_def_allowed_per_play"].to_numpy(dtype="float64")
+    fav_home = np.where(slate["favorite_is_home"].to_numpy(dtype=bool), 0.5, -0.5)
+    # Neutral-site games: neither side is home
+    if "neutral_site" in slate.columns:
+        fav_home = np.where(slate["neutral_site"].to_numpy(dtype=bool), 0.0, fav_home)
+
+    fav_mu = LEAGUE_POINTS + PLAYS_PER_TEAM * (fav_off + dog_def) / 2 + home_field * fav_home
+    dog_mu = LEAGUE_POINTS + PLAYS_PER_TEAM * (dog_off + fav_def) / 2 - home_field * fav_home
+    fav_mu, dog_mu = np.clip(fav_mu, 3.0, None), np.clip(dog_mu, 3.0, None)
+    return pd.DataFrame({
+        "fav_mu": fav_mu,
+        "fav_sd": np.sqrt(SCORE_VARIANCE_PER_POINT * fav_mu),
+        "dog_mu": dog_mu,
+        "dog_sd": np.sqrt(SCORE_VARIANCE_PER_POINT * dog_mu),
+        "spread": slate["spread"].to_numpy(dtype="float64"),
+        "total_line": slate["total_line"].to_numpy(dtype="float64"),
+    }, index=slate.index)
+
+
+def _simulate_block(args) -> np.ndarray:
+    """Probabilities for one block of games: (block, len(OUTPUT_COLUMNS)) array."""
+    params, n_sims, seed = args
+    fav_mu, fav_sd, dog_mu, dog_sd, spread, total_line = params.T
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal((2, len(fav_mu), n_sims), dtype=np.float32)
+
+    fav = np.rint(np.maximum(fav_mu[:, None] + fav_sd[:, None] * z[0], 0.0))
+    dog = np.rint(np.maximum(dog_mu[:, None] + dog_sd[:, None] * z[1], 0.0))
+    margin = fav - dog
+    total = fav + dog
+    spread, total_line = spread[:, None], total_line[:, None]
+
+    return np.column_stack([
+        fav.mean(axis=1),
+        dog.mean(axis=1),
+        margin.mean(axis=1),
+        total.mean(axis=1),
+        (margin < spread).mean(axis=1),
+        (margin == spread).mean(axis=1),
+        (margin > spread).mean(axis=1),
+        (total > total_line).mean(axis=1),
+        (total < total_line).mean(axis=1),
+        (total == total_line).mean(axis=1),
+        (margin < 0).mean(axis=1),
+    ])
+
+
+def simulate_games(
+    params: pd.DataFrame,
+    n_sims: int = DEFAULT_SIMS,
+    seed: Optional[int] = 0,
+    workers: int = 1,
+    block_games: int = BLOCK_GAMES,
+) -> pd.DataFrame:
+    """
+    Simulate every game in `params` (expected_points() output) `n_sims` times.
+
+    Blocks of `block_games` games are spread over `workers` processes; results
+    are identical for any worker count with the same seed.
+    """
+    out = pd.DataFrame(np.nan, index=params.index, columns=OUTPUT_COLUMNS)
+    values = params[["fav_mu", "fav_sd", "dog_mu", "dog_sd", "spread", "total_line"]].to_numpy(dtype="float32")
+    # Games missing EPA (or the spread) are left as NaN
+    valid = ~np.isnan(values[:, :5]).any(axis=1)
+    values = values[valid]
+    if len(values) == 0:
+        return out
+
+    starts = range(0, len(values), block_games)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    jobs = [(values[s:s + block_games], n_sims, child) for s, child in zip(starts, seeds)]
+    if workers <= 1 or len(jobs) == 1:
+        blocks = [_simulate_block(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            blocks = list(pool.map(_simulate_block, jobs))
+
+    out.loc[valid, OUTPUT_COLUMNS] = np.vstack(blocks)
+    # Without a total line the margin outputs stand, but over/under are unknown
+    out.loc[np.isnan(params["total_line"].to_numpy(dtype="float64")), TOTAL_COLUMNS] = np.nan
+    return out
+
+
+def simulate_slate(slate: pd.DataFrame, n_sims: int = DEFAULT_SIMS, seed: Optional[int] = 0,
+                   workers: int = 1, home_field: float = HOME_FIELD) -> pd.DataFrame:
+    """Slate columns plus the simulated probabilities (see module docstring)."""
+    sims = simulate_games(expected_points(slate, home_field), n_sims=n_sims, seed=seed, workers=workers)
+    return pd.concat([slate, sims], axis=1)
+
+
+def model_mc(slate: pd.DataFrame, n_sims: int = DEFAULT_SIMS, seed: Optional[int] = 0) -> pd.DataFrame:
+    """Monte Carlo picks in the model_engine output format (pick the side more likely to cover)."""
+    sims = simulate_games(expected_points(slate), n_sims=n_sims, seed=seed)
+    cover_prob = sims["cover_prob"].to_numpy()
+    fav_prob = sims["fav_cover_prob"].to_numpy()
+    predicted_cover = cover_prob > fav_prob
+    # Confidence in the picked side, ignoring pushes
+    decided = cover_prob + fav_prob
+    with np.errstate(invalid="ignore", divide="ignore"):
+        edge = np.maximum(cover_prob, fav_prob) / decided
+    confidence = np.select([edge >= 0.65, edge >= 0.58], ["HIGH", "MEDIUM"], default="LOW")
+    out = _result(slate, predicted_cover, confidence, cover_prob, cover_prob)
+    return _missing_to_nan(out, ~np.isnan(cover_prob))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--odds", default=os.path.join(REPO_ROOT, "schedule", "week6_2025_odds.csv"))
+    parser.add_argument("--epa", default=os.path.join(REPO_ROOT, "detailed_epa_data.csv"))
+    parser.add_argument("--sims", type=int, default=DEFAULT_SIMS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    slate = build_slate(pd.read_csv(args.odds), pd.read_csv(args.epa))
+    start = time.perf_counter()
+    sims = simulate_slate(slate, n_sims=args.sims, seed=args.seed, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ Simulated {len(slate)} games x {args.sims:,} in {elapsed:.2f}s")
+    cols = ["underdog_team", "favorite_team", "spread", "expected_margin", "cover_prob", "push_prob",
+            "total_line", "expected_total", "over_prob", "dog_win_prob"]
+    print(sims[cols].round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Live re-scoring of weekly picks as betting lines move.
+
+A long-running loop polls an odds source -- a directory of odds CSVs in the
+schedule/week*_2025_odds.csv layout, or an HTTP endpoint serving the same CSV
+(e.g. scripts/fixture_server.py as a local stand-in) -- and on every change
+re-scores only the games whose line, total or favorite moved:
+
+- Team EPA is held in memory as one (33, k) array by team id (as in
+  model_engine.build_slate), so attaching EPA to a changed game is two take()s.
+- Games are keyed by source and (away team id, home team id); an update diffs the
+  new odds against the last seen odds and sends only new or changed rows
+  through run_models(). Games missing from a source are dropped.
+- The current picks for every game are kept in one table and written
+  atomically after each update (NFL_LIVE_PREDICTIONS_PATH).
+
+Directories are polled by file mtime and size, HTTP sources with conditional
+GETs (ETag / If-None-Match), so an unchanged feed costs one stat() or one 304.
+Each update reports the latency from detecting the change to updated picks.
+
+Environment overrides:
+    NFL_LIVE_PREDICTIONS_PATH    current picks (default: data/live_predictions.parquet)
+
+Usage:
+    python3 models/live_rescorer.py --watch schedule/                  # every week*_odds.csv
+    python3 models/live_rescorer.py --url http://127.0.0.1:8000/odds.local/week7 --interval 0.5
+    python3 models/live_rescorer.py --watch schedule/ --once           # score once and exit
+"""
+
+import fnmatch
+import io
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(MODELS_DIR)
+sys.path.append(MODELS_DIR)
+sys.path.append(os.path.join(REPO_ROOT, "scripts"))
+
+from model_engine import EPA_COLUMNS, build_slate, run_models
+from team_registry import TEAM_ABBRS, take_by_team, team_ids, team_table
+
+DEFAULT_OUTPUT = os.environ.get(
+    "NFL_LIVE_PREDICTIONS_PATH", os.path.join(REPO_ROOT, "data", "live_predictions.parquet")
+)
+DEFAULT_MODELS = ["A", "B", "C", "D"]
+ODDS_COLUMNS = ["away_team", "home_team", "favorite_team", "underdog_team", "spread_line", "total_line"]
+LINE_COLUMNS = ["favorite_team", "spread_line", "total_line"]
+PICK_FIELDS = ["prediction", "confidence", "cover_prob"]
+
+
+# -----------------------------
+# Scoring state
+# -----------------------------
+
+class LiveRescorer:
+    """Current odds and picks for every watched game; re-scores only games whose line moved."""
+
+    def __init__(self, epa_data: pd.DataFrame, models: Optional[Sequence[str]] = None):
+        self.models = list(models or DEFAULT_MODELS)
+        self.set_epa(epa_data)
+        # Per source, indexed by game key (away_id * 32 + home_id)
+        self.odds: Dict[str, pd.DataFrame] = {}
+        self.scored: Dict[str, pd.DataFrame] = {}
+
+    def set_epa(self, epa_data: pd.DataFrame) -> None:
+        """Swap in new team EPA; rescore_all() applies it to games already scored."""
+        self._epa = team_table(epa_data.reindex(columns=["team"] + EPA_COLUMNS), EPA_COLUMNS)
+
+    def _slate(self, odds: pd.DataFrame) -> pd.DataFrame:
+        slate = build_slate(odds)
+        for prefix, col in (("dog", "underdog_abbr"), ("fav", "favorite_abbr")):
+            joined = take_by_team(self._epa, team_ids(slate[col]))
+            for i, c in enumerate(EPA_COLUMNS):
+                slate[f"{prefix}_{c}"] = joined[:, i]
+        return slate
+
+    def _score(self, source: str, odds: pd.DataFrame) -> pd.DataFrame:
+        scored = run_models(self._slate(odds.reset_index(drop=True)), self.models)
+        scored.index = odds.index
+        return scored.assign(source=source)
+
+    def update(self, source: str, odds: pd.DataFrame) -> pd.DataFrame:
+        """
+        Apply a full odds snapshot for `source`; returns the re-scored rows
+        (new games and games whose favorite, spread or total changed).
+        """
+        new = odds.reindex(columns=ODDS_COLUMNS)
+        away, home = team_ids(new["away_team"]), team_ids(new["home_team"])
+        key = away.astype(np.int64) * len(TEAM_ABBRS) + home
+        unknown = (away < 0) | (home < 0)
+        if unknown.any():
+            print(f"⚠️  {source}: {int(unknown.sum())} games with unrecognized teams skipped")
+        new = new.set_axis(pd.Index(key, name="game_key"))[~unknown]
+        new = new[~new.index.duplicated(keep="last")]
+
+        old = self.odds.get(source)
+        if old is None:
+            changed = new
+        else:
+            prev, lines = old.reindex(new.index)[LINE_COLUMNS], new[LINE_COLUMNS]
+            # NaN == NaN here: a line that stays off the board is not a change
+            same = (prev.eq(lines) | (prev.isna() & lines.isna())).all(axis=1)
+            changed = new[~(same & new.index.isin(old.index))]
+        self.odds[source] = new
+
+        scored = self.scored.get(source)
+        if scored is not None:
+            scored = scored[scored.index.isin(new.index) & ~scored.index.isin(changed.index)]
+        if changed.empty:
+            if scored is not None:
+                self.scored[source] = scored
+            return changed.iloc[:0]
+        rescored = self._score(source, changed)
+        self.scored[source] = rescored if scored is None or scored.empty else pd.concat([scored, rescored])
+        return rescored
+
+    def rescore_all(self) -> pd.DataFrame:
+        """Re-score every game (after set_epa())."""
+        self.scored = {source: self._score(source, odds) for source, odds in self.odds.items() if len(odds)}
+        return self.picks()
+
+    def picks(self, scored: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Compact pick table: game columns plus <model>_prediction / _confidence / _cover_prob."""
+        cols = ["source"] + ODDS_COLUMNS + [f"model_{m.lower()}_{f}" for m in self.models for f in PICK_FIELDS]
+        frames = [scored] if scored is not None else [self.scored[s] for s in sorted(self.scored)]
+        frames = [f for f in frames if len(f)]
+        if not frames:
+            return pd.DataFrame(columns=cols)
+        picks = pd.concat(frames)[cols].reset_index()
+        return picks.sort_values(["source", "game_key"]).drop(columns="game_key").reset_index(drop=True)
+
+    def n_games(self) -> int:
+        return sum(len(f) for f in self.scored.values())
+
+    def save(self, path: str = DEFAULT_OUTPUT) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        self.picks().assign(updated_at=pd.Timestamp.now()).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return path
+
+
+# -----------------------------
+# Odds sources
+# -----------------------------
+
+class DirectorySource:
+    """Odds CSVs matching `pattern` in a directory, re-read when their mtime or size changes."""
+
+    def __init__(self, directory: str, pattern: str = "week*_odds.csv"):
+        self.directory = directory
+        self.pattern = pattern
+        self._seen: Dict[str, Tuple[int, int]] = {}
+
+    def poll(self) -> Iterator[Tuple[str, Optional[pd.DataFrame], float]]:
+        """
+        Yield (source, odds, detected_at) for new or changed files and
+        (source, None, detected_at) for deleted ones; detected_at is a perf_counter() time.
+        """
+        current = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and fnmatch.fnmatch(entry.name, self.pattern):
+                stat = entry.stat()
+                current[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        for name in sorted(current):
+            if self._seen.get(name) == current[name]:
+                continue
+            detected_at = time.perf_counter()
+            try:
+                odds = pd.read_csv(os.path.join(self.directory, name))
+            except (OSError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+                # Partially written file; retry on the next poll
+                print(f"⚠️  Could not read {name}: {e}")
+                continue
+            self._seen[name] = current[name]
+            yield name, odds, detected_at
+        for name in sorted(set(self._seen) - set(current)):
+            del self._seen[name]
+            yield name, None, time.perf_counter()
+
+
+class HTTPSource:
+    """An odds CSV (or JSON records) at a URL, polled with conditional GETs."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self._etag: Optional[str] = None
+
+    def poll(self) -> Iterator[Tuple[str, Optional[pd.DataFrame], float]]:
+        """Yield (url, odds, detected_at) when the endpoint returns a new body (not on 304)."""
+        request = urllib.request.Request(self.url)
+        if self._etag:
+            request.add_header("If-None-Match", self._etag)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                detected_at = time.perf_counter()
+                etag = response.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                print(f"⚠️  {self.url}: HTTP {e.code}")
+            return
+        except (urllib.error.URLError, OSError) as e:
+            print(f"⚠️  {self.url}: {e}")
+            return
+        text = body.decode("utf-8")
+        odds = pd.read_json(io.StringIO(text)) if text.lstrip().startswith("[") else pd.read_csv(io.StringIO(text))
+        self._etag = etag
+        yield self.url, odds, detected_at
+
+
+# -----------------------------
+# Service loop
+# -----------------------------
+
+def process(rescorer: LiveRescorer, sources: List, output_path: Optional[str] = DEFAULT_OUTPUT) -> List[dict]:
+    """One poll of every source; returns one stats dict per applied update."""
+    updates = []
+    for src in sources:
+        for name, odds, detected_at in src.poll():
+            rescored = rescorer.update(name, pd.DataFrame(columns=ODDS_COLUMNS) if odds is None else odds)
+            elapsed = time.perf_counter() - detected_at
+            updates.append({"source": name, "games": len(rescored), "ms": elapsed * 1000,
+                            "rescored": rescored})
+    if updates and output_path:
+        rescorer.save(output_path)
+    return updates
+
+
+def report(rescorer: LiveRescorer, update: dict) -> None:
+    n, ms = update["games"], update["ms"]
+    if not n:
+        print(f"{update['source']}: no line changes")
+        return
+    print(f"✅ {update['source']}: re-scored {n} games in {ms:.1f} ms ({ms / n:.1f} ms/game)")
+    picks = rescorer.picks(update["rescored"])
+    cols = ["away_team", "home_team", "underdog_team", "spread_line"] + [
+        f"model_{m.lower()}_prediction" for m in rescorer.models
+    ]
+    print(picks[cols].to_string(index=False))
+
+
+def run_service(rescorer: LiveRescorer, sources: List, interval: float = 1.0, once: bool = False,
+                output_path: Optional[str] = DEFAULT_OUTPUT) -> None:
+    """Poll `sources` every `interval` seconds until interrupted (or once)."""
+    try:
+        while True:
+            for update in process(rescorer, sources, output_path):
+                report(rescorer, update)
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    if output_path and rescorer.n_games():
+        print(f"Current picks for {rescorer.n_games()} games in {output_path}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--watch", action="append", default=[], help="directory of odds CSVs (repeatable)")
+    parser.add_argument("--pattern", default="week*_odds.csv", help="odds file pattern in --watch directories")
+    parser.add_argument("--url", action="append", default=[], help="HTTP odds endpoint serving CSV (repeatable)")
+    parser.add_argument("--epa", default=os.path.join(REPO_ROOT, "detailed_epa_data.csv"))
+    parser.add_argument("--models", default=",".join(DEFAULT_MODELS))
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between polls")
+    parser.add_argument("--once", action="store_true", help="score the current odds and exit")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    sources = [DirectorySource(d, args.pattern) for d in args.watch] + [HTTPSource(u) for u in args.url]
+    if not sources:
+        parser.error("give at least one --watch directory or --url")
+
+    rescorer = LiveRescorer(pd.read_csv(args.epa), models=args.models.split(","))
+    print(f"Watching {len(sources)} odds source(s) every {args.interval:g}s (Ctrl-C to stop)")
+    run_service(rescorer, sources, interval=args.interval, once=args.once, output_path=args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,12 @@ Choose FAVORITE on spreads between -1 and -3.5
 import pandas as pd
 import numpy as np
 import os
+import sys
+
+# Shared model engine lives in models/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_engine import build_slate, model_c_spread_rules
 
 def run_model_c_spread_rules():
     """Run Model C using spread-based rules"""
@@ -37,39 +43,13 @@ def run_model_c_spread_rules():
     week3_odds['underdog_abbr'] = week3_odds['underdog_team'].map(team_name_to_abbr)
     week3_odds['favorite_abbr'] = week3_odds['favorite_team'].map(team_name_to_abbr)
     
-    # Initialize predictions
+    # Apply Model C Rules (vectorized over the whole slate, see models/model_engine.py)
     week3_data = week3_odds.copy()
-    week3_data['cover_probability'] = 0.50  # Default
-    week3_data['confidence'] = 'MEDIUM'  # Default
-    week3_data['predicted_cover'] = False  # Default to favorite cover
-    week3_data['rule_applied'] = 'None'
-    
-    # Apply Model C Rules
-    for idx, row in week3_data.iterrows():
-        spread = row['spread_line']
-        favorite = row['favorite_team']
-        home_team = row['home_team']
-        
-        # Rule 1: Choose HOME FAVORITE on spreads between -2.5 and -3.5
-        if -3.5 <= spread <= -2.5 and favorite == home_team:
-            week3_data.at[idx, 'predicted_cover'] = False  # Favorite covers
-            week3_data.at[idx, 'cover_probability'] = 0.65
-            week3_data.at[idx, 'confidence'] = 'HIGH'
-            week3_data.at[idx, 'rule_applied'] = 'Home Favorite -2.5 to -3.5'
-        
-        # Rule 2: Choose FAVORITE on spreads between -1 and -3.5
-        elif -3.5 <= spread <= -1.0:
-            week3_data.at[idx, 'predicted_cover'] = False  # Favorite covers
-            week3_data.at[idx, 'cover_probability'] = 0.60
-            week3_data.at[idx, 'confidence'] = 'HIGH'
-            week3_data.at[idx, 'rule_applied'] = 'Favorite -1 to -3.5'
-        
-        # For spreads outside these ranges, default to underdog
-        else:
-            week3_data.at[idx, 'predicted_cover'] = True  # Underdog covers
-            week3_data.at[idx, 'cover_probability'] = 0.45
-            week3_data.at[idx, 'confidence'] = 'LOW'
-            week3_data.at[idx, 'rule_applied'] = 'Default Underdog'
+    rules = model_c_spread_rules(build_slate(week3_data))
+    week3_data['cover_probability'] = rules['probability']
+    week3_data['confidence'] = rules['confidence']
+    week3_data['predicted_cover'] = rules['predicted_cover']
+    week3_data['rule_applied'] = rules['rule_applied']
     
     print(f"\n=== Model C Predictions ===")
     
@@ -8,6 +8,12 @@ Choose UNDERDOG in games with TOTAL OF 45.5 POINTS OR BELOW
 import pandas as pd
 import numpy as np
 import os
+import sys
+
+# Shared model engine lives in models/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_engine import build_slate, model_d_total_rules
 
 def run_model_d_total_rules():
     """Run Model D using total-based rules"""
@@ -37,38 +43,13 @@ def run_model_d_total_rules():
     week3_odds['underdog_abbr'] = week3_odds['underdog_team'].map(team_name_to_abbr)
     week3_odds['favorite_abbr'] = week3_odds['favorite_team'].map(team_name_to_abbr)
     
-    # Initialize predictions
+    # Apply Model D Rules (vectorized over the whole slate, see models/model_engine.py)
     week3_data = week3_odds.copy()
-    week3_data['cover_probability'] = 0.50  # Default
-    week3_data['confidence'] = 'MEDIUM'  # Default
-    week3_data['predicted_cover'] = False  # Default to favorite cover
-    week3_data['rule_applied'] = 'None'
-    
-    # Apply Model D Rules
-    for idx, row in week3_data.iterrows():
-        total = row['total_line']
-        spread = row['spread_line']
-        
-        # Rule 1: Choose FAVORITE (spread ≤ 6.5) on games with TOTAL ≥ 46 points
-        if total >= 46.0 and abs(spread) <= 6.5:
-            week3_data.at[idx, 'predicted_cover'] = False  # Favorite covers
-            week3_data.at[idx, 'cover_probability'] = 0.65
-            week3_data.at[idx, 'confidence'] = 'HIGH'
-            week3_data.at[idx, 'rule_applied'] = 'High Total + Small Spread = Favorite'
-        
-        # Rule 2: Choose UNDERDOG in games with TOTAL ≤ 45.5 points
-        elif total <= 45.5:
-            week3_data.at[idx, 'predicted_cover'] = True  # Underdog covers
-            week3_data.at[idx, 'cover_probability'] = 0.60
-            week3_data.at[idx, 'confidence'] = 'HIGH'
-            week3_data.at[idx, 'rule_applied'] = 'Low Total = Underdog'
-        
-        # For games that don't match rules, default to underdog
-        else:
-            week3_data.at[idx, 'predicted_cover'] = True  # Underdog covers
-            week3_data.at[idx, 'cover_probability'] = 0.45
-            week3_data.at[idx, 'confidence'] = 'LOW'
-            week3_data.at[idx, 'rule_applied'] = 'Default Underdog'
+    rules = model_d_total_rules(build_slate(week3_data))
+    week3_data['cover_probability'] = rules['probability']
+    week3_data['confidence'] = rules['confidence']
+    week3_data['predicted_cover'] = rules['predicted_cover']
+    week3_data['rule_applied'] = rules['rule_applied']
     
     print(f"\n=== Model D Predictions ===")
     
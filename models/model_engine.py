@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Vectorized engine for Models A-D.
+
+Every model is written as column operations over a whole slate of games
+(np.select for the rule bands, one integer team-id EPA join per side) instead of
+iterrows() loops with per-game boolean-mask lookups, so the same code scores a
+single week or thousands of historical/simulated games at once.
+
+A slate is any DataFrame with the odds-file columns:
+    away_team, home_team, favorite_team, underdog_team, spread_line, total_line
+Team columns may hold nicknames ('Bills') or abbreviations ('BUF').
+
+Each model returns a frame aligned to the slate index with:
+    prediction      'Cover' / 'No Cover' (underdog perspective)
+    predicted_cover True when the underdog is picked to cover
+    confidence      model's confidence label
+    probability     probability as published by the model (NaN if it has none)
+    cover_prob      probability that the underdog covers (probability for EPA
+                    models; derived from the pick for the rule-based models)
+    rule_applied    rule label (rule-based models only)
+
+Registered models:
+    A             SumerSports EPA bands (week 6 all-models version)
+    B             Matchup pass/rush EPA bands (week 6 all-models version)
+    C             Spread bands (week 6 all-models version)
+    D             Spread/total bands (week 6 all-models version)
+    C_spread_rules  Original Model C spread rules (model_c_spread_rules.py)
+    D_total_rules   Original Model D total rules (model_d_total_rules.py)
+
+Usage:
+    from model_engine import build_slate, run_models
+    slate = build_slate(odds, epa_data)
+    preds = run_models(slate, ["A", "B", "C", "D"])
+"""
+
+import os
+import sys
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from team_registry import NICKNAME_TO_ABBR, normalize_team, take_by_team, team_ids, team_table
+
+TEAM_NAME_TO_ABBR = dict(NICKNAME_TO_ABBR)
+
+# EPA columns joined onto the slate for each side (dog_* / fav_*)
+EPA_COLUMNS = [
+    "epa_off_per_play", "epa_def_allowed_per_play",
+    "epa_pass_off", "epa_rush_off", "epa_pass_def_allowed", "epa_rush_def_allowed",
+]
+
+
+def to_abbr(teams: pd.Series) -> pd.Series:
+    """Map nicknames, full names and aliases to abbreviations (see scripts/team_registry.py)."""
+    return normalize_team(teams)
+
+
+def build_slate(odds: pd.DataFrame, epa_data: Optional[pd.DataFrame] = None,
+                epa_asof=None, kickoff_col: str = "kickoff") -> pd.DataFrame:
+    """
+    Normalize an odds table and attach underdog (dog_*) and favorite (fav_*) EPA columns.
+
+    EPA is joined by integer team id: one (32, k) array built once from `epa_data`
+    and a take() per side.
+    With `epa_asof` (an EPAAsOfIndex from scripts/epa_snapshot_store.py) each game
+    instead gets the latest EPA snapshot taken strictly before its `kickoff_col`,
+    so replayed weeks never see later data.
+    """
+    slate = odds.copy()
+    slate["spread"] = slate["spread_line"].abs()
+    slate["underdog_abbr"] = to_abbr(slate["underdog_team"])
+    slate["favorite_abbr"] = to_abbr(slate["favorite_team"])
+    slate["underdog_is_home"] = slate["underdog_team"] == slate["home_team"]
+    slate["favorite_is_home"] = slate["favorite_team"] == slate["home_team"]
+
+    if epa_asof is not None:
+        kickoffs = slate[kickoff_col].to_numpy()
+        for prefix, col in (("dog", "underdog_abbr"), ("fav", "favorite_abbr")):
+            joined = epa_asof.lookup(slate[col].to_numpy(), kickoffs, EPA_COLUMNS)
+            for c in EPA_COLUMNS:
+                slate[f"{prefix}_{c}"] = joined[c].to_numpy()
+        slate["epa_snapshot_at"] = joined["snapshot_at"].to_numpy()
+    elif epa_data is not None:
+        epa = team_table(epa_data.reindex(columns=["team"] + EPA_COLUMNS), EPA_COLUMNS)
+        for prefix, col in (("dog", "underdog_abbr"), ("fav", "favorite_abbr")):
+            joined = take_by_team(epa, team_ids(slate[col]))
+            for i, c in enumerate(EPA_COLUMNS):
+                slate[f"{prefix}_{c}"] = joined[:, i]
+    return slate
+
+
+def _band(values, edges, adjustments, default=0.0):
+    """np.select over descending `>=`/`>` thresholds expressed as (op, edge) pairs."""
+    conditions = []
+    for op, edge in edges:
+        conditions.append(values > edge if op == ">" else values >= edge if op == ">=" else values < edge)
+    return np.select(conditions, adjustments, default=default)
+
+
+def _result(slate, predicted_cover, confidence, probability, cover_prob, rule_applied=None) -> pd.DataFrame:
+    out = pd.DataFrame({
+        "prediction": np.where(predicted_cover, "Cover", "No Cover"),
+        "predicted_cover": np.asarray(predicted_cover, dtype=bool),
+        "confidence": confidence,
+        "probability": probability,
+        "cover_prob": cover_prob,
+    }, index=slate.index)
+    if rule_applied is not None:
+        out["rule_applied"] = rule_applied
+    return out
+
+
+def _missing_to_nan(out: pd.DataFrame, valid: np.ndarray) -> pd.DataFrame:
+    """Games without the EPA inputs a model needs get no prediction."""
+    if valid.all():
+        return out
+    out.loc[~valid, ["probability", "cover_prob"]] = np.nan
+    out.loc[~valid, ["prediction", "confidence"]] = None
+    return out
+
+
+# -----------------------------
+# Model A: SumerSports EPA
+# -----------------------------
+
+def model_a(slate: pd.DataFrame) -> pd.DataFrame:
+    fav_def = slate["fav_epa_def_allowed_per_play"].to_numpy()
+    dog_net = slate["dog_epa_off_per_play"].to_numpy() - slate["dog_epa_def_allowed_per_play"].to_numpy()
+    fav_net = slate["fav_epa_off_per_play"].to_numpy() - fav_def
+    net_diff = dog_net - fav_net
+    spread = slate["spread"].to_numpy()
+
+    cover_prob = np.full(len(slate), 0.50)
+    # Defense quality (favorite's defense): strong / weak / average
+    cover_prob += _band(fav_def, [("<", -0.05), (">", 0.10)], [0.12, -0.10], default=0.02)
+    # Net EPA differential
+    cover_prob += _band(net_diff, [(">", 0.10), (">", 0), (">", -0.10)], [0.15, 0.08, -0.05], default=-0.15)
+    # Spread adjustment
+    cover_prob += _band(spread, [(">=", 10), (">=", 7), (">=", 3)], [0.15, 0.10, 0.05])
+    # Underdog at home
+    cover_prob += np.where(slate["underdog_is_home"].to_numpy(), 0.08, 0.0)
+    cover_prob = np.clip(cover_prob, 0.05, 0.95)
+
+    confidence = np.select(
+        [cover_prob >= 0.65, cover_prob >= 0.55, cover_prob >= 0.45, cover_prob >= 0.35],
+        ["HIGH", "MEDIUM", "LOW", "MEDIUM"], default="HIGH",
+    )
+    out = _result(slate, cover_prob >= 0.55, confidence, cover_prob, cover_prob)
+    valid = ~np.isnan(fav_def) & ~np.isnan(dog_net) & ~np.isnan(fav_net)
+    return _missing_to_nan(out, valid)
+
+
+# -----------------------------
+# Model B: matchup pass/rush EPA
+# -----------------------------
+
+def model_b(slate: pd.DataFrame) -> pd.DataFrame:
+    pass_matchup = slate["dog_epa_pass_off"].to_numpy() - slate["fav_epa_pass_def_allowed"].to_numpy()
+    rush_matchup = slate["dog_epa_rush_off"].to_numpy() - slate["fav_epa_rush_def_allowed"].to_numpy()
+    # Combined matchup (weighted: 60% pass, 40% rush)
+    combined = (pass_matchup * 0.6) + (rush_matchup * 0.4)
+    spread = slate["spread"].to_numpy()
+
+    cover_prob = np.full(len(slate), 0.50)
+    cover_prob += _band(
+        combined,
+        [(">", 0.25), (">", 0.15), (">", 0.05), ("<", -0.15), ("<", -0.05)],
+        [0.25, 0.18, 0.10, -0.20, -0.12],
+    )
+    cover_prob += _band(spread, [(">=", 10), (">=", 7), (">=", 3)], [0.20, 0.15, 0.08])
+    cover_prob = np.clip(cover_prob, 0.05, 0.95)
+
+    confidence = np.select(
+        [cover_prob >= 0.80, cover_prob >= 0.65, cover_prob >= 0.55, cover_prob >= 0.45, cover_prob >= 0.30],
+        ["VERY_HIGH", "HIGH", "MEDIUM", "LOW", "MEDIUM"], default="VERY_HIGH",
+    )
+    out = _result(slate, cover_prob >= 0.55, confidence, cover_prob, cover_prob)
+    return _missing_to_nan(out, ~np.isnan(combined))
+
+
+# -----------------------------
+# Model C: spread bands
+# -----------------------------
+
+def model_c(slate: pd.DataFrame) -> pd.DataFrame:
+    spread = slate["spread"].to_numpy()
+    conditions = [spread >= 10, spread >= 7, spread >= 3.5]
+    confidence = np.select(conditions, ["MEDIUM", "MEDIUM", "HIGH"], default="MEDIUM")
+    probability = np.select(conditions, [0.55, 0.55, 0.60], default=0.538)
+    predicted_cover = np.zeros(len(slate), dtype=bool)
+    # Published probability is confidence in the favorite covering
+    return _result(slate, predicted_cover, confidence, probability, 1.0 - probability)
+
+
+def model_c_spread_rules(slate: pd.DataFrame) -> pd.DataFrame:
+    spread = slate["spread_line"].to_numpy()
+    home_fav = slate["favorite_is_home"].to_numpy()
+    conditions = [
+        (spread >= -3.5) & (spread <= -2.5) & home_fav,  # Rule 1: home favorite -2.5 to -3.5
+        (spread >= -3.5) & (spread <= -1.0),             # Rule 2: favorite -1 to -3.5
+    ]
+    predicted_cover = np.select(conditions, [False, False], default=True).astype(bool)
+    probability = np.select(conditions, [0.65, 0.60], default=0.45)
+    confidence = np.select(conditions, ["HIGH", "HIGH"], default="LOW")
+    rule = np.select(conditions, ["Home Favorite -2.5 to -3.5", "Favorite -1 to -3.5"], default="Default Underdog")
+    cover_prob = np.where(predicted_cover, probability, 1.0 - probability)
+    return _result(slate, predicted_cover, confidence, probability, cover_prob, rule)
+
+
+# -----------------------------
+# Model D: spread/total bands
+# -----------------------------
+
+def model_d(slate: pd.DataFrame) -> pd.DataFrame:
+    spread = slate["spread"].to_numpy()
+    conditions = [spread >= 7, spread >= 3.5, spread < 3]
+    predicted_cover = np.select(conditions, [True, True, False], default=True).astype(bool)
+    confidence = np.select(conditions, ["HIGH", "HIGH", "HIGH"], default="LOW")
+    nan = np.full(len(slate), np.nan)
+    return _result(slate, predicted_cover, confidence, nan, nan)
+
+
+def model_d_total_rules(slate: pd.DataFrame) -> pd.DataFrame:
+    total = slate["total_line"].to_numpy()
+    spread = slate["spread"].to_numpy()
+    conditions = [
+        (total >= 46.0) & (spread <= 6.5),  # Rule 1: high total + small spread = favorite
+        total <= 45.5,                       # Rule 2: low total = underdog
+    ]
+    predicted_cover = np.select(conditions, [False, True], default=True).astype(bool)
+    probability = np.select(conditions, [0.65, 0.60], default=0.45)
+    confidence = np.select(conditions, ["HIGH", "HIGH"], default="LOW")
+    rule = np.select(conditions, ["High Total + Small Spread = Favorite", "Low Total = Underdog"], default="Default Underdog")
+    cover_prob = np.where(predicted_cover, probability, 1.0 - probability)
+    return _result(slate, predicted_cover, confidence, probability, cover_prob, rule)
+
+
+MODELS: Dict[str, Callable[[pd.DataFrame], pd.DataFrame]] = {
+    "A": model_a,
+    "B": model_b,
+    "C": model_c,
+    "D": model_d,
+    "C_spread_rules": model_c_spread_rules,
+    "D_total_rules": model_d_total_rules,
+}
+
+
+def run_models(slate: pd.DataFrame, models: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Score a slate with several models; returns the slate with
+    model_{name}_{prediction,confidence,probability,cover_prob,...} columns added.
+    """
+    models = models or ["A", "B", "C", "D"]
+    blocks = [slate]
+    for name in models:
+        out = MODELS[name](slate)
+        blocks.append(out.add_prefix(f"model_{name.lower()}_"))
+    return pd.concat(blocks, axis=1)
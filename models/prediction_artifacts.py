@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Typed prediction artifacts (parquet) for every model and week.
+
+The per-model CSVs (models/model_*/model_*_week*_predictions.csv,
+week7/model_*_week7_predictions.csv) and the combined tables
+(predictions/week*_predictions_final.csv, models/week6_all_models_predictions.csv)
+each use their own column names and store probabilities as strings like "55.6%".
+This module normalizes all of them into one long table, one row per
+(season, week, model, game):
+
+    game, away_team, home_team, favorite, underdog   nflverse abbreviations ("SEA @ ARI"),
+                                                     whatever spelling the source used
+    spread, total                                    float (spread as a positive favorite line)
+    predicted_cover                                  bool, underdog covers
+    confidence                                       ordered categorical (VERY_LOW .. VERY_HIGH)
+    probability                                      float in [0, 1], NaN when the model has none
+    source, schema_version
+
+Artifacts are stored as a hive-partitioned parquet dataset:
+    <root>/season=2025/week=7/model=A/predictions.parquet
+
+read_predictions() is a single dataset scan with season/week/model filters
+pushed down to the partition paths, so aggregating every week is one read.
+
+Environment overrides:
+    NFL_PREDICTIONS_DIR   artifact root (default: data/predictions)
+
+Usage:
+    python3 models/prediction_artifacts.py import   # convert the legacy CSVs once
+    python3 models/prediction_artifacts.py          # summary per week and model
+"""
+
+import glob
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPO_ROOT, "scripts"))
+
+from team_registry import normalize_team
+
+DEFAULT_ROOT = os.path.join(REPO_ROOT, "data", "predictions")
+
+SCHEMA_VERSION = 2
+DEFAULT_SEASON = 2025
+CONFIDENCE_LEVELS = ["VERY_LOW", "LOW", "MEDIUM", "HIGH", "VERY_HIGH"]
+CONFIDENCE_DTYPE = pd.CategoricalDtype(CONFIDENCE_LEVELS, ordered=True)
+
+COLUMNS = [
+    "game", "away_team", "home_team", "favorite", "underdog", "spread", "total",
+    "predicted_cover", "confidence", "probability", "source", "schema_version",
+]
+PARTITION_COLS = ["season", "week", "model"]
+
+# Legacy CSVs not covered by LEGACY_MODEL_GLOBS: (path relative to the repo root, week,
+# model or None for combined tables)
+LEGACY_ARTIFACTS = [
+    ("predictions/week3_predictions_final.csv", 3, "A"),
+    ("predictions/week4_predictions_final.csv", 4, None),
+    ("predictions/week5_predictions_final.csv", 5, None),
+    ("predictions/week6_predictions_final.csv", 6, None),
+    ("models/week6_all_models_predictions.csv", 6, None),
+    ("predictions/week7_predictions_final.csv", 7, None),
+]
+
+# Per-model CSVs; model and week come from the file name. Later patterns win for
+# the same (week, model): the week folders hold the published runs.
+LEGACY_MODEL_GLOBS = [
+    "models/model_*/model_*_week*_predictions.csv",
+    "week*/model_*_week*_predictions.csv",
+]
+
+# model_<model>[_<variant>]_week<N>[_<suffix>]_predictions.csv; a suffix starting with
+# "updated" marks an updated model (model_c_week4_updated -> C_updated)
+_MODEL_FILE = re.compile(r"^model_(?P<model>[a-z0-9_]+?)_week(?P<week>\d+)(?:_(?P<suffix>[a-z0-9_]+?))?_predictions\.csv$")
+
+_WIDE_COLUMN = re.compile(r"^model_([a-z0-9]+(?:_v2)?)_(pred|prediction|conf|confidence|prob|probability)$", re.IGNORECASE)
+_WIDE_FIELDS = {"pred": "prediction", "prediction": "prediction", "conf": "confidence",
+                "confidence": "confidence", "prob": "probability", "probability": "probability"}
+
+
+def default_root() -> str:
+    return os.environ.get("NFL_PREDICTIONS_DIR", DEFAULT_ROOT)
+
+
+# -----------------------------
+# Parsing legacy values
+# -----------------------------
+
+def parse_probability(values: pd.Series) -> pd.Series:
+    """Floats in [0, 1] from 0.556, "55.6%" or "55.6" style values (NaN when missing)."""
+    if pd.api.types.is_numeric_dtype(values):
+        probs = values.astype("float64")
+    else:
+        text = values.astype("string").str.strip()
+        percent = text.str.endswith("%").fillna(False).to_numpy(dtype=bool)
+        probs = pd.to_numeric(text.str.rstrip("%"), errors="coerce").astype("float64")
+        probs[percent] = probs[percent] / 100.0
+    return probs.where(probs <= 1.0, probs / 100.0)
+
+
+def parse_predicted_cover(values: pd.Series) -> pd.Series:
+    """True when the underdog is predicted to cover ("Cover", True, "True", "Yes")."""
+    if pd.api.types.is_bool_dtype(values):
+        return values.astype(bool)
+    text = values.astype("string").str.strip().str.lower()
+    return text.isin(["cover", "true", "yes", "1", "underdog"]).fillna(False).astype(bool)
+
+
+def parse_confidence(values: pd.Series) -> pd.Series:
+    text = values.astype("string").str.strip().str.upper().str.replace(" ", "_", regex=False)
+    return text.astype(object).where(text.notna(), None).astype(CONFIDENCE_DTYPE)
+
+
+def _first(df: pd.DataFrame, *names: str) -> Optional[pd.Series]:
+    for name in names:
+        if name in df.columns:
+            return df[name]
+    return None
+
+
+def _teams(values: pd.Series) -> pd.Series:
+    """nflverse abbreviations for any team spelling (unknown values pass through)."""
+    return normalize_team(values.astype(object).where(values.notna(), None)).astype("string")
+
+
+def _split_game(game: pd.Series) -> pd.DataFrame:
+    parts = game.astype("string").str.split(" @ ", n=1, expand=True)
+    return parts.reindex(columns=[0, 1]).rename(columns={0: "away_team", 1: "home_team"})
+
+
+# -----------------------------
+# Normalization
+# -----------------------------
+
+def to_artifact(df: pd.DataFrame, source: Optional[str] = None) -> pd.DataFrame:
+    """
+    Normalize one model's predictions into the artifact schema.
+
+    Accepts the per-model CSV layout (away_team, home_team, favorite_team,
+    underdog_team, spread_line, total_line, predicted_cover, confidence,
+    cover_probability / probability) and the per-model slices of the combined
+    tables (Game, Favorite, Underdog, Spread, Total, prediction, confidence,
+    probability). Team columns are normalized to nflverse abbreviations
+    (team_registry) so artifacts from either layout join on team.
+    """
+    n = len(df)
+    away, home = _first(df, "away_team"), _first(df, "home_team")
+    if away is None or home is None:
+        split = _split_game(_first(df, "Game", "game"))
+        away, home = split["away_team"], split["home_team"]
+    away, home = _teams(away), _teams(home)
+    game = away + " @ " + home
+
+    prediction = _first(df, "predicted_cover", "prediction")
+    probability = _first(df, "cover_probability", "probability")
+    confidence = _first(df, "confidence")
+    spread = _first(df, "spread_line", "Spread", "spread")
+    total = _first(df, "total_line", "Total", "total")
+
+    out = pd.DataFrame({
+        "game": game.to_numpy(),
+        "away_team": away.to_numpy(),
+        "home_team": home.to_numpy(),
+        "favorite": _teams(_first(df, "favorite_team", "Favorite")).to_numpy(),
+        "underdog": _teams(_first(df, "underdog_team", "Underdog")).to_numpy(),
+        "spread": pd.to_numeric(spread, errors="coerce").abs().to_numpy(dtype="float64") if spread is not None else np.nan,
+        "total": pd.to_numeric(total, errors="coerce").to_numpy(dtype="float64") if total is not None else np.nan,
+        "predicted_cover": parse_predicted_cover(prediction).to_numpy(),
+        "confidence": parse_confidence(confidence) if confidence is not None else pd.Categorical([None] * n, dtype=CONFIDENCE_DTYPE),
+        "probability": parse_probability(probability).to_numpy() if probability is not None else np.nan,
+    }, index=range(n))
+    out["confidence"] = out["confidence"].astype(CONFIDENCE_DTYPE)
+    out["source"] = source
+    out["schema_version"] = SCHEMA_VERSION
+    return out[COLUMNS]
+
+
+def split_wide(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Per-model frames from a combined table (Model_A_Pred/_Conf/_Prob or model_a_prediction/... columns)."""
+    shared = [c for c in df.columns if not _WIDE_COLUMN.match(c)]
+    fields: Dict[str, Dict[str, str]] = {}
+    for col in df.columns:
+        match = _WIDE_COLUMN.match(col)
+        if match:
+            model = match.group(1).upper().replace("_V2", "_v2")
+            fields.setdefault(model, {})[col] = _WIDE_FIELDS[match.group(2).lower()]
+    return {model: df[shared + list(cols)].rename(columns=cols) for model, cols in fields.items()}
+
+
+# -----------------------------
+# Dataset I/O
+# -----------------------------
+
+def _partition_dir(root: str, season: int, week: int, model: str) -> str:
+    return os.path.join(root, f"season={int(season)}", f"week={int(week)}", f"model={model}")
+
+
+def write_predictions(df: pd.DataFrame, week: int, model: str, season: int = DEFAULT_SEASON,
+                      source: Optional[str] = None, root: Optional[str] = None) -> str:
+    """Normalize and store one model's predictions for a week, replacing any earlier artifact."""
+    artifact = df if list(df.columns) == COLUMNS else to_artifact(df, source=source)
+    directory = _partition_dir(root or default_root(), season, week, model)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "predictions.parquet")
+    tmp_path = f"{path}.tmp"
+    artifact.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_combined(df: pd.DataFrame, week: int, season: int = DEFAULT_SEASON,
+                   source: Optional[str] = None, root: Optional[str] = None) -> List[str]:
+    """Store every model found in a combined (wide) predictions table."""
+    return [write_predictions(frame, week, model, season=season, source=source, root=root)
+            for model, frame in split_wide(df).items()]
+
+
+def _dataset(root: str):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    partitioning = ds.partitioning(
+        pa.schema([("season", pa.int16()), ("week", pa.int8()), ("model", pa.string())]), flavor="hive")
+    return ds.dataset(root, format="parquet", partitioning=partitioning)
+
+
+def read_predictions(
+    weeks: Optional[Iterable[int]] = None,
+    models: Optional[Iterable[str]] = None,
+    season: Optional[Union[int, Iterable[int]]] = DEFAULT_SEASON,
+    columns: Optional[List[str]] = None,
+    root: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Read artifacts for any combination of weeks and models in one dataset scan.
+
+    Filters on season/week/model only open the matching partitions. Returns the
+    partition columns followed by the artifact schema (or `columns`).
+    """
+    import pyarrow.dataset as ds
+
+    root = root or default_root()
+    if not os.path.isdir(root):
+        return _empty_frame()
+
+    expression = None
+    for name, values in (("season", season), ("week", weeks), ("model", models)):
+        if values is None:
+            continue
+        values = [values] if isinstance(values, (int, str)) else list(values)
+        term = ds.field(name).isin(values)
+        expression = term if expression is None else expression & term
+
+    wanted = PARTITION_COLS + [c for c in (columns or COLUMNS) if c not in PARTITION_COLS]
+    table = _dataset(root).to_table(columns=wanted, filter=expression)
+    df = table.to_pandas()
+    df["confidence"] = df["confidence"].astype(CONFIDENCE_DTYPE) if "confidence" in df.columns else None
+    df["model"] = df["model"].astype("category")
+    return df.sort_values(PARTITION_COLS, kind="stable").reset_index(drop=True)
+
+
+def _empty_frame() -> pd.DataFrame:
+    df = pd.DataFrame(columns=PARTITION_COLS + COLUMNS)
+    return df.astype({"confidence": CONFIDENCE_DTYPE, "probability": "float64", "predicted_cover": "bool"})
+
+
+def legacy_model_file(rel_path: str) -> Optional[tuple]:
+    """(week, model) parsed from a per-model prediction CSV name, or None if it does not match."""
+    match = _MODEL_FILE.match(os.path.basename(rel_path))
+    if match is None:
+        return None
+    head, _, variant = match["model"].partition("_")
+    model = head.upper() + (f"_{variant}" if variant else "")
+    if match["suffix"] and match["suffix"].startswith("updated"):
+        model += "_updated"
+    return int(match["week"]), model
+
+
+def legacy_artifacts() -> List[tuple]:
+    """Every legacy CSV as (path, week, model): LEGACY_ARTIFACTS, then the globbed per-model files."""
+    artifacts = list(LEGACY_ARTIFACTS)
+    for pattern in LEGACY_MODEL_GLOBS:
+        for path in sorted(glob.glob(os.path.join(REPO_ROOT, pattern))):
+            rel_path = os.path.relpath(path, REPO_ROOT)
+            parsed = legacy_model_file(rel_path)
+            if parsed is not None:
+                artifacts.append((rel_path, *parsed))
+    return artifacts
+
+
+def import_legacy(root: Optional[str] = None, season: int = DEFAULT_SEASON) -> List[str]:
+    """Convert the checked-in prediction CSVs into artifacts (combined tables first, model files win)."""
+    written = []
+    imported = {}
+    for rel_path, week, model in sorted(legacy_artifacts(), key=lambda a: a[2] is not None):
+        path = os.path.join(REPO_ROOT, rel_path)
+        if not os.path.exists(path):
+            print(f"❌ Missing {rel_path}; skipping")
+            continue
+        df = pd.read_csv(path)
+        if model is None:
+            written += write_combined(df, week, season=season, source=rel_path, root=root)
+        else:
+            if (week, model) in imported:
+                print(f"⚠️  {rel_path} replaces {imported[(week, model)]} for week {week} model {model}")
+            imported[(week, model)] = rel_path
+            written.append(write_predictions(df, week, model, season=season, source=rel_path, root=root))
+        print(f"✅ Imported {rel_path} (week {week})")
+    return written
+
+
+def summary(df: pd.DataFrame) -> pd.DataFrame:
+    """Games, cover picks, mean probability and high-confidence count per week and model."""
+    high = df["confidence"] >= "HIGH"
+    return (df.assign(high_confidence=high)
+              .groupby(["season", "week", "model"], observed=True)
+              .agg(games=("game", "size"), cover_picks=("predicted_cover", "sum"),
+                   mean_probability=("probability", "mean"), high_confidence=("high_confidence", "sum"))
+              .round(3)
+              .reset_index())
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", choices=["import", "list"], default="list")
+    parser.add_argument("--season", type=int, default=DEFAULT_SEASON)
+    args = parser.parse_args()
+
+    if args.command == "import":
+        written = import_legacy(season=args.season)
+        print(f"\n✅ Wrote {len(written)} prediction artifacts under {default_root()}")
+
+    df = read_predictions(season=args.season)
+    print(f"\n=== Prediction artifacts ({len(df)} rows) ===")
+    if len(df):
+        print(summary(df).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
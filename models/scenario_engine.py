@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Batch evaluation of lineup / injury scenarios through Models A-D.
+
+Replaces forking a model script per injury (week3/week3_model_browning_adjusted.py):
+a slate is built and scored once, and every scenario is a list of
+player-availability overrides applied on top of it:
+
+    {"team": "CIN", "qb_out": "J.Burrow", "qb_in": "J.Browning"}   # QB change via scripts/qb_epa_index.py
+    {"team": "CIN", "qb_in": "J.Browning"}                           # qb_out defaults to the starter
+    {"team": "CIN", "qb_in": "J.Browning", "qb_share": 0.5}          # Browning expected to take half the snaps
+    {"team": "SF", "epa": {"epa_def_allowed_per_play": 0.03}}        # direct EPA shift (e.g. a pass rusher out)
+
+Each scenario turns into a (32, k) team EPA delta; only games involving a
+changed team are copied, shifted and re-scored, and the affected rows of all
+scenarios go through each model in one stacked run_models() call. QB deltas
+are cached per (team, out, in, share), so a QB change shared by many inactive
+combinations is computed once.
+
+evaluate() returns one row per (scenario, game, model) including the
+unchanged baseline, with `changed` marking picks or confidences that moved.
+
+Usage:
+    python3 models/scenario_engine.py --scenarios scenarios.json
+    python3 models/scenario_engine.py --scenarios inactives.json --combinations --max-size 3
+
+scenarios.json maps scenario names to override lists; with --combinations it
+maps inactive labels to single overrides and every subset is evaluated.
+"""
+
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(MODELS_DIR)
+sys.path.append(MODELS_DIR)
+sys.path.append(os.path.join(REPO_ROOT, "scripts"))
+
+from model_engine import EPA_COLUMNS, build_slate, run_models
+from team_registry import TEAM_ABBRS, TEAM_IDS, resolve_team, take_by_team, team_ids
+
+DEFAULT_MODELS = ["A", "B", "C", "D"]
+OUTPUT_COLUMNS = ["prediction", "predicted_cover", "confidence", "cover_prob"]
+BASELINE_COLUMNS = ["predicted_cover", "confidence", "cover_prob"]
+GAME_COLUMNS = ["away_team", "home_team", "favorite_team", "underdog_team", "spread_line"]
+
+# qb_epa_index vector order -> slate EPA columns
+QB_EPA_COLUMNS = ["epa_off_per_play", "epa_pass_off", "epa_rush_off"]
+
+Override = Mapping[str, object]
+
+
+def inactive_combinations(candidates: Mapping[str, Override], max_size: Optional[int] = None) -> Dict[str, List[Override]]:
+    """Every non-empty subset of `candidates` (label -> override) up to `max_size`, as named scenarios."""
+    labels = list(candidates)
+    max_size = max_size or len(labels)
+    scenarios = {}
+    for size in range(1, max_size + 1):
+        for combo in itertools.combinations(labels, size):
+            scenarios[" + ".join(combo)] = [candidates[label] for label in combo]
+    return scenarios
+
+
+class ScenarioEngine:
+    """One weekly slate scored once, with scenario overrides re-scored on affected games only."""
+
+    def __init__(self, odds: pd.DataFrame, epa_data: pd.DataFrame, models: Optional[Sequence[str]] = None,
+                 qb_index=None):
+        self.models = list(models or DEFAULT_MODELS)
+        self.slate = build_slate(odds, epa_data).reset_index(drop=True)
+        self.baseline = run_models(self.slate, self.models)
+        self._dog_ids = team_ids(self.slate["underdog_abbr"])
+        self._fav_ids = team_ids(self.slate["favorite_abbr"])
+        self._qb_index = qb_index
+        self._qb_deltas: Dict[tuple, np.ndarray] = {}
+
+    # -----------------------------
+    # Overrides -> team EPA deltas
+    # -----------------------------
+
+    def _qb_delta(self, team: str, qb_in: str, qb_out: Optional[str], share: float = 1.0) -> np.ndarray:
+        key = (team, qb_in, qb_out, share)
+        if key not in self._qb_deltas:
+            if self._qb_index is None:
+                from qb_epa_index import get_qb_epa_index
+                self._qb_index = get_qb_epa_index()
+            self._qb_deltas[key] = self._qb_index.delta(team, qb_in, qb_out, share)
+        return self._qb_deltas[key]
+
+    def team_deltas(self, overrides: Sequence[Override]) -> np.ndarray:
+        """(33, len(EPA_COLUMNS)) EPA shifts by team id; the last row (unknown team) stays zero."""
+        delta = np.zeros((len(TEAM_ABBRS) + 1, len(EPA_COLUMNS)))
+        for override in overrides:
+            team = resolve_team(override["team"])
+            if team is None:
+                raise ValueError(f"Unknown team in scenario override: {override!r}")
+            t = TEAM_IDS[team]
+            if "qb_in" in override:
+                qb = self._qb_delta(team, str(override["qb_in"]), override.get("qb_out"),
+                                    float(override.get("qb_share", 1.0)))
+                for col, value in zip(QB_EPA_COLUMNS, qb):
+                    delta[t, EPA_COLUMNS.index(col)] += value
+            for col, value in dict(override.get("epa", {})).items():
+                if col not in EPA_COLUMNS:
+                    raise ValueError(f"Unknown EPA column {col!r} (expected one of {EPA_COLUMNS})")
+                delta[t, EPA_COLUMNS.index(col)] += float(value)
+        return np.nan_to_num(delta)
+
+    # -----------------------------
+    # Evaluation
+    # -----------------------------
+
+    def _long(self, wide: pd.DataFrame) -> pd.DataFrame:
+        blocks = []
+        for name in self.models:
+            prefix = f"model_{name.lower()}_"
+            block = wide[["scenario", "game"] + GAME_COLUMNS].copy()
+            block["model"] = name
+            for col in OUTPUT_COLUMNS:
+                block[col] = wide[prefix + col].to_numpy()
+            for col in BASELINE_COLUMNS:
+                block[f"baseline_{col}"] = wide[f"baseline_{prefix}{col}"].to_numpy()
+            blocks.append(block)
+        return pd.concat(blocks, ignore_index=True)
+
+    def evaluate(self, scenarios: Mapping[str, Sequence[Override]]) -> pd.DataFrame:
+        """
+        Score every scenario; returns (scenario, game, model) rows with the
+        scenario pick next to the baseline pick and a `changed` flag.
+        """
+        names = ["baseline"] + [name for name in scenarios if name != "baseline"]
+        n_games = len(self.slate)
+        model_cols = [f"model_{m.lower()}_{c}" for m in self.models for c in OUTPUT_COLUMNS]
+
+        # Shift and stack only the affected games of every scenario
+        shifted, positions = [], []
+        for i, name in enumerate(names[1:], start=1):
+            delta = self.team_deltas(scenarios[name])
+            dog, fav = take_by_team(delta, self._dog_ids), take_by_team(delta, self._fav_ids)
+            affected = (dog != 0).any(axis=1) | (fav != 0).any(axis=1)
+            if not affected.any():
+                continue
+            rows = self.slate[affected].copy()
+            for j, col in enumerate(EPA_COLUMNS):
+                rows[f"dog_{col}"] = rows[f"dog_{col}"].to_numpy() + dog[affected, j]
+                rows[f"fav_{col}"] = rows[f"fav_{col}"].to_numpy() + fav[affected, j]
+            shifted.append(rows)
+            positions.append(i * n_games + np.flatnonzero(affected))
+
+        # Baseline repeated per scenario, affected rows replaced by one stacked re-score
+        base = self.baseline[model_cols].reset_index(drop=True)
+        wide = pd.concat([base] * len(names), ignore_index=True)
+        if shifted:
+            rescored = run_models(pd.concat(shifted, ignore_index=True), self.models)[model_cols]
+            wide.iloc[np.concatenate(positions)] = rescored.to_numpy()
+        for name in self.models:
+            for col in BASELINE_COLUMNS:
+                source = f"model_{name.lower()}_{col}"
+                wide[f"baseline_{source}"] = np.tile(base[source].to_numpy(), len(names))
+        wide["scenario"] = np.repeat(names, n_games)
+        wide["game"] = np.tile(np.arange(n_games), len(names))
+        for col in GAME_COLUMNS:
+            wide[col] = np.tile(self.slate[col].to_numpy(), len(names))
+
+        out = self._long(wide)
+        out["predicted_cover"] = out["predicted_cover"].astype("boolean")
+        out["changed"] = (
+            (out["predicted_cover"] != out["baseline_predicted_cover"].astype("boolean")).fillna(False)
+            | (out["confidence"].astype(object) != out["baseline_confidence"].astype(object))
+        ).astype(bool)
+        out["cover_prob_change"] = (
+            pd.to_numeric(out["cover_prob"], errors="coerce") - pd.to_numeric(out["baseline_cover_prob"], errors="coerce")
+        )
+        return out
+
+
+def changes(results: pd.DataFrame) -> pd.DataFrame:
+    """Only the (scenario, game, model) rows whose pick or confidence moved."""
+    return results[results["changed"]].reset_index(drop=True)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--odds", default=os.path.join(REPO_ROOT, "schedule", "week6_2025_odds.csv"))
+    parser.add_argument("--epa", default=os.path.join(REPO_ROOT, "detailed_epa_data.csv"))
+    parser.add_argument("--scenarios", required=True, help="JSON file of scenarios (or inactives with --combinations)")
+    parser.add_argument("--combinations", action="store_true", help="evaluate every subset of the listed inactives")
+    parser.add_argument("--max-size", type=int, help="largest inactive combination (with --combinations)")
+    parser.add_argument("--models", default=",".join(DEFAULT_MODELS))
+    parser.add_argument("--output", help="write all scenario rows to this CSV")
+    args = parser.parse_args()
+
+    with open(args.scenarios) as f:
+        spec = json.load(f)
+    scenarios = inactive_combinations(spec, args.max_size) if args.combinations else spec
+
+    start = time.perf_counter()
+    engine = ScenarioEngine(pd.read_csv(args.odds), pd.read_csv(args.epa), models=args.models.split(","))
+    results = engine.evaluate(scenarios)
+    elapsed = time.perf_counter() - start
+
+    moved = changes(results)
+    print(f"✅ Evaluated {len(scenarios)} scenarios x {len(engine.slate)} games x {len(engine.models)} models in {elapsed:.2f}s")
+    if moved.empty:
+        print("No picks or confidence levels changed")
+    else:
+        cols = ["scenario", "model", "underdog_team", "favorite_team", "baseline_predicted_cover", "predicted_cover",
+                "baseline_confidence", "confidence", "cover_prob_change"]
+        print(f"\n=== {len(moved)} changed picks ===")
+        print(moved[cols].round(3).to_string(index=False))
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"Saved {len(results)} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
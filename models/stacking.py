@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Learned stacking layer over Models A-D.
+
+Instead of counting votes ("3/4 models predict UNDERDOG cover"), a logistic
+regression on the historical backtest table (models/backtest_runner.py) learns
+how much each model's pick is worth at each of its confidence tiers. Every game
+is one row of the design matrix:
+
+    <model>:<tier>   +1 when the model picks the underdog at that confidence,
+                     -1 when it picks the favorite, 0 otherwise
+    <model>:logit    logit of the model's cover_prob (0 when it has no pick)
+
+so the fitted coefficients are per-model weights with a per-tier calibration
+on top. Inference over a slate is build the design matrix, then one matrix
+multiply and a sigmoid (StackingModel.predict), cheap enough to recompute on
+every line move.
+
+Fitting is walk-forward by season: the out-of-fold probability for season s
+comes from a fresh fit on seasons < s, so it does not depend on which other
+folds came from the cache. Out-of-fold predictions are cached per season under
+a key hashed from the design rows of every season up to s, the models and C,
+so a refit after adding a new season re-solves only that season's fold and the
+final model.
+
+Environment overrides:
+    NFL_STACKING_DIR    stacker weights and out-of-fold cache (default: data/stacking)
+
+Usage:
+    python3 models/stacking.py fit                          # every season in data/backtest_results.parquet
+    python3 models/stacking.py fit --C 0.5 --models A,B,C
+    python3 models/stacking.py show
+    python3 models/stacking.py predict --odds schedule/week7_2025_odds.csv
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(MODELS_DIR)
+sys.path.append(MODELS_DIR)
+sys.path.append(os.path.join(REPO_ROOT, "scripts"))
+
+from backtest_runner import DEFAULT_OUTPUT as BACKTEST_PATH
+from model_engine import _result, build_slate, run_models
+from prediction_artifacts import CONFIDENCE_LEVELS
+
+STACKING_DIR = os.environ.get("NFL_STACKING_DIR", os.path.join(REPO_ROOT, "data", "stacking"))
+DEFAULT_WEIGHTS_PATH = os.path.join(STACKING_DIR, "stacker.npz")
+DEFAULT_OOF_PATH = os.path.join(STACKING_DIR, "oof_predictions.parquet")
+DEFAULT_MODELS = ["A", "B", "C", "D"]
+PROB_CLIP = 0.02
+
+GAME_KEY = ["season", "week", "game_id"]
+PICK_COLUMNS = ("prediction", "confidence", "cover_prob")
+
+_default_stacker = None
+
+
+# -----------------------------
+# Design matrix
+# -----------------------------
+
+def feature_names(models: Sequence[str]) -> List[str]:
+    return [f"{m}:{tier}" for m in models for tier in CONFIDENCE_LEVELS + ["logit"]]
+
+
+def design_matrix(scored: pd.DataFrame, models: Sequence[str]) -> np.ndarray:
+    """
+    (n_games, len(feature_names(models))) float matrix from run_models()-style
+    columns (model_<m>_prediction / _confidence / _cover_prob).
+    """
+    n, width = len(scored), len(CONFIDENCE_LEVELS) + 1
+    X = np.zeros((n, width * len(models)))
+    rows = np.arange(n)
+    for i, m in enumerate(models):
+        prefix = f"model_{m.lower()}_"
+        offset = i * width
+        prediction = scored[prefix + "prediction"].astype(object).to_numpy()
+        sign = np.select([prediction == "Cover", prediction == "No Cover"], [1.0, -1.0], default=0.0)
+        tier = pd.Categorical(scored[prefix + "confidence"].astype(object), categories=CONFIDENCE_LEVELS).codes
+        tiered = tier >= 0
+        X[rows[tiered], offset + tier[tiered]] = sign[tiered]
+        prob = np.clip(pd.to_numeric(scored[prefix + "cover_prob"], errors="coerce").to_numpy(dtype="float64"),
+                       PROB_CLIP, 1 - PROB_CLIP)
+        X[:, offset + width - 1] = np.nan_to_num(np.log(prob / (1 - prob))) * (sign != 0)
+    return X
+
+
+def backtest_table(backtest: pd.DataFrame, models: Sequence[str]) -> pd.DataFrame:
+    """Long backtest results -> one row per game with model_<m>_* columns and the outcome."""
+    df = backtest[backtest["model"].astype(str).isin(list(models))]
+    outcome = df.groupby(GAME_KEY, observed=True)[["underdog_covered", "push"]].first()
+    wide = (
+        df.assign(model=df["model"].astype(str))
+          .set_index(GAME_KEY + ["model"])[list(PICK_COLUMNS)]
+          .astype({"prediction": object, "confidence": object})
+          .unstack("model")
+    )
+    wide = wide.reindex(columns=pd.MultiIndex.from_product([list(PICK_COLUMNS), list(models)]))
+    wide.columns = [f"model_{m.lower()}_{col}" for col, m in wide.columns]
+    return outcome.join(wide).reset_index().sort_values(GAME_KEY).reset_index(drop=True)
+
+
+def training_data(backtest: pd.DataFrame, models: Sequence[str]) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """(games, X, y) for every graded, push-free backtest game."""
+    table = backtest_table(backtest, models)
+    table = table[(table["push"] == 0) & table["underdog_covered"].notna()].reset_index(drop=True)
+    return table[GAME_KEY], design_matrix(table, models), table["underdog_covered"].to_numpy(dtype=int)
+
+
+# -----------------------------
+# Model
+# -----------------------------
+
+class StackingModel:
+    """Fitted stacker: picks from `models` -> underdog cover probability."""
+
+    def __init__(self, models: Sequence[str], coef: np.ndarray, intercept: float, C: float = 1.0,
+                 seasons: Sequence[int] = ()):
+        self.models = list(models)
+        self.columns = feature_names(self.models)
+        self.coef = np.asarray(coef, dtype="float64")
+        self.intercept = float(intercept)
+        self.C = float(C)
+        self.seasons = [int(s) for s in seasons]
+        if len(self.coef) != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} coefficients for models {self.models}, got {len(self.coef)}")
+
+    @classmethod
+    def fit(cls, X: np.ndarray, y: np.ndarray, models: Sequence[str], C: float = 1.0, seasons: Sequence[int] = (),
+            clf=None) -> "StackingModel":
+        clf = clf or _classifier(C)
+        clf.fit(X, y)
+        return cls(models, clf.coef_[0], clf.intercept_[0], C=C, seasons=seasons)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Underdog cover probability for a design matrix: one matmul and a sigmoid."""
+        return 1.0 / (1.0 + np.exp(-(X @ self.coef + self.intercept)))
+
+    def predict(self, scored: pd.DataFrame) -> np.ndarray:
+        """Underdog cover probability for run_models() output."""
+        return self.predict_proba(design_matrix(scored, self.models))
+
+    def weights(self) -> pd.DataFrame:
+        """Coefficients as a model x feature table (tiers, logit)."""
+        width = len(CONFIDENCE_LEVELS) + 1
+        return pd.DataFrame(self.coef.reshape(len(self.models), width), index=self.models,
+                            columns=CONFIDENCE_LEVELS + ["logit"])
+
+    # Persistence
+
+    def save(self, path: str = DEFAULT_WEIGHTS_PATH) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".npz")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, models=np.array(self.models), coef=self.coef, intercept=self.intercept, C=self.C,
+                     seasons=np.array(self.seasons, dtype=np.int16), levels=np.array(CONFIDENCE_LEVELS))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_WEIGHTS_PATH) -> "StackingModel":
+        with np.load(path) as data:
+            if data["levels"].tolist() != CONFIDENCE_LEVELS:
+                raise ValueError(f"{path} was fitted with different confidence tiers; refit (python3 models/stacking.py fit)")
+            return cls(data["models"].tolist(), data["coef"], float(data["intercept"]), C=float(data["C"]),
+                       seasons=data["seasons"].tolist())
+
+
+def _classifier(C: float):
+    from sklearn.linear_model import LogisticRegression
+
+    return LogisticRegression(C=C, max_iter=2000)
+
+
+def get_stacker(path: str = DEFAULT_WEIGHTS_PATH) -> StackingModel:
+    """Return the process-wide fitted stacker (python3 models/stacking.py fit writes it)."""
+    global _default_stacker
+    if _default_stacker is None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No stacker at {path} (run: python3 models/stacking.py fit)")
+        _default_stacker = StackingModel.load(path)
+    return _default_stacker
+
+
+def model_stack(slate: pd.DataFrame, stacker: Optional[StackingModel] = None) -> pd.DataFrame:
+    """Stacked picks in the model_engine output format (scores the base models on the slate first)."""
+    stacker = stacker or get_stacker()
+    cover_prob = stacker.predict(run_models(slate, stacker.models))
+    edge = np.abs(cover_prob - 0.5)
+    confidence = np.select([edge >= 0.10, edge >= 0.05], ["HIGH", "MEDIUM"], default="LOW")
+    return _result(slate, cover_prob >= 0.5, confidence, cover_prob, cover_prob)
+
+
+# -----------------------------
+# Walk-forward fit with cached out-of-fold predictions
+# -----------------------------
+
+def fold_keys(games: pd.DataFrame, X: np.ndarray, y: np.ndarray, models: Sequence[str], C: float) -> dict:
+    """Cache key per season: hash of C, the models and every design row up to and including that season."""
+    h = hashlib.sha1(f"{','.join(models)}|{C!r}".encode())
+    keys = {}
+    seasons = games["season"].to_numpy()
+    for season in np.sort(np.unique(seasons)):
+        mask = seasons == season
+        h.update(np.ascontiguousarray(X[mask]).tobytes())
+        h.update(np.ascontiguousarray(y[mask]).tobytes())
+        h.update(games.loc[mask, "week"].to_numpy(dtype="int64").tobytes())
+        keys[int(season)] = h.hexdigest()[:16]
+    return keys
+
+
+def out_of_fold(
+    games: pd.DataFrame,
+    X: np.ndarray,
+    y: np.ndarray,
+    models: Sequence[str],
+    C: float = 1.0,
+    cache_path: Optional[str] = DEFAULT_OOF_PATH,
+) -> pd.DataFrame:
+    """
+    Walk-forward out-of-fold stacked probabilities (season s scored by a fit on
+    seasons < s; the first season has none). Each fold is fitted from scratch, so
+    folds whose key matches the cache are reused with identical results.
+    """
+    keys = fold_keys(games, X, y, models, C)
+    seasons = sorted(keys)
+    cached = pd.read_parquet(cache_path) if cache_path and os.path.exists(cache_path) else pd.DataFrame()
+    reuse = cached[cached["fold_key"].isin(set(keys.values()))] if len(cached) else cached
+
+    folds = [reuse] if len(reuse) else []
+    fitted = 0
+    for season in seasons[1:]:
+        if len(reuse) and (reuse["fold_key"] == keys[season]).any():
+            continue
+        train = (games["season"] < season).to_numpy()
+        test = (games["season"] == season).to_numpy()
+        if len(np.unique(y[train])) < 2:
+            continue
+        clf = _classifier(C).fit(X[train], y[train])
+        fitted += 1
+        folds.append(games[test].assign(
+            underdog_covered=y[test], stack_prob=clf.predict_proba(X[test])[:, 1], fold_key=keys[season]))
+
+    oof = pd.concat(folds, ignore_index=True) if folds else pd.DataFrame()
+    if fitted and cache_path:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        oof.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    print(f"  out-of-fold: {fitted} folds fitted, {len(seasons[1:]) - fitted} reused from cache")
+    return oof.sort_values(GAME_KEY).reset_index(drop=True) if len(oof) else oof
+
+
+def fit_stacker(
+    backtest: pd.DataFrame,
+    models: Sequence[str] = DEFAULT_MODELS,
+    C: float = 1.0,
+    cache_path: Optional[str] = DEFAULT_OOF_PATH,
+) -> Tuple[StackingModel, pd.DataFrame]:
+    """Out-of-fold predictions for evaluation plus the final stacker fitted on every season."""
+    games, X, y = training_data(backtest, models)
+    if len(np.unique(y)) < 2:
+        raise ValueError("Need graded backtest games with both outcomes to fit the stacker")
+    oof = out_of_fold(games, X, y, models, C=C, cache_path=cache_path)
+    stacker = StackingModel.fit(X, y, models, C=C, seasons=sorted(games["season"].unique()))
+    return stacker, oof
+
+
+def vote_baseline(backtest: pd.DataFrame, models: Sequence[str] = DEFAULT_MODELS) -> pd.DataFrame:
+    """Majority-vote underdog share per game (the vote-counting consensus the stacker replaces)."""
+    table = backtest_table(backtest, models)
+    votes = np.column_stack([
+        table[f"model_{m.lower()}_prediction"].map({"Cover": 1.0, "No Cover": 0.0}).astype("float64") for m in models
+    ])
+    table["vote_share"] = np.nanmean(votes, axis=1)
+    return table[GAME_KEY + ["vote_share"]]
+
+
+def summarize(oof: pd.DataFrame, backtest: Optional[pd.DataFrame] = None,
+              models: Sequence[str] = DEFAULT_MODELS) -> pd.DataFrame:
+    """Out-of-fold log loss, Brier score and ATS accuracy per season (majority-vote ATS alongside, split votes excluded)."""
+    from sklearn.metrics import brier_score_loss, log_loss
+
+    df = oof
+    if backtest is not None:
+        df = df.merge(vote_baseline(backtest, models), on=GAME_KEY, how="left")
+
+    def metrics(group: pd.DataFrame) -> pd.Series:
+        y = group["underdog_covered"].to_numpy(dtype=int)
+        p = group["stack_prob"].to_numpy()
+        row = {
+            "games": len(group),
+            "log_loss": log_loss(y, p, labels=[0, 1]),
+            "brier": brier_score_loss(y, p),
+            "stack_ats": float(((p >= 0.5) == y).mean()),
+        }
+        if "vote_share" in group.columns:
+            decided = group["vote_share"] != 0.5
+            votes = group.loc[decided, "vote_share"].to_numpy() > 0.5
+            row["vote_ats"] = float((votes == y[decided.to_numpy()]).mean()) if decided.any() else np.nan
+        return pd.Series(row)
+
+    table = pd.DataFrame({season: metrics(g) for season, g in df.groupby("season")}).T
+    table.loc["all"] = metrics(df)
+    return table.rename_axis("season").reset_index()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fit_p = sub.add_parser("fit", help="fit the stacker on the backtest table")
+    fit_p.add_argument("--backtest", default=BACKTEST_PATH)
+    fit_p.add_argument("--models", default=",".join(DEFAULT_MODELS))
+    fit_p.add_argument("--C", type=float, default=1.0, help="inverse L2 regularization strength")
+    fit_p.add_argument("--no-cache", action="store_true", help="refit every out-of-fold season")
+
+    sub.add_parser("show", help="print the fitted per-model / per-tier weights")
+
+    pred_p = sub.add_parser("predict", help="stacked cover probabilities for a slate")
+    pred_p.add_argument("--odds", default=os.path.join(REPO_ROOT, "schedule", "week6_2025_odds.csv"))
+    pred_p.add_argument("--epa", default=os.path.join(REPO_ROOT, "detailed_epa_data.csv"))
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        if not os.path.exists(args.backtest):
+            print(f"❌ No backtest table at {args.backtest} (run: python3 models/backtest_runner.py)")
+            return
+        backtest = pd.read_parquet(args.backtest)
+        models = args.models.split(",")
+        start = time.perf_counter()
+        stacker, oof = fit_stacker(backtest, models, C=args.C, cache_path=None if args.no_cache else DEFAULT_OOF_PATH)
+        path = stacker.save()
+        print(f"✅ Fitted stacker on seasons {stacker.seasons} in {time.perf_counter() - start:.2f}s -> {path}")
+        if len(oof):
+            print("\n=== Out-of-fold performance ===")
+            print(summarize(oof, backtest, models).round(4).to_string(index=False))
+        print("\n=== Weights ===")
+        print(stacker.weights().round(3).to_string())
+
+    elif args.command == "show":
+        stacker = get_stacker()
+        print(f"Stacker over {stacker.models} (C={stacker.C}, seasons {stacker.seasons}), intercept {stacker.intercept:+.3f}")
+        print(stacker.weights().round(3).to_string())
+
+    elif args.command == "predict":
+        slate = build_slate(pd.read_csv(args.odds), pd.read_csv(args.epa))
+        start = time.perf_counter()
+        out = model_stack(slate)
+        elapsed = time.perf_counter() - start
+        table = slate[["away_team", "home_team", "underdog_team", "spread_line"]].join(out[["prediction", "confidence", "cover_prob"]])
+        print(table.round(3).to_string(index=False))
+        print(f"\nScored {len(slate)} games in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Walk-forward parameter search for the Model A v2 defense bands and the Model C
+spread windows.
+
+Instead of hand-editing thresholds every week (scripts/model_a_v2_optimized.py,
+models/model_c/model_c_spread_rules.py), each model's thresholds are described
+as a search space and thousands of combinations are scored at once:
+
+- Per-season feature matrices (pre-kickoff EPA from weeks < k, lines, cover
+  and push labels) are built once from cached nflverse PBP via
+  backtest_runner and stored under data/optimizer_features/.
+- Candidates are evaluated in batches as (candidates x games) boolean pick
+  matrices, so one batch of 512 combinations costs a few array operations.
+- Large spaces are sampled at random and the search stops early once the best
+  training ATS rate has not improved for `patience` batches.
+- Every test season is one walk-forward fold: the best combination on the
+  prior seasons is scored on the held-out season. Folds run in a process pool.
+
+ATS rate = correct picks / picks, with pushes and games missing EPA excluded.
+
+Environment overrides:
+    NFL_OPTIMIZER_FEATURES_DIR   feature cache (default: data/optimizer_features)
+
+Usage:
+    python3 models/threshold_optimizer.py C_spread_rules --seasons 2012-2024
+    python3 models/threshold_optimizer.py A_v2 --seasons 2012-2024 --candidates 20000 --workers 4
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(MODELS_DIR)
+sys.path.append(MODELS_DIR)
+sys.path.append(os.path.join(REPO_ROOT, "scripts"))
+
+DEFAULT_FEATURES_DIR = os.environ.get("NFL_OPTIMIZER_FEATURES_DIR", os.path.join(REPO_ROOT, "data", "optimizer_features"))
+
+FEATURE_COLUMNS = [
+    "season", "week", "game_id", "spread", "spread_line", "total_line",
+    "favorite_is_home", "underdog_is_home",
+    "fav_epa_off_per_play", "fav_epa_def_allowed_per_play",
+    "dog_epa_off_per_play", "dog_epa_def_allowed_per_play",
+    "underdog_covered", "push",
+]
+
+
+# -----------------------------
+# Feature matrices
+# -----------------------------
+
+def build_features(season: int) -> pd.DataFrame:
+    """One row per regular season game with pre-kickoff team EPA and ATS labels."""
+    from backtest_runner import BACKTEST_PBP_COLUMNS, season_games, team_epa_before_week
+    from model_engine import build_slate
+    from pbp_cache import read_pbp
+
+    pbp = read_pbp([season], columns=BACKTEST_PBP_COLUMNS, filters={"season_type": "REG"})
+    games = season_games(pbp)
+    epa_asof = team_epa_before_week(pbp)
+    weekly = []
+    for week, week_games in games.groupby("week"):
+        epa = epa_asof[epa_asof["week"] == week].drop(columns=["week"])
+        weekly.append(build_slate(week_games, epa))
+    slate = pd.concat(weekly, ignore_index=True)
+    return slate[FEATURE_COLUMNS].astype({"favorite_is_home": bool, "underdog_is_home": bool})
+
+
+def load_features(seasons: Sequence[int], refresh: bool = False, features_dir: str = DEFAULT_FEATURES_DIR) -> pd.DataFrame:
+    """Feature matrices for `seasons`, built and cached on first use."""
+    frames = []
+    for season in seasons:
+        path = os.path.join(features_dir, f"season={season}.parquet")
+        if refresh or not os.path.exists(path):
+            os.makedirs(features_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            build_features(season).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        frames.append(pd.read_parquet(path))
+    return pd.concat(frames, ignore_index=True)
+
+
+# -----------------------------
+# Search spaces
+# -----------------------------
+
+@dataclass
+class SearchSpace:
+    """Candidate grid plus a vectorized (candidates x games) pick function."""
+    grid: Dict[str, List[float]]
+    picks: Callable[[pd.DataFrame, Dict[str, np.ndarray]], np.ndarray]   # True = underdog covers
+    baseline: Dict[str, float]
+    valid: Callable[[pd.DataFrame], np.ndarray] = lambda features: np.ones(len(features), dtype=bool)
+    constraints: List[Callable[[pd.DataFrame], np.ndarray]] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod([len(values) for values in self.grid.values()]))
+
+
+def _ordered(*names: str) -> Callable[[pd.DataFrame], np.ndarray]:
+    """Constraint: the named parameters are strictly increasing."""
+    def check(candidates: pd.DataFrame) -> np.ndarray:
+        values = candidates[list(names)].to_numpy()
+        return (np.diff(values, axis=1) > 0).all(axis=1)
+    return check
+
+
+def _model_a_v2_picks(features: pd.DataFrame, params: Dict[str, np.ndarray]) -> np.ndarray:
+    """Model A v2: favorite defense band adjustment + net EPA and spread terms (scripts/model_a_v2_optimized.py)."""
+    fav_def = features["fav_epa_def_allowed_per_play"].to_numpy()
+    dog_net = features["dog_epa_off_per_play"].to_numpy() - features["dog_epa_def_allowed_per_play"].to_numpy()
+    fav_net = features["fav_epa_off_per_play"].to_numpy() - fav_def
+    net_diff = dog_net - fav_net
+    spread = features["spread"].to_numpy()
+
+    cuts = np.stack([params[f"def_cut{i}"] for i in range(1, 5)], axis=1)                  # (K, 4)
+    band = (fav_def[None, :, None] >= cuts[:, None, :]).sum(axis=2)                        # (K, N) 0=ELITE .. 4=POOR
+    adjustments = np.stack([params[f"adj_{q}"] for q in ("elite", "strong", "average", "weak", "poor")], axis=1)
+    cover_prob = (
+        0.50
+        + np.take_along_axis(adjustments, band, axis=1)
+        + params["net_weight"][:, None] * net_diff[None, :]
+        + params["spread_weight"][:, None] * spread[None, :]
+    )
+    return cover_prob >= params["threshold"][:, None]
+
+
+def _model_a_v2_valid(features: pd.DataFrame) -> np.ndarray:
+    cols = ["fav_epa_off_per_play", "fav_epa_def_allowed_per_play", "dog_epa_off_per_play", "dog_epa_def_allowed_per_play"]
+    return features[cols].notna().all(axis=1).to_numpy()
+
+
+def _model_c_rules_picks(features: pd.DataFrame, params: Dict[str, np.ndarray]) -> np.ndarray:
+    """Model C spread rules: favorite inside either window (rule 1 home favorites only), else underdog."""
+    spread = features["spread_line"].to_numpy()[None, :]
+    home_fav = features["favorite_is_home"].to_numpy(dtype=bool)[None, :]
+    rule1 = (spread >= params["home_fav_low"][:, None]) & (spread <= params["home_fav_high"][:, None]) & home_fav
+    rule2 = (spread >= params["fav_low"][:, None]) & (spread <= params["fav_high"][:, None])
+    return ~(rule1 | rule2)
+
+
+_SPREAD_EDGES = [float(x) for x in np.arange(-7.5, -0.5, 0.5)]
+
+SEARCH_SPACES: Dict[str, SearchSpace] = {
+    "A_v2": SearchSpace(
+        grid={
+            "def_cut1": [-0.15, -0.125, -0.10, -0.075],
+            "def_cut2": [-0.06, -0.05, -0.025, 0.0],
+            "def_cut3": [0.025, 0.05, 0.075],
+            "def_cut4": [0.10, 0.125, 0.15, 0.20],
+            "adj_elite": [0.08, 0.12, 0.18],
+            "adj_strong": [0.04, 0.08, 0.12],
+            "adj_average": [0.0, 0.03, 0.05],
+            "adj_weak": [-0.03, -0.05, -0.08],
+            "adj_poor": [-0.05, -0.08, -0.15],
+            "net_weight": [0.5, 0.8, 1.0, 1.5],
+            "spread_weight": [0.004, 0.008, 0.012, 0.016],
+            "threshold": [0.50, 0.55, 0.60],
+        },
+        picks=_model_a_v2_picks,
+        baseline={
+            "def_cut1": -0.10, "def_cut2": -0.05, "def_cut3": 0.05, "def_cut4": 0.15,
+            "adj_elite": 0.12, "adj_strong": 0.08, "adj_average": 0.05, "adj_weak": -0.05, "adj_poor": -0.08,
+            "net_weight": 1.0, "spread_weight": 0.012, "threshold": 0.50,
+        },
+        valid=_model_a_v2_valid,
+        constraints=[_ordered("def_cut1", "def_cut2", "def_cut3", "def_cut4")],
+    ),
+    "C_spread_rules": SearchSpace(
+        grid={
+            "home_fav_low": _SPREAD_EDGES,
+            "home_fav_high": _SPREAD_EDGES,
+            "fav_low": _SPREAD_EDGES,
+            "fav_high": _SPREAD_EDGES,
+        },
+        picks=_model_c_rules_picks,
+        baseline={"home_fav_low": -3.5, "home_fav_high": -2.5, "fav_low": -3.5, "fav_high": -1.0},
+        constraints=[
+            lambda c: (c["home_fav_low"] <= c["home_fav_high"]).to_numpy(),
+            lambda c: (c["fav_low"] <= c["fav_high"]).to_numpy(),
+        ],
+    ),
+}
+
+
+def candidate_table(space: SearchSpace, n_candidates: Optional[int] = None, seed: int = 0) -> pd.DataFrame:
+    """
+    Parameter combinations satisfying the space constraints, in random order.
+
+    The whole grid when it fits in `n_candidates` (or n_candidates is None),
+    otherwise a uniform sample decoded from random grid indices.
+    """
+    names = list(space.grid)
+    values = [np.asarray(space.grid[name], dtype="float64") for name in names]
+    sizes = np.array([len(v) for v in values])
+    rng = np.random.default_rng(seed)
+
+    if n_candidates is None or space.size <= n_candidates:
+        combos = np.array(list(itertools.product(*values)), dtype="float64")
+        candidates = pd.DataFrame(combos, columns=names).iloc[rng.permutation(len(combos))]
+    else:
+        # Oversample, then keep the first n_candidates that pass the constraints
+        flat = rng.choice(space.size, size=min(space.size, 4 * n_candidates), replace=False)
+        digits = np.stack(np.unravel_index(flat, sizes), axis=1)
+        candidates = pd.DataFrame({name: values[i][digits[:, i]] for i, name in enumerate(names)})
+
+    keep = np.ones(len(candidates), dtype=bool)
+    for constraint in space.constraints:
+        keep &= constraint(candidates)
+    candidates = candidates[keep].reset_index(drop=True)
+    return candidates.head(n_candidates) if n_candidates else candidates
+
+
+# -----------------------------
+# Scoring
+# -----------------------------
+
+def score_candidates(space: SearchSpace, features: pd.DataFrame, candidates: pd.DataFrame) -> pd.DataFrame:
+    """Picks, hits and ATS rate for each candidate row over `features` (pushes / invalid games excluded)."""
+    graded = space.valid(features) & (features["push"].to_numpy() == 0)
+    games = features[graded]
+    covered = games["underdog_covered"].to_numpy(dtype=bool)
+    params = {name: candidates[name].to_numpy(dtype="float64") for name in space.grid}
+    picks = space.picks(games, params)
+    hits = (picks == covered[None, :]).sum(axis=1)
+    out = candidates.copy()
+    out["picks"] = len(games)
+    out["hits"] = hits
+    out["ats_rate"] = hits / max(len(games), 1)
+    return out
+
+
+def search(
+    space: SearchSpace,
+    features: pd.DataFrame,
+    n_candidates: Optional[int] = 5000,
+    batch_size: int = 512,
+    patience: Optional[int] = 8,
+    min_delta: float = 0.0,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Score candidates batch by batch; stop once the best ATS rate has not
+    improved by more than `min_delta` for `patience` batches (None = never).
+    Returns every scored candidate, best first.
+    """
+    candidates = candidate_table(space, n_candidates, seed)
+    scored, best, stale = [], -np.inf, 0
+    for start in range(0, len(candidates), batch_size):
+        batch = score_candidates(space, features, candidates.iloc[start:start + batch_size])
+        scored.append(batch)
+        batch_best = batch["ats_rate"].max()
+        if batch_best > best + min_delta:
+            best, stale = batch_best, 0
+        else:
+            stale += 1
+            if patience is not None and stale >= patience:
+                break
+    results = pd.concat(scored, ignore_index=True)
+    return results.sort_values(["ats_rate", "hits"], ascending=False, kind="stable").reset_index(drop=True)
+
+
+# -----------------------------
+# Walk-forward evaluation
+# -----------------------------
+
+def _fold_job(args) -> dict:
+    space_name, test_season, train_seasons, search_kwargs, features_dir = args
+    space = SEARCH_SPACES[space_name]
+    features = load_features(train_seasons + [test_season], features_dir=features_dir)
+    train = features[features["season"].isin(train_seasons)]
+    test = features[features["season"] == test_season]
+
+    start = time.perf_counter()
+    scored = search(space, train, **search_kwargs)
+    best = scored.iloc[[0]][list(space.grid)].reset_index(drop=True)
+    baseline = pd.DataFrame([space.baseline])
+    oos = score_candidates(space, test, best).iloc[0]
+    base = score_candidates(space, test, baseline).iloc[0]
+    return {
+        "test_season": test_season,
+        "train_seasons": f"{min(train_seasons)}-{max(train_seasons)}",
+        "evaluated": len(scored),
+        "train_ats": scored["ats_rate"].iloc[0],
+        "test_picks": int(oos["picks"]),
+        "test_ats": oos["ats_rate"],
+        "baseline_test_ats": base["ats_rate"],
+        "seconds": round(time.perf_counter() - start, 2),
+        **{name: best[name].iloc[0] for name in space.grid},
+    }
+
+
+def walk_forward(
+    space_name: str,
+    seasons: Sequence[int],
+    min_train_seasons: int = 3,
+    train_window: Optional[int] = None,
+    workers: Optional[int] = None,
+    features_dir: str = DEFAULT_FEATURES_DIR,
+    **search_kwargs,
+) -> pd.DataFrame:
+    """
+    One fold per season after the first `min_train_seasons`: search on the prior
+    seasons (the last `train_window` only, if given) and score the winner on the
+    held-out season, next to the current hard-coded thresholds.
+    """
+    seasons = sorted(seasons)
+    # Build any missing feature caches once, before the workers read them
+    load_features(seasons, features_dir=features_dir)
+    jobs = []
+    for i in range(min_train_seasons, len(seasons)):
+        train = seasons[:i] if train_window is None else seasons[max(0, i - train_window):i]
+        jobs.append((space_name, seasons[i], list(train), search_kwargs, features_dir))
+    if not jobs:
+        raise ValueError(f"Need more than {min_train_seasons} seasons for a walk-forward split")
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+
+    if workers <= 1:
+        folds = [_fold_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            folds = list(pool.map(_fold_job, jobs))
+    return pd.DataFrame(folds)
+
+
+def summarize(folds: pd.DataFrame) -> pd.Series:
+    """Pooled out-of-sample ATS rate of the searched vs hard-coded thresholds."""
+    picks = folds["test_picks"].sum()
+    return pd.Series({
+        "folds": len(folds),
+        "test_picks": picks,
+        "oos_ats": (folds["test_ats"] * folds["test_picks"]).sum() / picks,
+        "baseline_oos_ats": (folds["baseline_test_ats"] * folds["test_picks"]).sum() / picks,
+    })
+
+
+def _parse_seasons(spec: Optional[str]) -> List[int]:
+    if not spec:
+        from pbp_cache import get_pbp_cache
+        return get_pbp_cache().available_seasons()
+    seasons = []
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        seasons.extend(range(int(first), int(last or first) + 1))
+    return seasons
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("space", choices=sorted(SEARCH_SPACES))
+    parser.add_argument("--seasons", help="e.g. 2012-2024 (default: every cached season)")
+    parser.add_argument("--candidates", type=int, default=5000, help="max combinations per fold (0 = full grid)")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--patience", type=int, default=8, help="batches without improvement before stopping (0 = never)")
+    parser.add_argument("--min-train-seasons", type=int, default=3)
+    parser.add_argument("--train-window", type=int, help="train on only the last N seasons before each fold")
+    parser.add_argument("--workers", type=int, help="process pool size (default: one per fold, up to CPU count)")
+    parser.add_argument("--output", help="write the per-fold table to this CSV")
+    args = parser.parse_args()
+
+    seasons = _parse_seasons(args.seasons)
+    space = SEARCH_SPACES[args.space]
+    print(f"=== {args.space}: {space.size:,} grid points, walk-forward over {seasons} ===")
+    start = time.perf_counter()
+    folds = walk_forward(
+        args.space, seasons,
+        min_train_seasons=args.min_train_seasons,
+        train_window=args.train_window,
+        workers=args.workers,
+        n_candidates=args.candidates or None,
+        batch_size=args.batch_size,
+        patience=args.patience or None,
+    )
+    print(folds.round(4).to_string(index=False))
+    summary = summarize(folds)
+    print(f"\n✅ {len(folds)} folds in {time.perf_counter() - start:.1f}s: "
+          f"out-of-sample ATS {summary['oos_ats']:.3f} vs hard-coded {summary['baseline_oos_ats']:.3f} "
+          f"over {int(summary['test_picks'])} games")
+    if args.output:
+        folds.to_csv(args.output, index=False)
+        print(f"Saved fold table to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
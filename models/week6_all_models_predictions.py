@@ -10,9 +10,22 @@ import sys
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
 
-def load_epa_data():
-    """Load the updated EPA data"""
+from model_engine import TEAM_NAME_TO_ABBR, build_slate, model_a, model_b, model_c, model_d
+from prediction_artifacts import write_combined
+
+def load_epa_data(as_of=None):
+    """Load the updated EPA data (or the snapshot in force at `as_of`)"""
+    if as_of is not None:
+        # Point-in-time replay: latest stored snapshot taken strictly before `as_of`
+        # (the same rule as EPAAsOfIndex; naive timestamps are local time)
+        from epa_snapshot_store import get_snapshot_store
+        epa_data = get_snapshot_store().as_of(as_of, "sumersports_detailed")
+        if epa_data is None:
+            raise ValueError(f"No detailed EPA snapshot stored before {as_of}")
+        return epa_data
     # Use the corrected detailed EPA data
     epa_file = "../detailed_epa_data.csv"
     epa_data = pd.read_csv(epa_file)
@@ -20,15 +33,10 @@ def load_epa_data():
 
 def get_team_mapping():
     """Map full team names to abbreviations"""
-    return {
-        '49ers': 'SF', 'Bears': 'CHI', 'Bengals': 'CIN', 'Bills': 'BUF', 'Broncos': 'DEN',
-        'Browns': 'CLE', 'Buccaneers': 'TB', 'Cardinals': 'ARI', 'Chargers': 'LAC', 'Chiefs': 'KC',
-        'Colts': 'IND', 'Commanders': 'WAS', 'Cowboys': 'DAL', 'Dolphins': 'MIA', 'Eagles': 'PHI',
-        'Falcons': 'ATL', 'Giants': 'NYG', 'Jaguars': 'JAX', 'Jets': 'NYJ', 'Lions': 'DET',
-        'Packers': 'GB', 'Panthers': 'CAR', 'Patriots': 'NE', 'Raiders': 'LV', 'Rams': 'LA',
-        'Ravens': 'BAL', 'Saints': 'NO', 'Seahawks': 'SEA', 'Steelers': 'PIT', 'Texans': 'HOU',
-        'Titans': 'TEN', 'Vikings': 'MIN'
-    }
+    return dict(TEAM_NAME_TO_ABBR)
+
+def _format_prob(prob):
+    return prob.map(lambda p: f"{p*100:.1f}%")
 
 def run_model_a(week6_odds, epa_data):
     """Model A: SumerSports EPA-based predictions"""
@@ -37,100 +45,23 @@ def run_model_a(week6_odds, epa_data):
     print("MODEL A: SumerSports EPA Predictions")
     print("="*80)
     
-    team_mapping = get_team_mapping()
-    predictions = []
-    
-    for _, game in week6_odds.iterrows():
-        underdog = game['underdog_team']
-        favorite = game['favorite_team']
-        spread = abs(game['spread_line'])
-        
-        # Convert to abbreviations
-        underdog_abbr = team_mapping.get(underdog, underdog)
-        favorite_abbr = team_mapping.get(favorite, favorite)
-        
-        # Get EPA data
-        underdog_data = epa_data[epa_data['team'] == underdog_abbr]
-        favorite_data = epa_data[epa_data['team'] == favorite_abbr]
-        
-        if len(underdog_data) == 0 or len(favorite_data) == 0:
-            print(f"⚠️  Missing EPA data for {underdog} ({underdog_abbr}) or {favorite} ({favorite_abbr})")
-            continue
-        
-        underdog_epa_off = underdog_data['epa_off_per_play'].iloc[0]
-        underdog_epa_def = underdog_data['epa_def_allowed_per_play'].iloc[0]
-        favorite_epa_off = favorite_data['epa_off_per_play'].iloc[0]
-        favorite_epa_def = favorite_data['epa_def_allowed_per_play'].iloc[0]
-        
-        underdog_net = underdog_epa_off - underdog_epa_def
-        favorite_net = favorite_epa_off - favorite_epa_def
-        
-        # Model A logic
-        cover_prob = 0.50
-        
-        # Defense quality (favorite's defense)
-        if favorite_epa_def < -0.05:  # Strong defense
-            cover_prob += 0.12
-        elif favorite_epa_def > 0.10:  # Weak defense
-            cover_prob -= 0.10
-        else:  # Average
-            cover_prob += 0.02
-        
-        # Net EPA differential
-        net_diff = underdog_net - favorite_net
-        if net_diff > 0.10:
-            cover_prob += 0.15
-        elif net_diff > 0:
-            cover_prob += 0.08
-        elif net_diff > -0.10:
-            cover_prob -= 0.05
-        else:
-            cover_prob -= 0.15
-        
-        # Spread adjustment
-        if spread >= 10:
-            cover_prob += 0.15
-        elif spread >= 7:
-            cover_prob += 0.10
-        elif spread >= 3:
-            cover_prob += 0.05
-        
-        # Home/away adjustment (underdog is away)
-        is_underdog_away = game['away_team'] == underdog
-        if not is_underdog_away:  # Underdog at home
-            cover_prob += 0.08
-        
-        # Clamp probability
-        cover_prob = max(0.05, min(0.95, cover_prob))
-        
-        # Determine prediction and confidence
-        if cover_prob >= 0.65:
-            pred = "Cover"
-            conf = "HIGH"
-        elif cover_prob >= 0.55:
-            pred = "Cover"
-            conf = "MEDIUM"
-        elif cover_prob >= 0.45:
-            pred = "No Cover"
-            conf = "LOW"
-        elif cover_prob >= 0.35:
-            pred = "No Cover"
-            conf = "MEDIUM"
-        else:
-            pred = "No Cover"
-            conf = "HIGH"
-        
-        predictions.append({
-            'Game': f"{game['away_team']} @ {game['home_team']}",
-            'Favorite': favorite,
-            'Underdog': underdog,
-            'Spread': spread,
-            'Model_A_Pred': pred,
-            'Model_A_Conf': conf,
-            'Model_A_Prob': f"{cover_prob*100:.1f}%"
-        })
-    
-    return pd.DataFrame(predictions)
+    slate = build_slate(week6_odds, epa_data)
+    preds = model_a(slate)
+    
+    missing = preds['probability'].isna()
+    for _, game in slate[missing].iterrows():
+        print(f"⚠️  Missing EPA data for {game['underdog_team']} ({game['underdog_abbr']}) or {game['favorite_team']} ({game['favorite_abbr']})")
+    slate, preds = slate[~missing], preds[~missing]
+    
+    return pd.DataFrame({
+        'Game': slate['away_team'] + " @ " + slate['home_team'],
+        'Favorite': slate['favorite_team'],
+        'Underdog': slate['underdog_team'],
+        'Spread': slate['spread'],
+        'Model_A_Pred': preds['prediction'],
+        'Model_A_Conf': preds['confidence'],
+        'Model_A_Prob': _format_prob(preds['probability'])
+    }).reset_index(drop=True)
 
 def run_model_b(week6_odds, epa_data):
     """Model B: Matchup-specific EPA (pass/rush) predictions"""
@@ -139,92 +70,18 @@ def run_model_b(week6_odds, epa_data):
     print("MODEL B: Matchup-Specific EPA Predictions")
     print("="*80)
     
-    team_mapping = get_team_mapping()
-    predictions = []
+    slate = build_slate(week6_odds, epa_data)
+    preds = model_b(slate)
     
-    for _, game in week6_odds.iterrows():
-        underdog = game['underdog_team']
-        favorite = game['favorite_team']
-        spread = abs(game['spread_line'])
-        
-        # Convert to abbreviations
-        underdog_abbr = team_mapping.get(underdog, underdog)
-        favorite_abbr = team_mapping.get(favorite, favorite)
-        
-        # Get EPA data
-        underdog_data = epa_data[epa_data['team'] == underdog_abbr]
-        favorite_data = epa_data[epa_data['team'] == favorite_abbr]
-        
-        if len(underdog_data) == 0 or len(favorite_data) == 0:
-            continue
-        
-        # Pass matchup
-        underdog_pass_off = underdog_data['epa_pass_off'].iloc[0]
-        favorite_pass_def = favorite_data['epa_pass_def_allowed'].iloc[0]
-        pass_matchup = underdog_pass_off - favorite_pass_def
-        
-        # Rush matchup
-        underdog_rush_off = underdog_data['epa_rush_off'].iloc[0]
-        favorite_rush_def = favorite_data['epa_rush_def_allowed'].iloc[0]
-        rush_matchup = underdog_rush_off - favorite_rush_def
-        
-        # Combined matchup (weighted: 60% pass, 40% rush)
-        combined_matchup = (pass_matchup * 0.6) + (rush_matchup * 0.4)
-        
-        # Model B logic
-        cover_prob = 0.50
-        
-        # Matchup-based adjustments
-        if combined_matchup > 0.25:
-            cover_prob += 0.25
-        elif combined_matchup > 0.15:
-            cover_prob += 0.18
-        elif combined_matchup > 0.05:
-            cover_prob += 0.10
-        elif combined_matchup < -0.15:
-            cover_prob -= 0.20
-        elif combined_matchup < -0.05:
-            cover_prob -= 0.12
-        
-        # Spread adjustment
-        if spread >= 10:
-            cover_prob += 0.20
-        elif spread >= 7:
-            cover_prob += 0.15
-        elif spread >= 3:
-            cover_prob += 0.08
-        
-        # Clamp
-        cover_prob = max(0.05, min(0.95, cover_prob))
-        
-        # Determine prediction and confidence
-        if cover_prob >= 0.80:
-            pred = "Cover"
-            conf = "VERY_HIGH"
-        elif cover_prob >= 0.65:
-            pred = "Cover"
-            conf = "HIGH"
-        elif cover_prob >= 0.55:
-            pred = "Cover"
-            conf = "MEDIUM"
-        elif cover_prob >= 0.45:
-            pred = "No Cover"
-            conf = "LOW"
-        elif cover_prob >= 0.30:
-            pred = "No Cover"
-            conf = "MEDIUM"
-        else:
-            pred = "No Cover"
-            conf = "VERY_HIGH"
-        
-        predictions.append({
-            'Game': f"{game['away_team']} @ {game['home_team']}",
-            'Model_B_Pred': pred,
-            'Model_B_Conf': conf,
-            'Model_B_Prob': f"{cover_prob*100:.1f}%"
-        })
+    missing = preds['probability'].isna()
+    slate, preds = slate[~missing], preds[~missing]
     
-    return pd.DataFrame(predictions)
+    return pd.DataFrame({
+        'Game': slate['away_team'] + " @ " + slate['home_team'],
+        'Model_B_Pred': preds['prediction'],
+        'Model_B_Conf': preds['confidence'],
+        'Model_B_Prob': _format_prob(preds['probability'])
+    }).reset_index(drop=True)
 
 def run_model_c(week6_odds):
     """Model C: Spread-based rules"""
@@ -233,37 +90,15 @@ def run_model_c(week6_odds):
     print("MODEL C: Spread-Based Rules Predictions")
     print("="*80)
     
-    predictions = []
-    
-    for _, game in week6_odds.iterrows():
-        spread = abs(game['spread_line'])
-        
-        # Model C logic: Simple spread-based rules
-        if spread >= 10:
-            pred = "No Cover"
-            conf = "MEDIUM"
-            prob = 55.0
-        elif spread >= 7:
-            pred = "No Cover"
-            conf = "MEDIUM"
-            prob = 55.0
-        elif spread >= 3.5:
-            pred = "No Cover"
-            conf = "HIGH"
-            prob = 60.0
-        else:
-            pred = "No Cover"
-            conf = "MEDIUM"
-            prob = 53.8
-        
-        predictions.append({
-            'Game': f"{game['away_team']} @ {game['home_team']}",
-            'Model_C_Pred': pred,
-            'Model_C_Conf': conf,
-            'Model_C_Prob': f"{prob:.1f}%"
-        })
+    slate = build_slate(week6_odds)
+    preds = model_c(slate)
     
-    return pd.DataFrame(predictions)
+    return pd.DataFrame({
+        'Game': slate['away_team'] + " @ " + slate['home_team'],
+        'Model_C_Pred': preds['prediction'],
+        'Model_C_Conf': preds['confidence'],
+        'Model_C_Prob': _format_prob(preds['probability'])
+    }).reset_index(drop=True)
 
 def run_model_d(week6_odds):
     """Model D: Total-based rules"""
@@ -272,38 +107,17 @@ def run_model_d(week6_odds):
     print("MODEL D: Total-Based Rules Predictions")
     print("="*80)
     
-    predictions = []
-    
-    for _, game in week6_odds.iterrows():
-        spread = abs(game['spread_line'])
-        total = game['total_line']
-        
-        # Model D logic: Considers both spread and total
-        cover_prob = 0.50
-        
-        if spread >= 7:
-            pred = "Cover"
-            conf = "HIGH" if spread >= 10 else "HIGH"
-        elif spread >= 3.5:
-            pred = "Cover"
-            conf = "HIGH"
-        elif spread < 3:
-            pred = "No Cover"
-            conf = "HIGH"
-        else:
-            pred = "Cover"
-            conf = "LOW"
-        
-        predictions.append({
-            'Game': f"{game['away_team']} @ {game['home_team']}",
-            'Model_D_Pred': pred,
-            'Model_D_Conf': conf
-        })
+    slate = build_slate(week6_odds)
+    preds = model_d(slate)
     
-    return pd.DataFrame(predictions)
+    return pd.DataFrame({
+        'Game': slate['away_team'] + " @ " + slate['home_team'],
+        'Model_D_Pred': preds['prediction'],
+        'Model_D_Conf': preds['confidence']
+    }).reset_index(drop=True)
 
-def main():
-    """Run all models for Week 6"""
+def main(as_of=None):
+    """Run all models for Week 6 (pass `as_of` to replay with EPA known at that time)"""
     
     print("="*80)
     print("WEEK 6 2025: ALL MODELS PREDICTIONS")
@@ -314,8 +128,11 @@ def main():
     print(f"\nLoaded {len(week6_odds)} games for Week 6")
     
     # Load EPA data
-    epa_data = load_epa_data()
-    print(f"Loaded EPA data for {len(epa_data)} teams (updated Oct 7, 2025)")
+    epa_data = load_epa_data(as_of)
+    if as_of is not None:
+        print(f"Loaded EPA snapshot for {len(epa_data)} teams as of {as_of} (scraped {epa_data['scraped_at'].iloc[0]})")
+    else:
+        print(f"Loaded EPA data for {len(epa_data)} teams (updated Oct 7, 2025)")
     
     # Run all models
     model_a_preds = run_model_a(week6_odds, epa_data)
@@ -344,6 +161,8 @@ def main():
     output_file = "week6_all_models_predictions.csv"
     all_preds.to_csv(output_file, index=False)
     print(f"\n✅ Saved all predictions to {output_file}")
+    write_combined(all_preds, week=6, source=f"models/{output_file}")
+    print("✅ Saved typed prediction artifacts (prediction_artifacts.py)")
     
     # Display summary
     print("\n" + "="*80)
@@ -373,5 +192,6 @@ def main():
     return all_preds
 
 if __name__ == "__main__":
-    main()
+    # Optional: python3 week6_all_models_predictions.py "2025-10-09 20:15"
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
 
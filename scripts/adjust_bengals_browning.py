@@ -1,60 +1,53 @@
 #!/usr/bin/env python3
 """
 Adjust Bengals EPA data for Jake Browning replacing Joe Burrow
+
+Uses the player-level QB EPA index (qb_epa_index.py) instead of a hand-entered
+EPA difference; any team / replacement can be run the same way with
+`python3 scripts/qb_epa_index.py sub <team> <qb>`.
 """
 
 import pandas as pd
-import os
+
+from qb_epa_index import get_qb_epa_index
+
+QB_SEASONS = [2023, 2024]
 
 def adjust_bengals_for_browning():
     print("=== Adjusting Bengals EPA for Jake Browning ===")
-    
+
     # Load current SumerSports data
     epa_data = pd.read_csv("sumersports_epa_data.csv")
-    
-    # Find Bengals row
-    bengals_idx = epa_data[epa_data['team'] == 'CIN'].index[0]
-    bengals_row = epa_data.loc[bengals_idx].copy()
-    
+    bengals_row = epa_data[epa_data['team'] == 'CIN'].iloc[0]
+
     print(f"Current Bengals EPA:")
     print(f"  Offensive EPA per Play: {bengals_row['epa_off_per_play']:.4f}")
     print(f"  Net EPA per Play: {bengals_row['net_epa_per_play']:.4f}")
-    
-    # Based on our analysis:
-    # Browning EPA per play: 0.0871
-    # Burrow EPA per play: 0.0932
-    # Difference: 0.0061 (Browning is 7% worse)
-    
-    # Adjust offensive EPA (assuming 60% of offensive EPA comes from passing)
-    epa_reduction = 0.0061 * 0.6  # 60% of offense is passing
-    adjusted_off_epa = bengals_row['epa_off_per_play'] + epa_reduction
-    
-    # Adjust net EPA
-    defensive_epa_contribution = bengals_row['net_epa_per_play'] - bengals_row['epa_off_per_play']
-    adjusted_net_epa = adjusted_off_epa + defensive_epa_contribution
-    
+
+    # Browning's minus Burrow's (shrunk) EPA per play, Browning taking every snap
+    index = get_qb_epa_index(QB_SEASONS)
+    epa_data_adjusted = index.substitute_table(epa_data, {'CIN': ('J.Burrow', 'J.Browning', 1.0)})
+    bengals_idx = epa_data_adjusted[epa_data_adjusted['team'] == 'CIN'].index[0]
+    epa_data_adjusted.loc[bengals_idx, 'last_updated'] = pd.Timestamp.now()
+    adjusted_off_epa = epa_data_adjusted.loc[bengals_idx, 'epa_off_per_play']
+    adjusted_net_epa = epa_data_adjusted.loc[bengals_idx, 'net_epa_per_play']
+
     print(f"\nAdjusted Bengals EPA (with Browning):")
     print(f"  Offensive EPA per Play: {adjusted_off_epa:.4f}")
     print(f"  Net EPA per Play: {adjusted_net_epa:.4f}")
-    print(f"  EPA Improvement: {adjusted_net_epa - bengals_row['net_epa_per_play']:.4f}")
-    
-    # Create adjusted dataset
-    epa_data_adjusted = epa_data.copy()
-    epa_data_adjusted.loc[bengals_idx, 'epa_off_per_play'] = adjusted_off_epa
-    epa_data_adjusted.loc[bengals_idx, 'net_epa_per_play'] = adjusted_net_epa
-    epa_data_adjusted.loc[bengals_idx, 'last_updated'] = pd.Timestamp.now()
-    
+    print(f"  EPA Change: {adjusted_net_epa - bengals_row['net_epa_per_play']:+.4f}")
+
     # Save adjusted data
     output_path = "sumersports_epa_data_browning_adjusted.csv"
     epa_data_adjusted.to_csv(output_path, index=False)
     print(f"\n✅ Saved adjusted EPA data to {output_path}")
-    
+
     # Show comparison
     print(f"\n=== Bengals EPA Comparison ===")
     print(f"Original (Burrow): Net EPA = {bengals_row['net_epa_per_play']:.4f}")
     print(f"Adjusted (Browning): Net EPA = {adjusted_net_epa:.4f}")
     print(f"Change: {adjusted_net_epa - bengals_row['net_epa_per_play']:+.4f}")
-    
+
     return epa_data_adjusted
 
 if __name__ == "__main__":
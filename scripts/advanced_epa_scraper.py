@@ -3,17 +3,18 @@
 Advanced EPA Scraper - Extract real EPA data from analytics websites
 """
 
-import requests
 import pandas as pd
 import numpy as np
 from bs4 import BeautifulSoup
-import time
 import json
 import re
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+from async_fetch import DEFAULT_HEADERS, AsyncFetcher, fetch_pages
+from team_registry import ABBR_TO_NICKNAME
+
 @dataclass
 class EPAData:
     """Data class for EPA metrics"""
@@ -27,43 +28,34 @@ class EPAData:
 
 class AdvancedEPAScraper:
     """Advanced scraper for EPA data from multiple sources"""
+
+    pages = {
+        'teamrankings': "https://www.teamrankings.com/nfl/stat/expected-points-added",
+        'footballoutsiders': "https://www.footballoutsiders.com/stats/teamoff",
+        'espn': "https://www.espn.com/nfl/stats/team/_/view/offense/season/2025/seasontype/2",
+    }
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
+    def __init__(self, fetcher: Optional[AsyncFetcher] = None):
+        # Shared fetch layer (pooling, per-host rate limits, retries, conditional GETs)
+        self.fetcher = fetcher or AsyncFetcher(headers=DEFAULT_HEADERS)
         
         # Team mappings
-        self.team_mappings = {
-            'ARI': 'Cardinals', 'ATL': 'Falcons', 'BAL': 'Ravens', 'BUF': 'Bills',
-            'CAR': 'Panthers', 'CHI': 'Bears', 'CIN': 'Bengals', 'CLE': 'Browns',
-            'DAL': 'Cowboys', 'DEN': 'Broncos', 'DET': 'Lions', 'GB': 'Packers',
-            'HOU': 'Texans', 'IND': 'Colts', 'JAX': 'Jaguars', 'KC': 'Chiefs',
-            'LA': 'Rams', 'LAC': 'Chargers', 'LV': 'Raiders', 'MIA': 'Dolphins',
-            'MIN': 'Vikings', 'NE': 'Patriots', 'NO': 'Saints', 'NYG': 'Giants',
-            'NYJ': 'Jets', 'PHI': 'Eagles', 'PIT': 'Steelers', 'SF': '49ers',
-            'SEA': 'Seahawks', 'TB': 'Buccaneers', 'TEN': 'Titans', 'WAS': 'Commanders'
-        }
+        self.team_mappings = dict(ABBR_TO_NICKNAME)
         
         self.reverse_mappings = {v: k for k, v in self.team_mappings.items()}
     
-    def scrape_teamrankings_epa(self) -> Optional[pd.DataFrame]:
+    def scrape_teamrankings_epa(self, content: Optional[bytes] = None) -> Optional[pd.DataFrame]:
         """Scrape EPA data from TeamRankings.com"""
         try:
             print("Scraping EPA data from TeamRankings...")
             
             # TeamRankings EPA page
-            url = "https://www.teamrankings.com/nfl/stat/expected-points-added"
+            if content is None:
+                result = self.fetcher.get(self.pages['teamrankings'])
+                result.raise_for_status()
+                content = result.content
             
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(content, 'html.parser')
             
             # Look for the main stats table
             table = soup.find('table', {'class': 'tr-table'})
@@ -104,18 +96,18 @@ class AdvancedEPAScraper:
             print(f"❌ Error scraping TeamRankings: {e}")
             return None
     
-    def scrape_footballoutsiders_epa(self) -> Optional[pd.DataFrame]:
+    def scrape_footballoutsiders_epa(self, content: Optional[bytes] = None) -> Optional[pd.DataFrame]:
         """Scrape EPA data from Football Outsiders"""
         try:
             print("Scraping EPA data from Football Outsiders...")
             
             # Football Outsiders DVOA page (they have EPA-like metrics)
-            url = "https://www.footballoutsiders.com/stats/teamoff"
-            
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            if content is None:
+                result = self.fetcher.get(self.pages['footballoutsiders'])
+                result.raise_for_status()
+                content = result.content
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(content, 'html.parser')
             
             # Look for stats tables
             tables = soup.find_all('table')
@@ -175,18 +167,18 @@ class AdvancedEPAScraper:
             print(f"❌ Error with nflfastR: {e}")
             return None
     
-    def scrape_espn_advanced_stats(self) -> Optional[pd.DataFrame]:
+    def scrape_espn_advanced_stats(self, content: Optional[bytes] = None) -> Optional[pd.DataFrame]:
         """Scrape advanced stats from ESPN that might include EPA"""
         try:
             print("Scraping advanced stats from ESPN...")
             
             # ESPN advanced stats page
-            url = "https://www.espn.com/nfl/stats/team/_/view/offense/season/2025/seasontype/2"
+            if content is None:
+                result = self.fetcher.get(self.pages['espn'])
+                result.raise_for_status()
+                content = result.content
             
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(content, 'html.parser')
             
             # Look for stats tables
             tables = soup.find_all('table')
@@ -289,19 +281,31 @@ class AdvancedEPAScraper:
         
         print("=== Advanced EPA Scraper - All Sources ===")
         
+        # All pages are fetched concurrently up front (rate-limited per host)
+        return self.parse_pages(fetch_pages(self, self.fetcher))
+    
+    def parse_pages(self, pages: Dict[str, Optional[bytes]]) -> pd.DataFrame:
+        """Run every source parser over the fetched pages and combine the results"""
+        
+        # (parser, page name); sources without a page are not implemented yet
         scrapers = [
-            self.scrape_teamrankings_epa,
-            self.scrape_footballoutsiders_epa,
-            self.scrape_espn_advanced_stats,
-            self.scrape_nflfastr_epa,
-            self.scrape_reddit_epa_discussions
+            (self.scrape_teamrankings_epa, 'teamrankings'),
+            (self.scrape_footballoutsiders_epa, 'footballoutsiders'),
+            (self.scrape_espn_advanced_stats, 'espn'),
+            (self.scrape_nflfastr_epa, None),
+            (self.scrape_reddit_epa_discussions, None)
         ]
         
         results = []
         
-        for scraper in scrapers:
+        for scraper, page in scrapers:
             try:
-                result = scraper()
+                if page is None:
+                    result = scraper()
+                elif pages.get(page) is None:
+                    result = None
+                else:
+                    result = scraper(pages[page])
                 if result is not None and not result.empty:
                     results.append(result)
                     print(f"✅ Successfully scraped data from {scraper.__name__}")
@@ -309,9 +313,6 @@ class AdvancedEPAScraper:
                     print(f"❌ No data from {scraper.__name__}")
             except Exception as e:
                 print(f"❌ Error with {scraper.__name__}: {e}")
-            
-            # Be respectful with delays
-            time.sleep(2)
         
         if results:
             # Combine all results
@@ -7,17 +7,20 @@ import pandas as pd
 import numpy as np
 import os
 
+from pbp_cache import read_pbp
+
+QB_PBP_COLUMNS = [
+    'posteam', 'play_type', 'passer', 'epa', 'pass_touchdown', 'interception',
+    'pass_attempt', 'complete_pass', 'air_yards', 'yards_after_catch',
+]
+
 def analyze_qb_epa():
     print("=== Quarterback EPA Analysis: Joe Burrow vs Jake Browning ===")
     
-    # Load play-by-play data for 2023 and 2024
-    pbp_2023 = pd.read_parquet("play_by_play_2023.parquet")
-    pbp_2024 = pd.read_parquet("play_by_play_2024.parquet")
-    
-    # Combine the data
-    pbp_data = pd.concat([pbp_2023, pbp_2024], ignore_index=True)
+    # Load only the Bengals passing columns for 2023 and 2024 (shared PBP cache)
+    pbp_data = read_pbp([2023, 2024], columns=QB_PBP_COLUMNS, filters={'posteam': 'CIN'})
     
-    print(f"Loaded {len(pbp_data)} total plays from 2023-2024")
+    print(f"Loaded {len(pbp_data)} Bengals plays from 2023-2024")
     
     # Filter for Bengals games and passing plays
     bengals_passes = pbp_data[
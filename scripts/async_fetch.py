@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Shared asynchronous fetch layer for the EPA scrapers.
+
+The scrapers (SumerSportsScraper, DetailedEPAScraper, AdvancedEPAScraper,
+EPAScraper) used to each open a blocking requests.Session and sleep between
+pages. They now declare the pages they need and a parser; this module fetches
+every page of every scraper concurrently and hands the bytes back:
+
+- One pooled requests.Session per fetcher, driven from asyncio through a
+  bounded thread pool (no extra dependency beyond `requests`).
+- Per-host token buckets keep each site within its politeness limit
+  (default: 1 request every 2 seconds per host, the old time.sleep(2)),
+  while different hosts are fetched in parallel.
+- Retries with exponential backoff on connection errors, 429 and 5xx
+  (Retry-After is honoured).
+- Conditional GETs: ETag / Last-Modified validators are remembered per URL and
+  a 304 reuses the previously fetched body.
+- The same URL requested by several scrapers is fetched once per run.
+- Responses go through the on-disk ResponseCache (http_cache.py): fresh pages
+  are served from disk, stale ones are revalidated, and in replay mode
+  (NFL_OFFLINE=1 / NFL_HTTP_CACHE_MODE=replay) nothing touches the network.
+- `host_overrides` rewrites scheme://host so the scrapers can be pointed at a
+  local stand-in (see fixture_server.py) serving recorded HTML. Every fetcher
+  picks them up from NFL_SCRAPER_BASE_URL unless they are passed explicitly.
+- `host_headers` adds per-site request headers (the SumerSports Referer).
+
+Environment overrides:
+    NFL_SCRAPER_BASE_URL    send every scraper to a fixture_server.py stand-in
+                            (e.g. http://127.0.0.1:8000)
+
+Usage:
+    python3 scripts/async_fetch.py                      # fetch + parse all scrapers
+    python3 scripts/async_fetch.py --record fixtures/   # also save pages as fixtures
+"""
+
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import CacheMiss, ResponseCache, get_response_cache
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+DEFAULT_RATE_PER_HOST = 0.5   # requests per second
+DEFAULT_BURST = 1
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Extra request headers per real host (sent to the stand-in too)
+HOST_HEADERS = {
+    "sumersports.com": {"Referer": "https://sumersports.com/"},
+}
+
+
+@dataclass
+class FetchResult:
+    """Outcome of one page fetch (content is None when the fetch failed)."""
+    url: str
+    status: Optional[int]
+    content: Optional[bytes]
+    headers: Dict[str, str] = field(default_factory=dict)
+    not_modified: bool = False
+    from_cache: bool = False
+    attempts: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.content is not None
+
+    def raise_for_status(self) -> None:
+        """Raise requests.HTTPError for failed fetches, like requests.Response."""
+        if not self.ok:
+            raise requests.HTTPError(f"{self.error} for url: {self.url}")
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, at most `burst` stored."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError(f"rate must be > 0, got {rate}")
+        self.rate = float(rate)
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = None
+        self._loop = None
+
+    async def acquire(self) -> None:
+        # Fetchers may be reused across asyncio.run() calls; locks belong to one loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+def env_host_overrides() -> Dict[str, str]:
+    """host_overrides from NFL_SCRAPER_BASE_URL (empty when unset)."""
+    base = os.environ.get("NFL_SCRAPER_BASE_URL")
+    if not base:
+        return {}
+    from fixture_server import fixture_overrides
+    return fixture_overrides(base)
+
+
+class AsyncFetcher:
+    """Concurrent, per-host rate-limited page fetcher shared by all scrapers."""
+
+    def __init__(
+        self,
+        rate_per_host: float = DEFAULT_RATE_PER_HOST,
+        burst: int = DEFAULT_BURST,
+        host_rates: Optional[Dict[str, float]] = None,
+        max_connections: int = 8,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        timeout: float = 15,
+        headers: Optional[Dict[str, str]] = None,
+        host_overrides: Optional[Dict[str, str]] = None,
+        host_headers: Optional[Dict[str, Dict[str, str]]] = None,
+        cache: Optional[ResponseCache] = None,
+        use_cache: bool = True,
+    ):
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.host_rates = dict(host_rates or {})
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        if host_overrides is None:
+            host_overrides = env_host_overrides()
+        self.host_overrides = {k.rstrip("/"): v.rstrip("/") for k, v in host_overrides.items()}
+        self.host_headers = dict(HOST_HEADERS if host_headers is None else host_headers)
+        self.cache = (cache or get_response_cache()) if use_cache else None
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # url -> {"etag", "last_modified", "content", "headers"[, "key"]} for conditional GETs
+        self.validators: Dict[str, dict] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    # -----------------------------
+    # Helpers
+    # -----------------------------
+
+    def resolve(self, url: str) -> str:
+        """Apply host_overrides (e.g. https://sumersports.com -> http://127.0.0.1:8000)."""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if origin in self.host_overrides:
+            return self.host_overrides[origin] + url[len(origin):]
+        return url
+
+    def _bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.host_rates.get(host, self.rate_per_host), self.burst)
+        return self._buckets[host]
+
+    def _request_headers(self, url: str) -> Dict[str, str]:
+        cached = self.validators.get(url)
+        headers = dict(self.host_headers.get(urlsplit(url).netloc, {}))
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return float(response.headers["Retry-After"])
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    # -----------------------------
+    # Fetching
+    # -----------------------------
+
+    async def fetch(self, url: str, executor: Optional[ThreadPoolExecutor] = None) -> FetchResult:
+        """Fetch one URL politely; never raises, failures are reported on the result."""
+        loop = asyncio.get_running_loop()
+        target = self.resolve(url)
+        # Rate limits follow the real site even when it is redirected to a stand-in
+        bucket = self._bucket(urlsplit(url).netloc)
+        start = time.perf_counter()
+        response = None
+        error = None
+
+        if self.cache is not None:
+            try:
+                cached = self.cache.lookup(url, self.session.headers)
+            except CacheMiss as e:
+                return FetchResult(url, None, None, error=str(e))
+            if cached is not None:
+                if cached["fresh"]:
+                    return FetchResult(url, cached["status"], cached["content"], dict(cached["headers"]),
+                                       from_cache=True, elapsed=time.perf_counter() - start)
+                # Stale: revalidate with the cached validators
+                self.validators[url] = cached
+
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            headers = self._request_headers(url)
+            try:
+                response = await loop.run_in_executor(
+                    executor, lambda: self.session.get(target, headers=headers, timeout=self.timeout)
+                )
+            except requests.RequestException as e:
+                response, error = None, f"{type(e).__name__}: {e}"
+            else:
+                error = None
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                error = f"HTTP {response.status_code}"
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._retry_delay(attempt, response))
+
+        elapsed = time.perf_counter() - start
+        if response is None:
+            return FetchResult(url, None, None, attempts=attempt + 1, elapsed=elapsed, error=error)
+
+        if response.status_code == 304:
+            cached = self.validators.get(url)
+            if not cached or cached.get("content") is None:
+                # Nothing to reuse: a 304 we did not ask for must not pass as an empty page
+                return FetchResult(url, 304, None, dict(response.headers), attempts=attempt + 1,
+                                   elapsed=elapsed, error="HTTP 304 without a stored copy")
+            if self.cache is not None and "key" in cached:
+                self.cache.touch(cached["key"])
+            return FetchResult(url, 304, cached["content"], dict(cached.get("headers") or {}), not_modified=True,
+                               attempts=attempt + 1, elapsed=elapsed)
+
+        if not response.ok:
+            return FetchResult(url, response.status_code, None, dict(response.headers),
+                               attempts=attempt + 1, elapsed=elapsed, error=error or f"HTTP {response.status_code}")
+
+        self.validators[url] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content": response.content,
+            "headers": dict(response.headers),
+        }
+        if self.cache is not None:
+            self.validators[url]["key"] = self.cache.store(
+                url, self.session.headers, response.status_code, dict(response.headers), response.content
+            )
+        return FetchResult(url, response.status_code, response.content, dict(response.headers),
+                           attempts=attempt + 1, elapsed=elapsed)
+
+    async def fetch_many(self, urls: Iterable[str]) -> Dict[str, FetchResult]:
+        """Fetch unique URLs concurrently; rate limits still apply per host."""
+        unique = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+            results = await asyncio.gather(*(self.fetch(u, executor) for u in unique))
+        return dict(zip(unique, results))
+
+    def fetch_all(self, urls: Iterable[str]) -> Dict[str, FetchResult]:
+        """Blocking wrapper around fetch_many for synchronous callers."""
+        return asyncio.run(self.fetch_many(urls))
+
+    def get(self, url: str) -> FetchResult:
+        return self.fetch_all([url])[url]
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# -----------------------------
+# Scraper integration
+# -----------------------------
+#
+# A scraper plugs in by exposing:
+#   pages:  Dict[str, str]                      page name -> URL
+#   parse_pages(pages: Dict[str, Optional[bytes]]) -> DataFrame
+# and optionally `fetcher`, which is shared when several scrapers run together.
+
+def fetch_pages(scraper, fetcher: Optional[AsyncFetcher] = None) -> Dict[str, Optional[bytes]]:
+    """Fetch all pages one scraper declares; returns page name -> bytes (None on failure)."""
+    fetcher = fetcher or getattr(scraper, "fetcher", None) or AsyncFetcher()
+    results = fetcher.fetch_all(scraper.pages.values())
+    return _page_bytes(scraper, results)
+
+
+def _page_bytes(scraper, results: Dict[str, FetchResult]) -> Dict[str, Optional[bytes]]:
+    pages = {}
+    for name, url in scraper.pages.items():
+        result = results[url]
+        if not result.ok:
+            print(f"❌ {type(scraper).__name__}: failed to fetch {url} ({result.error})")
+        pages[name] = result.content
+    return pages
+
+
+def run_scrapers(scrapers: List, fetcher: Optional[AsyncFetcher] = None,
+                 on_result: Optional[Callable[[str, FetchResult], None]] = None) -> Dict[str, object]:
+    """
+    Fetch every page of every scraper in one concurrent pass, then parse.
+
+    Returns scraper class name -> parsed DataFrame (or None when parsing failed).
+    """
+    fetcher = fetcher or AsyncFetcher()
+    urls = [url for s in scrapers for url in s.pages.values()]
+    start = time.perf_counter()
+    results = fetcher.fetch_all(urls)
+    print(f"Fetched {len(results)} unique pages for {len(scrapers)} scrapers in {time.perf_counter() - start:.2f}s")
+    if on_result:
+        for url, result in results.items():
+            on_result(url, result)
+
+    parsed = {}
+    for scraper in scrapers:
+        name = type(scraper).__name__
+        try:
+            parsed[name] = scraper.parse_pages(_page_bytes(scraper, results))
+        except Exception as e:
+            print(f"❌ Error parsing {name}: {e}")
+            parsed[name] = None
+    return parsed
+
+
+def _record_result(fixtures_dir: str, url: str, result: FetchResult) -> None:
+    from fixture_server import record_fixture
+
+    if result.ok:
+        record_fixture(fixtures_dir, url, result.content)
+
+
+def main():
+    import argparse
+    import functools
+
+    from advanced_epa_scraper import AdvancedEPAScraper
+    from detailed_epa_scraper import DetailedEPAScraper
+    from epa_scraper import EPAScraper
+    from sumersports_scraper import SumerSportsScraper
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", metavar="DIR", help="save fetched pages as fixtures for fixture_server.py")
+    args = parser.parse_args()
+
+    fetcher = AsyncFetcher()
+    scrapers = [SumerSportsScraper(fetcher), DetailedEPAScraper(fetcher), AdvancedEPAScraper(fetcher), EPAScraper(fetcher)]
+
+    on_result = functools.partial(_record_result, args.record) if args.record else None
+    for name, df in run_scrapers(scrapers, fetcher, on_result=on_result).items():
+        rows = 0 if df is None else len(df)
+        print(f"  {name}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTML table parsing backends on SumerSports pages.
+
+For every available backend (see html_tables.py) this reports, per page:
+- median wall time of the offensive/defensive + detailed scraper parses
+- peak RSS of a fresh subprocess that loads the pages and parses them once,
+  and how far the parse raised it (VmHWM / getrusage; unlike tracemalloc this
+  counts libxml2's C allocations)
+and checks that every backend yields DataFrames identical to the original
+BeautifulSoup path ("bs4").
+
+Pages come from, in order: --fixtures DIR (fixture_server.py layout), the HTTP
+response cache (http_cache.py), or a synthetic page shaped like the live site
+(a ~40-column, 32-team table inside ~1 MB of scripts and markup).
+
+Usage:
+    python3 scripts/benchmark_html_parsing.py
+    python3 scripts/benchmark_html_parsing.py --fixtures fixtures/ --repeat 20
+"""
+
+import argparse
+import os
+import pickle
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Tuple
+
+import pandas as pd
+
+from detailed_epa_scraper import DetailedEPAScraper
+from html_tables import available_backends
+from sumersports_scraper import SumerSportsScraper
+
+TEAM_NAMES = [
+    'Baltimore Ravens', 'Indianapolis Colts', 'Buffalo Bills', 'Detroit Lions', 'Green Bay Packers',
+    'Tampa Bay Buccaneers', 'Jacksonville Jaguars', 'New England Patriots', 'Los Angeles Rams', 'Los Angeles Chargers',
+    'Dallas Cowboys', 'Arizona Cardinals', 'San Francisco 49ers', 'Kansas City Chiefs', 'Philadelphia Eagles',
+    'Atlanta Falcons', 'New York Jets', 'Denver Broncos', 'Washington Commanders', 'Miami Dolphins',
+    'Cincinnati Bengals', 'Pittsburgh Steelers', 'New Orleans Saints', 'Seattle Seahawks', 'Houston Texans',
+    'Carolina Panthers', 'Chicago Bears', 'Las Vegas Raiders', 'Cleveland Browns', 'Tennessee Titans',
+    'Minnesota Vikings', 'New York Giants'
+]
+
+
+def synthetic_page(seed: int, n_cols: int = 40, filler_kb: int = 1000) -> bytes:
+    """A page with the live site's table markup buried in framework boilerplate."""
+    rng = random.Random(seed)
+    header = "".join(f"<th><button>Col {i}</button></th>" for i in range(n_cols))
+    rows = []
+    for rank, team in enumerate(rng.sample(TEAM_NAMES, len(TEAM_NAMES)), 1):
+        cells = [
+            f'<td class="sticky"><div class="flex"><span>{rank}.</span>'
+            f'<img src="/logos/{rank}.png" alt=""/><a href="/teams/{rank}/">{team}</a></div></td>',
+            f"<td><span>{rng.randint(300, 700)}</span></td>",
+            f"<td><span>{rng.uniform(-0.3, 0.3):.3f}</span></td>",
+            f"<td><span>{rng.uniform(-60, 60):.1f}</span></td>",
+            f"<td><span>{rng.uniform(35, 55):.1f}%</span><!-- rank {rank} --></td>",
+        ]
+        cells += [f"<td>\n  <span>{rng.uniform(-0.4, 0.4):.3f}</span>&nbsp;\n</td>" for _ in range(n_cols - len(cells))]
+        rows.append(f'<tr class="border-b">{"".join(cells)}</tr>')
+    table = f'<table class="w-full text-sm"><thead><tr>{header}</tr></thead><tbody>{"".join(rows)}</tbody></table>'
+
+    filler = []
+    size = 0
+    while size < filler_kb * 1024:
+        block = (f'<div class="card p-{rng.randint(1, 9)}"><p>Lorem &amp; ipsum {rng.random():.8f}</p>'
+                 f'<table class="mini"><tr><td>{rng.random():.4f}</td></tr></table></div>')
+        filler.append(block)
+        size += len(block)
+    script = '<script id="__NEXT_DATA__" type="application/json">{"props": "' + "x" * (filler_kb * 256) + '"}</script>'
+    half = len(filler) // 2
+    html = (f"<!DOCTYPE html><html><head><title>Team EPA</title>{script}</head><body>"
+            f"{''.join(filler[:half])}<main>{table}</main>{''.join(filler[half:])}</body></html>")
+    return html.encode("utf-8")
+
+
+def load_pages(fixtures_dir: str = None) -> Dict[str, bytes]:
+    urls = SumerSportsScraper.pages
+    if fixtures_dir:
+        from fixture_server import fixture_path
+
+        pages = {}
+        for name, url in urls.items():
+            with open(fixture_path(fixtures_dir, url), "rb") as f:
+                pages[name] = f.read()
+        print(f"Using recorded pages from {fixtures_dir}")
+        return pages
+
+    from http_cache import CacheMiss, ResponseCache
+
+    try:
+        cache = ResponseCache(mode="replay")
+        from async_fetch import DEFAULT_HEADERS
+        headers = dict(DEFAULT_HEADERS, Referer='https://sumersports.com/')
+        pages = {name: cache.lookup(url, headers)["content"] for name, url in urls.items()}
+        print(f"Using cached pages from {cache.cache_dir}")
+        return pages
+    except CacheMiss:
+        print("No recorded SumerSports pages found; using synthetic pages")
+        return {"offensive": synthetic_page(1), "defensive": synthetic_page(2)}
+
+
+def make_scrapers(backend: str):
+    return SumerSportsScraper(html_backend=backend), DetailedEPAScraper(html_backend=backend)
+
+
+def parse_all(scrapers, pages: Dict[str, bytes]) -> Dict[str, pd.DataFrame]:
+    basic, detailed = scrapers
+    return {
+        "offensive": basic.scrape_offensive_epa(pages["offensive"]),
+        "defensive": basic.scrape_defensive_epa(pages["defensive"]),
+        "detailed_offensive": detailed.scrape_detailed_offensive_data(pages["offensive"]),
+        "detailed_defensive": detailed.scrape_detailed_defensive_data(pages["defensive"]),
+    }
+
+
+def _quiet(fn, *args):
+    import contextlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss survives fork+exec (the child would report the parent's peak);
+    # Linux's VmHWM starts over with the new process image
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    return rss / 1024 ** 2 if sys.platform == "darwin" else rss / 1024
+
+
+def peak_rss_mb(backend: str, pages_path: str) -> Tuple[float, float]:
+    """(peak RSS, increase during the parse) of a fresh interpreter running one parse with `backend`."""
+    cmd = [sys.executable, __file__, "--rss-backend", backend, "--rss-pages", pages_path]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    peak, growth = result.stdout.strip().splitlines()[-1].split()
+    return float(peak), float(growth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="fixtures directory recorded with async_fetch.py --record")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--rss-backend", help=argparse.SUPPRESS)
+    parser.add_argument("--rss-pages", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.rss_backend:
+        # Child process for peak_rss_mb(): everything but the result goes to /dev/null
+        with open(args.rss_pages, "rb") as f:
+            pages = pickle.load(f)
+        scrapers = make_scrapers(args.rss_backend)
+        before = _max_rss_mb()
+        _quiet(parse_all, scrapers, pages)
+        peak = _max_rss_mb()
+        print(f"{peak:.1f} {peak - before:.1f}")
+        return
+
+    pages = load_pages(args.fixtures)
+    print("Page sizes: " + ", ".join(f"{k} {len(v) / 1024:.0f} KB" for k, v in pages.items()))
+
+    pages_file = tempfile.NamedTemporaryFile(suffix=".pkl", delete=False)
+    with pages_file:
+        pickle.dump(pages, pages_file)
+
+    reference = _quiet(parse_all, make_scrapers("bs4"), pages)
+    results = []
+    for backend in available_backends():
+        scrapers = make_scrapers(backend)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            out = _quiet(parse_all, scrapers, pages)
+            timings.append(time.perf_counter() - start)
+
+        for name, df in reference.items():
+            pd.testing.assert_frame_equal(df, out[name])
+
+        peak, growth = peak_rss_mb(backend, pages_file.name)
+        results.append({
+            "backend": backend,
+            "median_ms": round(statistics.median(timings) * 1000, 1),
+            "peak_rss_mb": round(peak, 1),
+            "parse_rss_mb": round(growth, 1),
+            "rows": sum(len(df) for df in out.values()),
+            "identical_to_bs4": True,
+        })
+
+    os.remove(pages_file.name)
+
+    table = pd.DataFrame(results)
+    bs4_ms = table.loc[table["backend"] == "bs4", "median_ms"].iloc[0]
+    table["speedup"] = (bs4_ms / table["median_ms"]).round(1)
+    print("\n=== HTML parsing benchmark (4 scraper parses per run) ===")
+    print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
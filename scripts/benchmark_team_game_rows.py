@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Benchmark build_team_game_rows: legacy per-group lambdas vs the vectorized version.
+
+Runs both implementations over 1, 3 and 10 seasons of play-by-play, reports wall
+time and checks that the two outputs are identical.
+
+By default synthetic PBP with the nflverse column layout is generated (~48k
+plays per season, matching a real 272-game season). Pass --real to use cached
+nflverse seasons instead (see pbp_cache.py).
+
+Usage:
+    python3 scripts/benchmark_team_game_rows.py
+    python3 scripts/benchmark_team_game_rows.py --real --seasons 2015-2024
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from nfl_cover_model_starter import PBP_COLUMNS, build_team_game_rows
+
+TEAMS = [
+    'ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE', 'DAL', 'DEN', 'DET', 'GB',
+    'HOU', 'IND', 'JAX', 'KC', 'LA', 'LAC', 'LV', 'MIA', 'MIN', 'NE', 'NO', 'NYG',
+    'NYJ', 'PHI', 'PIT', 'SF', 'SEA', 'TB', 'TEN', 'WAS'
+]
+PLAY_TYPES = ["pass", "run", "punt", "kickoff", "field_goal", "extra_point", "no_play", "qb_kneel", "qb_spike"]
+PLAY_TYPE_WEIGHTS = [0.52, 0.30, 0.05, 0.05, 0.02, 0.02, 0.02, 0.01, 0.01]
+
+
+def make_synthetic_pbp(n_seasons: int, games_per_season: int = 272, plays_per_game: int = 175, seed: int = 42) -> pd.DataFrame:
+    """Generate PBP-shaped data with the columns build_team_game_rows reads."""
+    rng = np.random.default_rng(seed)
+    n_games = n_seasons * games_per_season
+    n = n_games * plays_per_game
+
+    game_idx = np.repeat(np.arange(n_games), plays_per_game)
+    home = rng.integers(0, 32, n_games)
+    away = (home + rng.integers(1, 32, n_games)) % 32
+    teams = np.array(TEAMS, dtype=object)
+    is_home_poss = rng.random(n) < 0.5
+    posteam = np.where(is_home_poss, teams[home[game_idx]], teams[away[game_idx]])
+    defteam = np.where(is_home_poss, teams[away[game_idx]], teams[home[game_idx]])
+    # A few rows per game without possession (game start, timeouts), as in real PBP
+    no_poss = rng.random(n) < 0.02
+    posteam = np.where(no_poss, None, posteam)
+    defteam = np.where(no_poss, None, defteam)
+
+    play_type = rng.choice(PLAY_TYPES, size=n, p=PLAY_TYPE_WEIGHTS)
+    epa = rng.normal(0.0, 1.4, n)
+    epa[rng.random(n) < 0.03] = np.nan
+
+    seasons = 2015 + game_idx // games_per_season
+    game_ids = np.char.add(np.char.add(seasons.astype(str), "_"), (game_idx % games_per_season).astype(str))
+
+    def flag(p):
+        out = (rng.random(n) < p).astype(float)
+        out[rng.random(n) < 0.01] = np.nan
+        return out
+
+    return pd.DataFrame({
+        "game_id": game_ids,
+        "play_id": np.tile(np.arange(plays_per_game, dtype=float), n_games),
+        "season": seasons,
+        "week": (game_idx % games_per_season) // 16 + 1,
+        "season_type": "REG",
+        "posteam": posteam,
+        "defteam": defteam,
+        "epa": epa,
+        "down": rng.choice([1.0, 2.0, 3.0, 4.0, np.nan], size=n, p=[0.35, 0.28, 0.2, 0.05, 0.12]),
+        "yards_gained": rng.integers(-5, 40, n).astype(float),
+        "play_type": play_type,
+        "pass": flag(0.55),
+        "rush": flag(0.40),
+        "qb_scramble": flag(0.02),
+        "qb_hit": flag(0.08),
+        "sack": flag(0.04),
+        "penalty": flag(0.07),
+        "accepted_penalty": flag(0.06),
+    })
+
+
+def legacy_build_team_game_rows(pbp: pd.DataFrame) -> pd.DataFrame:
+    """The original implementation with per-group lambdas (kept for comparison)."""
+    df = pbp.copy()
+
+    for col in ["pass", "rush", "qb_scramble", "qb_hit", "sack", "penalty", "accepted_penalty"]:
+        if col in df.columns:
+            df[col] = df[col].fillna(0).astype(int)
+
+    df["success"] = (df["epa"] > 0).astype(int)
+    df["early_down"] = df["down"].isin([1, 2]).astype(int)
+    df["explosive"] = (df["yards_gained"] >= 15).astype(int)
+    st_types = {"punt", "kickoff", "field_goal", "extra_point", "qb_kneel", "qb_spike"}
+    df["special_teams_play"] = df["play_type"].isin(st_types).astype(int)
+
+    off = (
+        df.groupby(["game_id", "posteam"], dropna=False)
+          .agg(
+              plays_off=("play_id", "count"),
+              epa_off=("epa", "mean"),
+              success_off=("success", "mean"),
+              explosiveness_off=("explosive", "mean"),
+              pass_rate_off=("pass", "mean"),
+              rush_rate_off=("rush", "mean"),
+              early_down_pass_rate=("pass", lambda s: (s * df.loc[s.index, "early_down"]).sum() / max(1, df.loc[s.index, "early_down"].sum())),
+              sacks_off=("sack", "sum"),
+              penalties_off=("accepted_penalty", "sum"),
+              st_epa_off=("epa", lambda s: s[df.loc[s.index, "special_teams_play"] == 1].mean() if (df.loc[s.index, "special_teams_play"] == 1).any() else 0.0),
+          )
+          .reset_index()
+          .rename(columns={"posteam": "team"})
+    )
+
+    deff = (
+        df.groupby(["game_id", "defteam"], dropna=False)
+          .agg(
+              plays_def=("play_id", "count"),
+              epa_def_allowed=("epa", "mean"),
+              success_def_allowed=("success", "mean"),
+              explosiveness_def_allowed=("explosive", "mean"),
+              sacks_def=("sack", "sum"),
+              penalties_def=("accepted_penalty", "sum"),
+              st_epa_def=("epa", lambda s: s[df.loc[s.index, "special_teams_play"] == 1].mean() if (df.loc[s.index, "special_teams_play"] == 1).any() else 0.0),
+          )
+          .reset_index()
+          .rename(columns={"defteam": "team"})
+    )
+
+    team_game = pd.merge(off, deff, on=["game_id", "team"], how="outer")
+    team_game["net_epa"] = team_game["epa_off"] - team_game["epa_def_allowed"]
+    team_game["net_success_rate"] = team_game["success_off"] - team_game["success_def_allowed"]
+    return team_game
+
+
+def time_call(fn, df: pd.DataFrame):
+    start = time.perf_counter()
+    out = fn(df)
+    return out, time.perf_counter() - start
+
+
+def load_real_seasons(spec: str) -> pd.DataFrame:
+    from pbp_cache import read_pbp
+
+    first, _, last = spec.partition("-")
+    seasons = list(range(int(first), int(last or first) + 1))
+    return read_pbp(seasons, columns=PBP_COLUMNS, filters={"season_type": ["REG", "POST"]})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--real", action="store_true", help="benchmark cached nflverse seasons instead of synthetic data")
+    parser.add_argument("--seasons", default="2015-2024", help="season range for --real (e.g. 2015-2024)")
+    args = parser.parse_args()
+
+    if args.real:
+        full = load_real_seasons(args.seasons)
+        all_seasons = sorted(full["season"].unique())
+    else:
+        full = make_synthetic_pbp(10)
+        all_seasons = sorted(full["season"].unique())
+
+    results = []
+    for n_seasons in (1, 3, 10):
+        seasons = all_seasons[-n_seasons:]
+        if len(seasons) < n_seasons:
+            print(f"Skipping {n_seasons} seasons: only {len(all_seasons)} available")
+            continue
+        pbp = full[full["season"].isin(seasons)]
+
+        legacy, legacy_secs = time_call(legacy_build_team_game_rows, pbp)
+        fast, fast_secs = time_call(build_team_game_rows, pbp)
+
+        key = ["game_id", "team"]
+        pd.testing.assert_frame_equal(
+            legacy.sort_values(key).reset_index(drop=True),
+            fast.sort_values(key).reset_index(drop=True),
+            check_exact=False,
+            rtol=1e-12,
+        )
+
+        results.append({
+            "seasons": n_seasons,
+            "plays": len(pbp),
+            "team_games": len(fast),
+            "legacy_s": round(legacy_secs, 3),
+            "vectorized_s": round(fast_secs, 3),
+            "speedup": round(legacy_secs / fast_secs, 1),
+            "identical": True,
+        })
+        print(f"{n_seasons:>2} season(s): legacy {legacy_secs:.3f}s | vectorized {fast_secs:.3f}s | outputs identical")
+
+    print("\n=== build_team_game_rows benchmark ===")
+    print(pd.DataFrame(results).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
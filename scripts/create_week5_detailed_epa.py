@@ -7,6 +7,8 @@ Data source: https://sumersports.com/teams/offensive/ (Last Updated 10-03-2025)
 import pandas as pd
 from datetime import datetime
 
+from epa_snapshot_store import append_snapshot
+
 def create_week5_detailed_epa():
     """Create detailed EPA data for Week 5 using latest SumerSports data"""
     
@@ -129,9 +131,8 @@ def create_week5_detailed_epa():
     df.to_csv("../detailed_epa_data.csv", index=False)
     print("✅ Updated detailed EPA data saved to: ../detailed_epa_data.csv")
     
-    # Also save to data directory
-    df.to_csv("../data/detailed_epa_data_week5.csv", index=False)
-    print("✅ Updated detailed EPA data saved to: ../data/detailed_epa_data_week5.csv")
+    # Keep the week-5 table as a point-in-time snapshot instead of a second CSV copy
+    append_snapshot(df, source='sumersports_detailed', scraped_at=df['last_updated'].iloc[0])
     
     # Display summary
     print("\n=== Top 5 Teams by Net EPA ===")
@@ -3,29 +3,24 @@
 Debug script to see what's on SumerSports pages
 """
 
-import requests
 from bs4 import BeautifulSoup
 
+from async_fetch import AsyncFetcher
+
 def debug_sumersports():
     """Debug what's on SumerSports pages"""
     
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive',
-    })
+    # Pages come from the HTTP cache when fresh; NFL_OFFLINE=1 replays cached pages only
+    fetcher = AsyncFetcher()
     
     # Test offensive page
     print("=== Debugging SumerSports Offensive Page ===")
     try:
         url = "https://sumersports.com/teams/offensive/"
-        response = session.get(url, timeout=15)
+        response = fetcher.get(url)
         response.raise_for_status()
         
-        print(f"Status Code: {response.status_code}")
+        print(f"Status Code: {response.status} (from cache: {response.from_cache})")
         print(f"Content Length: {len(response.content)}")
         
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -74,10 +69,10 @@ def debug_sumersports():
     print("=== Debugging SumerSports Defensive Page ===")
     try:
         url = "https://sumersports.com/teams/defensive/"
-        response = session.get(url, timeout=15)
+        response = fetcher.get(url)
         response.raise_for_status()
         
-        print(f"Status Code: {response.status_code}")
+        print(f"Status Code: {response.status} (from cache: {response.from_cache})")
         print(f"Content Length: {len(response.content)}")
         
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -3,22 +3,21 @@
 Detailed debug script for SumerSports table structure
 """
 
-import requests
 from bs4 import BeautifulSoup
 
+from async_fetch import AsyncFetcher
+
 def debug_detailed():
     """Debug the detailed table structure"""
     
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    })
+    # Pages come from the HTTP cache when fresh; NFL_OFFLINE=1 replays cached pages only
+    fetcher = AsyncFetcher()
     
     # Test offensive page
     print("=== Detailed SumerSports Offensive Page Debug ===")
     try:
         url = "https://sumersports.com/teams/offensive/"
-        response = session.get(url, timeout=15)
+        response = fetcher.get(url)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.content, 'html.parser')
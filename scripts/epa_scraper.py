@@ -3,35 +3,33 @@
 EPA Scraper - Scrape online EPA results for real-time team metrics
 """
 
-import requests
 import pandas as pd
 import numpy as np
 from bs4 import BeautifulSoup
-import time
 import json
 from typing import Dict, List, Optional
 import re
 
+from async_fetch import AsyncFetcher, fetch_pages
+from team_registry import ABBR_TO_NICKNAME
+
 class EPAScraper:
     """Scraper for online EPA data from various sources"""
+
+    pages = {
+        'pro_football_reference': "https://www.pro-football-reference.com/years/2025/",
+        'nfl_com': "https://www.nfl.com/stats/team-stats/",
+        'teamrankings': "https://www.teamrankings.com/nfl/stat/expected-points-added",
+    }
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+    def __init__(self, fetcher: Optional[AsyncFetcher] = None):
+        # Shared fetch layer (pooling, per-host rate limits, retries, conditional GETs)
+        self.fetcher = fetcher or AsyncFetcher(headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        }, timeout=10)
         
         # Team name mappings
-        self.team_mappings = {
-            'ARI': 'Cardinals', 'ATL': 'Falcons', 'BAL': 'Ravens', 'BUF': 'Bills',
-            'CAR': 'Panthers', 'CHI': 'Bears', 'CIN': 'Bengals', 'CLE': 'Browns',
-            'DAL': 'Cowboys', 'DEN': 'Broncos', 'DET': 'Lions', 'GB': 'Packers',
-            'HOU': 'Texans', 'IND': 'Colts', 'JAX': 'Jaguars', 'KC': 'Chiefs',
-            'LA': 'Rams', 'LAC': 'Chargers', 'LV': 'Raiders', 'MIA': 'Dolphins',
-            'MIN': 'Vikings', 'NE': 'Patriots', 'NO': 'Saints', 'NYG': 'Giants',
-            'NYJ': 'Jets', 'PHI': 'Eagles', 'PIT': 'Steelers', 'SF': '49ers',
-            'SEA': 'Seahawks', 'TB': 'Buccaneers', 'TEN': 'Titans', 'WAS': 'Commanders'
-        }
+        self.team_mappings = dict(ABBR_TO_NICKNAME)
         
         self.reverse_mappings = {v: k for k, v in self.team_mappings.items()}
     
@@ -49,18 +47,18 @@ class EPAScraper:
             print(f"Error scraping ESPN EPA: {e}")
             return None
     
-    def scrape_pro_football_reference(self) -> Optional[pd.DataFrame]:
+    def scrape_pro_football_reference(self, content: Optional[bytes] = None) -> Optional[pd.DataFrame]:
         """Scrape EPA data from Pro Football Reference"""
         try:
             print("Attempting to scrape EPA data from Pro Football Reference...")
             
             # PFR URL for team stats
-            url = "https://www.pro-football-reference.com/years/2025/"
+            if content is None:
+                result = self.fetcher.get(self.pages['pro_football_reference'])
+                result.raise_for_status()
+                content = result.content
             
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(content, 'html.parser')
             
             # Look for team stats tables
             tables = soup.find_all('table')
@@ -78,18 +76,18 @@ class EPAScraper:
             print(f"Error scraping Pro Football Reference: {e}")
             return None
     
-    def scrape_nfl_com_stats(self) -> Optional[pd.DataFrame]:
+    def scrape_nfl_com_stats(self, content: Optional[bytes] = None) -> Optional[pd.DataFrame]:
         """Scrape EPA data from NFL.com stats"""
         try:
             print("Attempting to scrape EPA data from NFL.com...")
             
             # NFL.com stats URL
-            url = "https://www.nfl.com/stats/team-stats/"
-            
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            if content is None:
+                result = self.fetcher.get(self.pages['nfl_com'])
+                result.raise_for_status()
+                content = result.content
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(content, 'html.parser')
             
             # Look for stats tables
             tables = soup.find_all('table')
@@ -116,18 +114,18 @@ class EPAScraper:
             print(f"Error scraping FantasyPros: {e}")
             return None
     
-    def scrape_team_rankings_epa(self) -> Optional[pd.DataFrame]:
+    def scrape_team_rankings_epa(self, content: Optional[bytes] = None) -> Optional[pd.DataFrame]:
         """Scrape EPA data from TeamRankings or similar sites"""
         try:
             print("Attempting to scrape EPA data from TeamRankings...")
             
             # TeamRankings often has advanced metrics
-            url = "https://www.teamrankings.com/nfl/stat/expected-points-added"
+            if content is None:
+                result = self.fetcher.get(self.pages['teamrankings'])
+                result.raise_for_status()
+                content = result.content
             
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(content, 'html.parser')
             
             # Look for EPA data tables
             tables = soup.find_all('table')
@@ -150,19 +148,31 @@ class EPAScraper:
         
         print("=== EPA Scraper - Attempting All Sources ===")
         
+        # All pages are fetched concurrently up front (rate-limited per host)
+        return self.parse_pages(fetch_pages(self, self.fetcher))
+    
+    def parse_pages(self, pages: Dict[str, Optional[bytes]]) -> pd.DataFrame:
+        """Run every source parser over the fetched pages and combine the results"""
+        
+        # (parser, page name); sources without a page are not implemented yet
         scrapers = [
-            self.scrape_espn_epa,
-            self.scrape_pro_football_reference,
-            self.scrape_nfl_com_stats,
-            self.scrape_fantasy_pros_epa,
-            self.scrape_team_rankings_epa
+            (self.scrape_espn_epa, None),
+            (self.scrape_pro_football_reference, 'pro_football_reference'),
+            (self.scrape_nfl_com_stats, 'nfl_com'),
+            (self.scrape_fantasy_pros_epa, None),
+            (self.scrape_team_rankings_epa, 'teamrankings')
         ]
         
         results = []
         
-        for scraper in scrapers:
+        for scraper, page in scrapers:
             try:
-                result = scraper()
+                if page is None:
+                    result = scraper()
+                elif pages.get(page) is None:
+                    result = None
+                else:
+                    result = scraper(pages[page])
                 if result is not None:
                     results.append(result)
                     print(f"✅ Successfully scraped data from {scraper.__name__}")
@@ -170,9 +180,6 @@ class EPAScraper:
                     print(f"❌ No data from {scraper.__name__}")
             except Exception as e:
                 print(f"❌ Error with {scraper.__name__}: {e}")
-            
-            # Be respectful with delays
-            time.sleep(1)
         
         if results:
             # Combine all results
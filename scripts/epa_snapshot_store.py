@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Versioned, append-only store of team EPA snapshots.
+
+Every scrape (or PBP-derived EPA table) is appended once as its own parquet
+file instead of being written as CSV + JSON + parquet copies that drift apart
+across the repo root, data/ and week folders. Nothing is ever overwritten, so
+the EPA a model saw at any point in time can be recovered.
+
+Layout (under data/epa_snapshots/ unless NFL_EPA_SNAPSHOT_DIR is set):
+    source=<source>/scraped_date=YYYY-MM-DD/snapshot-<YYYYMMDDTHHMMSSffffff>-<content_hash>.parquet
+    index.json    # source -> [{scraped_at (UTC), path, rows, content_hash}, ...] sorted by time
+
+`source` names the data set (e.g. "sumersports", "sumersports_detailed",
+"nflverse_pbp"); the rows keep their own `source` column untouched.
+
+Reads (one convention everywhere: a snapshot counts for T only if it was taken
+strictly before T; timestamps are compared in UTC, naive ones are local time):
+- as_of(T, source) returns the latest snapshot scraped strictly before T.
+  It opens exactly two files, the index and one snapshot, however long the
+  history is.
+- latest(source) is the newest snapshot.
+- history(source) scans every snapshot of a source into one frame with a
+  `scraped_at` column, for analyses across time.
+- EPAAsOfIndex(source) loads that history once and answers (team, metric,
+  timestamp) queries for a whole slate in one vectorized call, with the same
+  strictly-before rule as as_of() (leak-free replays).
+
+Appending a table identical to the source's latest snapshot (ignoring the
+timestamp columns) is a no-op, so re-running a scraper does not grow the store.
+
+Usage:
+    python3 scripts/epa_snapshot_store.py               # list snapshots
+    python3 scripts/epa_snapshot_store.py import        # backfill from the legacy CSV copies
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STORE_DIR = os.environ.get("NFL_EPA_SNAPSHOT_DIR", os.path.join(REPO_ROOT, "data", "epa_snapshots"))
+
+# Columns that change on every scrape without the EPA values changing
+VOLATILE_COLUMNS = ("last_updated", "scraped_at")
+
+# Legacy copies, oldest layout first: (path relative to repo root, source)
+LEGACY_FILES = [
+    ("sumersports_epa_data.csv", "sumersports"),
+    ("data/sumersports_epa_data.csv", "sumersports"),
+    ("detailed_epa_data.csv", "sumersports_detailed"),
+    ("data/detailed_epa_data_week5.csv", "sumersports_detailed"),
+    ("week2/latest_team_epa_data.csv", "nflverse_pbp"),
+]
+
+Timestamp = Union[str, datetime, pd.Timestamp]
+
+
+def to_utc(timestamp: Timestamp) -> pd.Timestamp:
+    """tz-aware UTC Timestamp; naive values are local wall-clock time (datetime.now(), scraper last_updated)."""
+    ts = pd.Timestamp(timestamp)
+    if ts.tzinfo is None:
+        ts = pd.Timestamp(ts.to_pydatetime(warn=False).astimezone())
+    return ts.tz_convert("UTC")
+
+
+def _utc_index(timestamps) -> pd.DatetimeIndex:
+    """to_utc() over many timestamps (NaT stays NaT); naive and tz-aware values may be mixed."""
+    values = pd.Index(timestamps, dtype=object)
+    converted = {v: to_utc(v) for v in values.unique() if not pd.isna(v)}
+    return pd.DatetimeIndex([converted.get(v, pd.NaT) if not pd.isna(v) else pd.NaT for v in values],
+                            tz="UTC").as_unit("ns")
+
+
+def content_hash(df: pd.DataFrame) -> str:
+    """Hash of the table's values, ignoring row order and volatile timestamp columns."""
+    stable = df.drop(columns=[c for c in VOLATILE_COLUMNS if c in df.columns])
+    stable = stable.reindex(sorted(stable.columns), axis=1)
+    if "team" in stable.columns:
+        stable = stable.sort_values("team")
+    row_hashes = pd.util.hash_pandas_object(stable.reset_index(drop=True), index=False)
+    return hashlib.sha256(row_hashes.to_numpy().tobytes() + ",".join(stable.columns).encode()).hexdigest()[:16]
+
+
+class EPASnapshotStore:
+    """Append-only parquet store of EPA tables, partitioned by source and scrape date."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or DEFAULT_STORE_DIR
+        self.index_path = os.path.join(self.root, "index.json")
+        os.makedirs(self.root, exist_ok=True)
+
+    # -----------------------------
+    # Index
+    # -----------------------------
+
+    def _read_index(self) -> Dict[str, List[dict]]:
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path, "r") as f:
+            return json.load(f)
+
+    def _write_index(self, index: Dict[str, List[dict]]) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def sources(self) -> List[str]:
+        return sorted(self._read_index())
+
+    def snapshots(self, source: Optional[str] = None) -> pd.DataFrame:
+        """One row per stored snapshot: source, scraped_at, path, rows, content_hash."""
+        index = self._read_index()
+        rows = [dict(e, source=src) for src, entries in index.items() if source in (None, src) for e in entries]
+        df = pd.DataFrame(rows, columns=["source", "scraped_at", "path", "rows", "content_hash"])
+        df["scraped_at"] = _utc_index(df["scraped_at"])
+        return df.sort_values(["source", "scraped_at"]).reset_index(drop=True)
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+
+    def append(self, df: pd.DataFrame, source: str, scraped_at: Optional[Timestamp] = None) -> str:
+        """
+        Store `df` as a new snapshot of `source` taken at `scraped_at` (default:
+        now). scraped_at is recorded tz-aware in UTC (naive input is local time).
+
+        Returns the snapshot path; when the table equals the latest snapshot of
+        the source nothing is written and the existing path is returned.
+        """
+        if df.empty:
+            raise ValueError("Refusing to store an empty EPA snapshot")
+        scraped_at = to_utc(scraped_at) if scraped_at is not None else pd.Timestamp.now(tz="UTC")
+        digest = content_hash(df)
+
+        index = self._read_index()
+        entries = index.setdefault(source, [])
+        times = list(_utc_index([e["scraped_at"] for e in entries]))
+        pos = bisect.bisect_right(times, scraped_at)
+        if pos and entries[pos - 1]["content_hash"] == digest:
+            print(f"EPA snapshot for {source} unchanged since {entries[pos - 1]['scraped_at']}; not stored again")
+            return os.path.join(self.root, entries[pos - 1]["path"])
+        # Same timestamp, different content: keep both (the hash in the file name keeps them apart)
+        rel_path = os.path.join(
+            f"source={source}",
+            f"scraped_date={scraped_at:%Y-%m-%d}",
+            f"snapshot-{scraped_at:%Y%m%dT%H%M%S%f}-{digest}.parquet",
+        )
+        path = os.path.join(self.root, rel_path)
+        if any(e["path"] == rel_path for e in entries):
+            print(f"EPA snapshot for {source} @ {scraped_at} already stored; not stored again")
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        out = df.copy()
+        out["scraped_at"] = scraped_at
+        tmp_path = path + ".tmp"
+        out.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+        entries.insert(pos, {
+            "scraped_at": scraped_at.isoformat(),
+            "path": rel_path,
+            "rows": int(len(df)),
+            "content_hash": digest,
+        })
+        self._write_index(index)
+        print(f"✅ Stored EPA snapshot {source} @ {scraped_at} ({len(df)} rows) -> {path}")
+        return path
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+
+    def _entry_as_of(self, source: str, timestamp: Optional[Timestamp]) -> Optional[dict]:
+        entries = self._read_index().get(source, [])
+        if not entries:
+            return None
+        if timestamp is None:
+            return entries[-1]
+        times = list(_utc_index([e["scraped_at"] for e in entries]))
+        pos = bisect.bisect_left(times, to_utc(timestamp))
+        return entries[pos - 1] if pos else None
+
+    def as_of(self, timestamp: Optional[Timestamp], source: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Latest snapshot of `source` scraped strictly before `timestamp` (None if there is none)."""
+        entry = self._entry_as_of(source, timestamp)
+        if entry is None:
+            return None
+        return pd.read_parquet(os.path.join(self.root, entry["path"]), columns=columns)
+
+    def latest(self, source: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        return self.as_of(None, source, columns=columns)
+
+    def history(self, source: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Every snapshot of `source`, concatenated (each row carries its scraped_at)."""
+        entries = self._read_index().get(source, [])
+        if columns is not None and "scraped_at" not in columns:
+            columns = list(columns) + ["scraped_at"]
+        frames = [pd.read_parquet(os.path.join(self.root, e["path"]), columns=columns) for e in entries]
+        if not frames:
+            return pd.DataFrame(columns=columns or [])
+        return pd.concat(frames, ignore_index=True)
+
+    # -----------------------------
+    # Legacy import
+    # -----------------------------
+
+    def import_legacy(self, files: Optional[List[tuple]] = None) -> int:
+        """Backfill snapshots from the old CSV copies; returns the number of files read."""
+        imported = 0
+        for rel_path, source in files or LEGACY_FILES:
+            path = os.path.join(REPO_ROOT, rel_path)
+            if not os.path.exists(path):
+                continue
+            df = pd.read_csv(path)
+            if "last_updated" in df.columns and df["last_updated"].notna().any():
+                scraped_at = pd.to_datetime(df["last_updated"]).max()
+            else:
+                scraped_at = pd.Timestamp(os.path.getmtime(path), unit="s", tz="UTC")
+            self.append(df, source, scraped_at=scraped_at)
+            imported += 1
+        return imported
+
+
+class EPAAsOfIndex:
+    """
+    Point-in-time EPA lookups over every snapshot of one source.
+
+    Snapshot validity periods form a pd.IntervalIndex: snapshot i answers for
+    timestamps in (scraped_at[i], scraped_at[i+1]], i.e. a game always sees the
+    latest snapshot taken strictly before its kickoff. A whole slate of
+    (team, kickoff) pairs is resolved with two vectorized get_indexer calls.
+    """
+
+    def __init__(self, store: Optional[EPASnapshotStore] = None, source: str = "sumersports_detailed",
+                 metrics: Optional[List[str]] = None):
+        store = store or get_snapshot_store()
+        self.source = source
+        history = store.history(source, columns=["team"] + list(metrics) if metrics else None)
+        if history.empty:
+            raise ValueError(f"No EPA snapshots stored for source {source!r}")
+        history["scraped_at"] = _utc_index(history["scraped_at"])
+        history = history.drop_duplicates(["scraped_at", "team"], keep="last")
+
+        self.snapshot_times = pd.DatetimeIndex(sorted(history["scraped_at"].unique()))
+        ends = self.snapshot_times[1:].append(pd.DatetimeIndex([pd.Timestamp.max], tz="UTC").as_unit("ns"))
+        self.intervals = pd.IntervalIndex.from_arrays(self.snapshot_times, ends, closed="right")
+        self.table = history.set_index(["scraped_at", "team"]).sort_index()
+        self.metrics = [c for c in self.table.columns if pd.api.types.is_numeric_dtype(self.table[c])]
+
+    def snapshot_for(self, timestamps) -> pd.DatetimeIndex:
+        """scraped_at of the snapshot in force at each timestamp (NaT before the first snapshot)."""
+        pos = self.intervals.get_indexer(_utc_index(timestamps))
+        snap = self.snapshot_times[pos.clip(min=0)]
+        return snap.where(pos >= 0)
+
+    def lookup(self, teams, timestamps, metrics: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        EPA for each (team, timestamp) pair, as known strictly before the timestamp
+        (compared in UTC; naive timestamps are local time).
+
+        Returns one row per input pair (same order) with team, as_of, snapshot_at
+        and the requested metric columns; unknown teams/times give NaN.
+        """
+        metrics = list(metrics or self.metrics)
+        teams = pd.Index(teams)
+        as_of = _utc_index(timestamps)
+        snapshot_at = self.snapshot_for(as_of)
+
+        pos = self.table.index.get_indexer(pd.MultiIndex.from_arrays([snapshot_at, teams]))
+        found = pos >= 0
+        values = self.table.reindex(columns=metrics).to_numpy(dtype=float)
+        out = pd.DataFrame(
+            values[pos.clip(min=0)] if len(values) else [[float("nan")] * len(metrics)] * len(pos),
+            columns=metrics,
+        )
+        out[~found] = float("nan")
+        out.insert(0, "snapshot_at", snapshot_at.where(found))
+        out.insert(0, "as_of", as_of)
+        out.insert(0, "team", teams)
+        return out
+
+    def value(self, team: str, metric: str, timestamp: Timestamp) -> float:
+        return float(self.lookup([team], [timestamp], [metric])[metric].iloc[0])
+
+
+_default_store: Optional[EPASnapshotStore] = None
+
+
+def get_snapshot_store() -> EPASnapshotStore:
+    """Return the process-wide default store (configured from the environment)."""
+    global _default_store
+    if _default_store is None:
+        _default_store = EPASnapshotStore()
+    return _default_store
+
+
+def append_snapshot(df: pd.DataFrame, source: str, scraped_at: Optional[Timestamp] = None) -> str:
+    """Append `df` to the default store (see EPASnapshotStore.append)."""
+    return get_snapshot_store().append(df, source, scraped_at=scraped_at)
+
+
+def main():
+    import sys
+
+    store = get_snapshot_store()
+    if sys.argv[1:] == ["import"]:
+        store.import_legacy()
+    snaps = store.snapshots()
+    print(f"EPA snapshot store at {store.root}: {len(snaps)} snapshots")
+    if len(snaps):
+        print(snaps[["source", "scraped_at", "rows", "content_hash"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in that serves recorded scraper pages.
+
+Fixtures are stored per original host and path:
+    <fixtures_dir>/sumersports.com/teams/offensive/index.html
+
+The server answers GET /<host>/<path> from that tree, with ETag and
+Last-Modified headers and 304 responses to conditional requests, so the
+AsyncFetcher retry / conditional-GET paths behave as they do against the live
+sites. Point the scrapers at it with fixture_overrides(base_url) or
+NFL_SCRAPER_BASE_URL.
+
+Usage:
+    python3 scripts/async_fetch.py --record fixtures/     # record live pages once
+    python3 scripts/fixture_server.py fixtures/ --port 8000
+    NFL_SCRAPER_BASE_URL=http://127.0.0.1:8000 python3 scripts/async_fetch.py
+"""
+
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import unquote, urlsplit
+
+# Origins the EPA scrapers talk to
+KNOWN_ORIGINS = [
+    "https://sumersports.com",
+    "https://www.teamrankings.com",
+    "https://www.footballoutsiders.com",
+    "https://www.espn.com",
+    "https://www.pro-football-reference.com",
+    "https://www.nfl.com",
+]
+
+
+def fixture_path(fixtures_dir: str, url: str) -> str:
+    """File that stores the recorded body for `url`."""
+    parts = urlsplit(url)
+    path = unquote(parts.path).strip("/")
+    return os.path.join(fixtures_dir, parts.netloc, *[p for p in path.split("/") if p], "index.html")
+
+
+def record_fixture(fixtures_dir: str, url: str, content: bytes) -> str:
+    path = fixture_path(fixtures_dir, url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+    print(f"Recorded {url} -> {path}")
+    return path
+
+
+def fixture_overrides(base_url: str) -> Dict[str, str]:
+    """host_overrides for AsyncFetcher that route every known origin to the stand-in."""
+    base_url = base_url.rstrip("/")
+    return {origin: f"{base_url}/{urlsplit(origin).netloc}" for origin in KNOWN_ORIGINS}
+
+
+def _make_handler(fixtures_dir: str, request_log: list):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            request_log.append({"path": self.path, "headers": dict(self.headers)})
+            host, _, rest = self.path.lstrip("/").partition("/")
+            path = fixture_path(fixtures_dir, f"http://{host}/{rest.split('?')[0]}")
+            if not os.path.isfile(path):
+                self.send_error(404)
+                return
+
+            with open(path, "rb") as f:
+                body = f.read()
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            last_modified = formatdate(os.path.getmtime(path), usegmt=True)
+
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+@contextmanager
+def serve_fixtures(fixtures_dir: str, port: int = 0):
+    """
+    Serve `fixtures_dir` on 127.0.0.1 in a background thread.
+
+    Yields (base_url, request_log); request_log records every request path and
+    its headers so callers can check rate limiting and conditional GETs.
+    """
+    request_log = []
+    server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(fixtures_dir, request_log))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", request_log
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures_dir")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    with serve_fixtures(args.fixtures_dir, args.port) as (base_url, _):
+        print(f"Serving {args.fixtures_dir} at {base_url} (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
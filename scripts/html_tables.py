@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+HTML table extraction backends for the EPA scrapers.
+
+The scrapers only need the cell text of one table per page, but used to build a
+full BeautifulSoup tree of the whole page first. extract_table_rows() returns
+the same rows (one list of cell strings per <tr>, text joined like
+`get_text(strip=True)`) through one of several backends:
+
+- "lxml":   libxml2 parse of the isolated <table> fragment (used when lxml is installed)
+- "stream": stdlib html.parser event stream over the isolated fragment; never
+            builds a tree (always available)
+- "bs4":    the original BeautifulSoup(..., 'html.parser') walk over the full page,
+            kept as the reference implementation
+
+"auto" picks lxml, then stream. The fast backends first cut the target table
+out of the raw page text, so the rest of the (much larger) page is never parsed.
+
+Set NFL_HTML_BACKEND to force a backend.
+"""
+
+import os
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Sequence, Union
+
+try:
+    import lxml.html as lxml_html
+except ImportError:  # optional fast path
+    lxml_html = None
+
+BACKENDS = ("lxml", "stream", "bs4")
+
+_TABLE_TAG = re.compile(r"<(/?)table\b[^>]*>", re.IGNORECASE)
+_ATTR = r"""\b{name}\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))"""
+
+Rows = List[List[str]]
+
+
+def available_backends() -> List[str]:
+    return [b for b in BACKENDS if b != "lxml" or lxml_html is not None]
+
+
+def resolve_backend(backend: str = "auto") -> str:
+    backend = os.environ.get("NFL_HTML_BACKEND", backend) if backend == "auto" else backend
+    if backend == "auto":
+        return "lxml" if lxml_html is not None else "stream"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML backend {backend!r}; expected one of {BACKENDS} or 'auto'")
+    if backend == "lxml" and lxml_html is None:
+        raise ImportError("lxml is not installed; use backend='stream' or pip install lxml")
+    return backend
+
+
+def _decode(content: Union[bytes, str]) -> str:
+    if isinstance(content, bytes):
+        return content.decode("utf-8", errors="replace")
+    return content
+
+
+def _attr_value(tag: str, name: str) -> Optional[str]:
+    match = re.search(_ATTR.format(name=name), tag, re.IGNORECASE)
+    if not match:
+        return None
+    return next(g for g in match.groups() if g is not None)
+
+
+def _table_matches(tag: str, table_class: Optional[str], table_id: Optional[str]) -> bool:
+    if table_class is not None and table_class not in (_attr_value(tag, "class") or "").split():
+        return False
+    if table_id is not None and _attr_value(tag, "id") != table_id:
+        return False
+    return True
+
+
+def isolate_table(text: str, table_class: Optional[str] = None, table_id: Optional[str] = None) -> Optional[str]:
+    """Raw HTML of the first matching <table>...</table> (nested tables included), or None."""
+    start = None
+    depth = 0
+    for match in _TABLE_TAG.finditer(text):
+        closing = match.group(1) == "/"
+        if start is None:
+            if not closing and _table_matches(match.group(0), table_class, table_id):
+                start, depth = match.start(), 1
+            continue
+        depth += -1 if closing else 1
+        if depth == 0:
+            return text[start:match.end()]
+    # Unterminated table: hand the parser everything after the start tag
+    return text[start:] if start is not None else None
+
+
+class _RowCollector(HTMLParser):
+    """Streaming collector of <td>/<th> text per <tr>, mirroring BeautifulSoup's find_all semantics."""
+
+    def __init__(self, cell_tags: Sequence[str]):
+        super().__init__(convert_charrefs=True)
+        self.cell_tags = set(cell_tags)
+        self.rows: Rows = []
+        self._row_depth = 0
+        self._cell_depth = 0
+        self._cell_parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip_depth += 1
+        elif tag == "tr":
+            if self._row_depth == 0:
+                self.rows.append([])
+            self._row_depth += 1
+        elif tag in self.cell_tags and self._row_depth:
+            if self._cell_depth == 0:
+                self._cell_parts = []
+            self._cell_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "tr":
+            self._row_depth = max(0, self._row_depth - 1)
+        elif tag in self.cell_tags and self._cell_depth:
+            self._cell_depth -= 1
+            if self._cell_depth == 0:
+                self.rows[-1].append("".join(self._cell_parts))
+
+    def handle_data(self, data):
+        if self._cell_depth and not self._skip_depth:
+            stripped = data.strip()
+            if stripped:
+                self._cell_parts.append(stripped)
+
+
+def _rows_stream(fragment: str, cell_tags: Sequence[str]) -> Rows:
+    collector = _RowCollector(cell_tags)
+    collector.feed(fragment)
+    collector.close()
+    return collector.rows
+
+
+def _text_lxml(element) -> str:
+    return "".join(t.strip() for t in element.itertext() if t.strip())
+
+
+def _rows_lxml(fragment: str, cell_tags: Sequence[str]) -> Rows:
+    table = lxml_html.fragment_fromstring(fragment)
+    rows = []
+    for tr in table.iter("tr"):
+        cells = [c for c in tr.iter(*cell_tags) if c is not tr]
+        rows.append([_text_lxml(c) for c in cells])
+    return rows
+
+
+def _rows_bs4(text: str, table_class: Optional[str], table_id: Optional[str], cell_tags: Sequence[str]) -> Optional[Rows]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(text, "html.parser")
+    attrs = {}
+    if table_class is not None:
+        attrs["class_"] = table_class
+    if table_id is not None:
+        attrs["id"] = table_id
+    table = soup.find("table", **attrs)
+    if table is None:
+        return None
+    return [[c.get_text(strip=True) for c in tr.find_all(list(cell_tags))] for tr in table.find_all("tr")]
+
+
+def extract_table_rows(
+    content: Union[bytes, str],
+    table_class: Optional[str] = None,
+    table_id: Optional[str] = None,
+    cell_tags: Sequence[str] = ("td",),
+    backend: str = "auto",
+) -> Optional[Rows]:
+    """
+    Cell text of every <tr> in the first table matching `table_class`/`table_id`.
+
+    Returns one list of strings per row (header rows included, as with
+    table.find_all('tr')), or None when no matching table exists.
+    """
+    backend = resolve_backend(backend)
+    text = _decode(content)
+    if backend == "bs4":
+        return _rows_bs4(text, table_class, table_id, cell_tags)
+
+    fragment = isolate_table(text, table_class, table_id)
+    if fragment is None:
+        return None
+    if backend == "lxml":
+        return _rows_lxml(fragment, cell_tags)
+    return _rows_stream(fragment, cell_tags)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP response cache for the EPA scrapers and debug scripts.
+
+AsyncFetcher (async_fetch.py) consults this cache before every request, so
+re-running a scraper or debug script while iterating on a parser reads the
+cached page bytes instead of hitting the live site.
+
+Layout of the cache directory:
+    bodies/<key>.body    # raw response bytes
+    index.json           # key -> url, status, headers, ETag, Last-Modified, size, times
+
+Keys are the sha256 of the URL plus the request headers that change what a
+site returns (Accept, Accept-Language); cookies and User-Agent are not part of
+the key, so every scraper shares one cached copy of a page.
+
+Modes:
+- normal:  entries younger than `ttl` are served from disk; older ones are
+           revalidated with a conditional GET (304 refreshes the entry).
+- refresh: always go to the network (the response is still cached).
+- replay:  strict offline mode; only cached responses are served, whatever
+           their age, and a miss is an error. No request ever leaves the
+           machine, which is what CI and parser work need.
+
+When the total body size exceeds `max_bytes` the least recently used
+responses are evicted.
+
+Environment overrides:
+    NFL_HTTP_CACHE_DIR        cache directory (default: data/http_cache)
+    NFL_HTTP_CACHE_TTL        seconds a response is served without revalidation (default: 1 hour)
+    NFL_HTTP_CACHE_MAX_BYTES  size bound for cached bodies (default: 200 MB)
+    NFL_HTTP_CACHE_MODE       normal | refresh | replay
+    NFL_OFFLINE               set to 1 to force replay mode (same flag as the PBP cache)
+
+Usage:
+    python3 scripts/http_cache.py            # show cached responses
+    python3 scripts/http_cache.py --clear    # drop everything
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CACHE_DIR = os.path.join(REPO_ROOT, "data", "http_cache")
+DEFAULT_TTL = 60 * 60
+DEFAULT_MAX_BYTES = 200 * 1024 ** 2
+MODES = ("normal", "refresh", "replay")
+
+# Request headers that can change the body a site returns
+KEY_HEADERS = ("Accept", "Accept-Language")
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class CacheMiss(LookupError):
+    """Raised in replay mode when a response is not in the cache."""
+
+
+class ResponseCache:
+    """URL + header keyed, TTL- and size-bounded cache of HTTP response bodies."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        mode: Optional[str] = None,
+    ):
+        self.cache_dir = cache_dir or os.environ.get("NFL_HTTP_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.ttl = float(ttl if ttl is not None else os.environ.get("NFL_HTTP_CACHE_TTL", DEFAULT_TTL))
+        self.max_bytes = int(max_bytes if max_bytes is not None else os.environ.get("NFL_HTTP_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        if mode is None:
+            mode = "replay" if _env_flag("NFL_OFFLINE") else os.environ.get("NFL_HTTP_CACHE_MODE", "normal")
+        if mode not in MODES:
+            raise ValueError(f"Unknown HTTP cache mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+
+        self.bodies_dir = os.path.join(self.cache_dir, "bodies")
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        os.makedirs(self.bodies_dir, exist_ok=True)
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    # -----------------------------
+    # Index
+    # -----------------------------
+
+    def _read_index(self) -> Dict[str, dict]:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"WARNING: HTTP cache index unreadable ({e}); starting fresh")
+            return {}
+
+    def _write_index(self, index: Dict[str, dict]) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.bodies_dir, f"{key}.body")
+
+    @staticmethod
+    def key(url: str, headers: Optional[Dict[str, str]] = None) -> str:
+        """Cache key for a GET of `url` with the given request headers."""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        parts = [url] + [f"{h.lower()}={headers.get(h.lower(), '')}" for h in KEY_HEADERS]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    # -----------------------------
+    # Lookups and writes
+    # -----------------------------
+
+    def lookup(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[dict]:
+        """
+        Return the cached entry (with its body under "content") or None.
+
+        Entries carry "fresh": True when they may be served without revalidation.
+        In replay mode every cached entry is fresh and a miss raises CacheMiss.
+        """
+        key = self.key(url, headers)
+        index = self._read_index()
+        entry = index.get(key)
+        path = self._body_path(key)
+        if entry is None or not os.path.exists(path):
+            if self.replay:
+                raise CacheMiss(f"{url} is not in the HTTP cache ({self.cache_dir}) and replay mode is on")
+            return None
+
+        with open(path, "rb") as f:
+            content = f.read()
+        entry["last_access"] = time.time()
+        index[key] = entry
+        self._write_index(index)
+
+        age = time.time() - entry.get("fetched_at", 0.0)
+        fresh = self.replay or (self.mode == "normal" and age < self.ttl)
+        return dict(entry, key=key, content=content, fresh=fresh)
+
+    def store(self, url: str, headers: Optional[Dict[str, str]], status: int,
+              response_headers: Dict[str, str], content: bytes) -> str:
+        """Cache a successful response body; returns its key."""
+        key = self.key(url, headers)
+        fd, tmp_path = tempfile.mkstemp(dir=self.bodies_dir, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, self._body_path(key))
+
+        now = time.time()
+        index = self._read_index()
+        index[key] = {
+            "url": url,
+            "status": int(status),
+            "headers": dict(response_headers),
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+            "size": len(content),
+            "fetched_at": now,
+            "last_access": now,
+        }
+        self._write_index(index)
+        self.evict(keep={key})
+        return key
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as just revalidated (after a 304 Not Modified)."""
+        index = self._read_index()
+        if key in index:
+            index[key]["fetched_at"] = index[key]["last_access"] = time.time()
+            self._write_index(index)
+
+    # -----------------------------
+    # Maintenance
+    # -----------------------------
+
+    def evict(self, max_bytes: Optional[int] = None, keep: Optional[set] = None) -> List[str]:
+        """Drop least recently used responses until bodies fit in `max_bytes`."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        keep = keep or set()
+        index = self._read_index()
+        total = sum(e.get("size", 0) for e in index.values())
+        evicted = []
+        for key, entry in sorted(index.items(), key=lambda kv: kv[1].get("last_access", 0.0)):
+            if total <= max_bytes:
+                break
+            if key in keep:
+                continue
+            del index[key]
+            if os.path.exists(self._body_path(key)):
+                os.remove(self._body_path(key))
+            total -= entry.get("size", 0)
+            evicted.append(entry["url"])
+
+        if evicted:
+            self._write_index(index)
+            print(f"Evicted {len(evicted)} responses from HTTP cache")
+        return evicted
+
+    def clear(self) -> None:
+        self.evict(max_bytes=0)
+
+    def info(self) -> List[dict]:
+        """One summary row per cached response, most recently fetched first."""
+        now = time.time()
+        rows = [
+            {"url": e["url"], "status": e["status"], "bytes": e.get("size", 0),
+             "age_s": round(now - e.get("fetched_at", 0.0)), "etag": e.get("etag")}
+            for e in self._read_index().values()
+        ]
+        return sorted(rows, key=lambda r: r["age_s"])
+
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide default cache (configured from the environment)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clear", action="store_true", help="remove every cached response")
+    args = parser.parse_args()
+
+    cache = get_response_cache()
+    if args.clear:
+        cache.clear()
+    rows = cache.info()
+    print(f"HTTP cache at {cache.cache_dir} (mode={cache.mode}, ttl={cache.ttl:g}s): {len(rows)} responses")
+    for row in rows:
+        print(f"  {row['status']} {row['bytes']:>9,} B  age {row['age_s']:>7}s  {row['url']}")
+
+
+if __name__ == "__main__":
+    main()
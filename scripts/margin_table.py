@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Key-number aware margin distribution built from historical NFL results.
+
+NFL margins cluster on 3, 7, 10, 6, 14 and 4, so a normal approximation badly
+misprices pushes and half-point moves around -3 / -7. This module builds, once,
+a table of P(final margin = m | expected margin = e) from every cached nflverse
+play-by-play season, and answers cover / push / lose probabilities for any
+half- or whole-point line with array indexing (O(1) per game):
+
+    table = get_margin_table()
+    cover, push, lose = table.probabilities(expected_margin=2.5, line=-3)
+
+Conventions (same as join_schedule's team_line): `expected_margin` is the
+team's expected points minus the opponent's, and `line` is the points the team
+gets on the spread (-3 for a 3-point favorite). The team covers when
+margin + line > 0 and pushes when margin + line == 0.
+
+Table layout:
+    rows  expected margin -E_MAX..E_MAX in EXPECTED_STEP (0.5) point steps
+    cols  final margin -M_MAX..M_MAX (whole points; the end columns absorb the tails)
+
+Each row is a histogram of final margins for games whose closing spread is
+near that row's expected margin (Gaussian kernel on the line, widened until
+MIN_GAMES effective games are covered), blended with a discretized normal
+prior for sparse rows. Every game is counted from both sides, so the table is
+symmetric: P(m | e) == P(-m | -e).
+
+The table is saved as a ~40 KB compressed .npz (float32) and rebuilt only on request.
+
+Environment overrides:
+    NFL_MARGIN_TABLE_PATH    table file (default: data/margin_table.npz)
+
+Usage:
+    python3 scripts/margin_table.py build                  # every cached PBP season
+    python3 scripts/margin_table.py build --seasons 2006-2024
+    python3 scripts/margin_table.py show 3 --lines -2.5 -3 -3.5 -7
+"""
+
+import os
+import tempfile
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TABLE_PATH = os.environ.get("NFL_MARGIN_TABLE_PATH", os.path.join(REPO_ROOT, "data", "margin_table.npz"))
+
+E_MAX = 24.0            # largest |expected margin| with its own row
+EXPECTED_STEP = 0.5     # row spacing (half points)
+M_MAX = 60              # margins beyond +/-M_MAX are folded into the end columns
+BANDWIDTH = 1.0         # kernel width over the closing line, points
+MIN_GAMES = 150.0       # effective games per row before the kernel is widened
+PRIOR_GAMES = 25.0      # weight of the normal prior, in games
+PRIOR_SD = 13.5         # historical SD of the final margin around the line
+
+GAME_COLUMNS = ["game_id", "season", "home_score", "away_score", "spread_line"]
+
+
+# -----------------------------
+# Historical games
+# -----------------------------
+
+def games_from_pbp(pbp: pd.DataFrame) -> pd.DataFrame:
+    """One row per game: closing home line (nflverse: positive = home favored) and home margin."""
+    games = (
+        pbp.groupby("game_id")
+           .agg(season=("season", "first"),
+                home_score=("home_score", "max"), away_score=("away_score", "max"),
+                spread_line=("spread_line", "first"))
+           .dropna()
+           .reset_index()
+    )
+    games["margin"] = games["home_score"] - games["away_score"]
+    return games
+
+
+def load_games(seasons: Optional[Iterable[int]] = None) -> pd.DataFrame:
+    """Games with a closing line from every cached PBP season (or `seasons`), one season at a time."""
+    from pbp_cache import get_pbp_cache, read_pbp
+
+    seasons = list(seasons) if seasons is not None else get_pbp_cache().available_seasons()
+    frames = [games_from_pbp(read_pbp([season], columns=GAME_COLUMNS)) for season in seasons]
+    if not frames:
+        raise ValueError("No PBP seasons available to build the margin table")
+    return pd.concat(frames, ignore_index=True)
+
+
+# -----------------------------
+# Table
+# -----------------------------
+
+class MarginTable:
+    """P(final margin | expected margin) with precomputed CDFs for O(1) cover/push lookups."""
+
+    def __init__(self, pmf: np.ndarray, seasons: Optional[List[int]] = None, n_games: int = 0):
+        self.pmf = np.asarray(pmf, dtype=np.float64)
+        self.seasons = list(seasons or [])
+        self.n_games = int(n_games)
+        self.expected = np.arange(-E_MAX, E_MAX + EXPECTED_STEP / 2, EXPECTED_STEP)
+        self.margins = np.arange(-M_MAX, M_MAX + 1)
+        if self.pmf.shape != (len(self.expected), len(self.margins)):
+            raise ValueError(f"margin table has shape {self.pmf.shape}, expected {(len(self.expected), len(self.margins))}")
+        # cdf[:, j] = P(margin <= margins[j - 1]); column 0 is 0 so index -1 needs no branch
+        self.cdf = np.concatenate([np.zeros((len(self.expected), 1)), np.cumsum(self.pmf, axis=1)], axis=1)
+        self.cdf[:, -1] = 1.0
+
+    # Construction
+
+    @classmethod
+    def from_games(cls, games: pd.DataFrame) -> "MarginTable":
+        """Build from games_from_pbp() rows (home spread_line and home margin)."""
+        line = games["spread_line"].to_numpy(dtype="float64")
+        margin = games["margin"].to_numpy(dtype="float64")
+        # Both sides of every game: (home line, home margin) and (away line, away margin)
+        line = np.concatenate([line, -line])
+        margin = np.clip(np.concatenate([margin, -margin]), -M_MAX, M_MAX).astype(np.int64) + M_MAX
+
+        expected = np.arange(-E_MAX, E_MAX + EXPECTED_STEP / 2, EXPECTED_STEP)
+        margins = np.arange(-M_MAX, M_MAX + 1)
+        pmf = np.zeros((len(expected), len(margins)))
+        for i, e in enumerate(expected):
+            bandwidth = BANDWIDTH
+            while True:
+                weights = np.exp(-0.5 * ((line - e) / bandwidth) ** 2)
+                if weights.sum() >= MIN_GAMES or bandwidth >= 4 * BANDWIDTH:
+                    break
+                bandwidth *= 1.5
+            counts = np.bincount(margin, weights=weights, minlength=len(margins))
+            prior = np.exp(-0.5 * ((margins - e) / PRIOR_SD) ** 2)
+            prior *= PRIOR_GAMES / prior.sum()
+            row = counts + prior
+            pmf[i] = row / row.sum()
+
+        seasons = sorted(int(s) for s in games["season"].unique()) if "season" in games.columns else []
+        return cls(pmf, seasons=seasons, n_games=len(games))
+
+    @classmethod
+    def build(cls, seasons: Optional[Iterable[int]] = None) -> "MarginTable":
+        return cls.from_games(load_games(seasons))
+
+    # Persistence
+
+    def save(self, path: str = DEFAULT_TABLE_PATH) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".npz")
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(
+                f, pmf=self.pmf.astype(np.float32), seasons=np.array(self.seasons, dtype=np.int16),
+                n_games=np.int64(self.n_games), e_max=E_MAX, step=EXPECTED_STEP, m_max=M_MAX,
+            )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TABLE_PATH) -> "MarginTable":
+        with np.load(path) as data:
+            if float(data["e_max"]) != E_MAX or float(data["step"]) != EXPECTED_STEP or int(data["m_max"]) != M_MAX:
+                raise ValueError(f"{path} was built with a different grid; rebuild it (python3 scripts/margin_table.py build)")
+            pmf = data["pmf"].astype(np.float64)
+            return cls(pmf / pmf.sum(axis=1, keepdims=True), seasons=data["seasons"].tolist(), n_games=int(data["n_games"]))
+
+    # Lookups
+
+    def _rows(self, expected_margin) -> np.ndarray:
+        """Nearest half-point row for each expected margin (clipped to +/-E_MAX)."""
+        e = np.clip(np.asarray(expected_margin, dtype="float64"), -E_MAX, E_MAX)
+        return np.rint((e + E_MAX) / EXPECTED_STEP).astype(np.int64)
+
+    def _cdf_at(self, rows: np.ndarray, k: np.ndarray) -> np.ndarray:
+        """P(margin <= k) for whole-point k."""
+        cols = np.clip(k - (-M_MAX) + 1, 0, len(self.margins))
+        return self.cdf[rows, cols]
+
+    def probabilities(self, expected_margin, line) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (cover, push, lose) probabilities for a team with `expected_margin`
+        getting `line` points. Scalars or arrays (broadcast together).
+        """
+        rows = self._rows(expected_margin)
+        threshold = -np.asarray(line, dtype="float64")        # cover when margin > threshold
+        rows, threshold = np.broadcast_arrays(rows, threshold)
+        below = np.ceil(threshold).astype(np.int64) - 1          # largest margin < threshold
+        at_or_below = np.floor(threshold).astype(np.int64)       # largest margin <= threshold
+        lose = self._cdf_at(rows, below)
+        not_cover = self._cdf_at(rows, at_or_below)
+        return 1.0 - not_cover, not_cover - lose, lose
+
+    def cover_probability(self, expected_margin, line, exclude_push: bool = False) -> np.ndarray:
+        """P(cover), or P(cover | no push) with exclude_push=True."""
+        cover, push, _ = self.probabilities(expected_margin, line)
+        if exclude_push:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return cover / (1.0 - push)
+        return cover
+
+    def margin_pmf(self, expected_margin: float) -> pd.Series:
+        """Full final-margin distribution for one expected margin."""
+        return pd.Series(self.pmf[int(self._rows(expected_margin))], index=self.margins, name="probability")
+
+
+_default_table: Optional[MarginTable] = None
+
+
+def get_margin_table(path: str = DEFAULT_TABLE_PATH) -> MarginTable:
+    """Return the process-wide table, building and saving it from cached PBP on first use."""
+    global _default_table
+    if _default_table is None:
+        if os.path.exists(path):
+            _default_table = MarginTable.load(path)
+        else:
+            print(f"⚠️  No margin table at {path}; building from cached PBP seasons")
+            _default_table = MarginTable.build()
+            _default_table.save(path)
+    return _default_table
+
+
+def cover_push_lose(expected_margin, line) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(cover, push, lose) probabilities from the default table (see MarginTable.probabilities)."""
+    return get_margin_table().probabilities(expected_margin, line)
+
+
+def _parse_seasons(spec: Optional[str]) -> Optional[List[int]]:
+    if not spec:
+        return None
+    seasons = []
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        seasons.extend(range(int(first), int(last or first) + 1))
+    return seasons
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="rebuild the table from cached PBP")
+    build.add_argument("--seasons", help="e.g. 1999-2024 (default: every cached season)")
+    build.add_argument("--output", default=DEFAULT_TABLE_PATH)
+    show = sub.add_parser("show", help="print probabilities for one expected margin")
+    show.add_argument("expected_margin", type=float)
+    show.add_argument("--lines", type=float, nargs="*", default=[-2.5, -3.0, -3.5, -6.5, -7.0, -7.5])
+    show.add_argument("--path", default=DEFAULT_TABLE_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        table = MarginTable.build(_parse_seasons(args.seasons))
+        path = table.save(args.output)
+        print(f"✅ Margin table from {table.n_games} games ({table.seasons[0]}-{table.seasons[-1]}) saved to {path}")
+        return
+
+    table = get_margin_table(args.path)
+    pmf = table.margin_pmf(args.expected_margin)
+    print(f"=== Expected margin {args.expected_margin:+.1f} ({table.n_games} games) ===")
+    print("Most likely margins: " + ", ".join(f"{m:+d} ({p:.1%})" for m, p in pmf.nlargest(6).items()))
+    cover, push, lose = table.probabilities(np.full(len(args.lines), args.expected_margin), args.lines)
+    print(pd.DataFrame({"line": args.lines, "cover": cover, "push": push, "lose": lose}).round(4).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
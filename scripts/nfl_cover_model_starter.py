@@ -22,6 +22,7 @@ Notes:
 from __future__ import annotations
 import io
 import os
+import re
 import sys
 from typing import List, Tuple
 
@@ -36,42 +37,45 @@ from sklearn.metrics import log_loss, brier_score_loss, accuracy_score
 from sklearn.calibration import calibration_curve
 import matplotlib.pyplot as plt
 
+from pbp_cache import read_pbp
+from rolling_engine import attach_opponent_features, compute_rolling_features
+
 
 # -----------------------------
 # Configuration
 # -----------------------------
 
 SEASONS = [2023, 2024]  # Use available data (2025 only has Week 1)
+TEST_SEASONS = tuple(SEASONS[-1:])  # held out by train_and_evaluate / train_underdog_model
 DATA_DIR = os.environ.get("NFL_DATA_DIR", ".")  # optional: set to a local data folder
 SAVE_FEATURES_CSV = "team_game_features.csv"
 SAVE_MODEL = "logreg_model.pkl"  # optional: if you want to persist
+USE_FEATURE_STORE = os.environ.get("NFL_FEATURE_STORE", "1") != "0"  # incremental team-game store (team_game_store.py)
+
+# PBP columns used by build_team_game_rows (everything else in the ~370-column file is skipped)
+PBP_COLUMNS = [
+    "game_id", "play_id", "season", "week", "season_type", "posteam", "defteam",
+    "epa", "down", "yards_gained", "play_type",
+    "pass", "rush", "qb_scramble", "qb_hit", "sack", "penalty", "accepted_penalty",
+]
 
 
 # -----------------------------
 # Data Access Helpers
 # -----------------------------
 
-def load_pbp_for_seasons(seasons: List[int]) -> pd.DataFrame:
+def load_pbp_for_seasons(seasons: List[int], columns: List[str] = PBP_COLUMNS) -> pd.DataFrame:
     """
     Load nflverse play-by-play parquet for the given seasons.
-    Uses GitHub-hosted parquet files by default. Consider caching locally.
+    Files are served from the shared on-disk PBP cache (see pbp_cache.py), which
+    downloads from the nflverse GitHub releases only when a season is missing or stale.
+    Only `columns` are read, and the regular season + playoffs filter is pushed
+    down into the parquet scan instead of being applied after a full load.
     """
     # Parquet mirrors: https://github.com/nflverse/nflverse-data/releases
-    dfs = []
-    for yr in seasons:
-        # Parquet URL pattern as of 2024+; adjust if structure changes
-        url = f"https://github.com/nflverse/nflverse-data/releases/download/pbp/play_by_play_{yr}.parquet"
-        print(f"Loading PBP {yr} from {url} ...")
-        try:
-            df = pd.read_parquet(url, engine="pyarrow")
-        except Exception as e:
-            print(f"WARNING: Could not load {url} ({e}). Trying local fallback if present...")
-            local_path = os.path.join(DATA_DIR, f"play_by_play_{yr}.parquet")
-            df = pd.read_parquet(local_path, engine="pyarrow")
-        dfs.append(df)
-    pbp = pd.concat(dfs, ignore_index=True)
+    print(f"Loading PBP {seasons} ({len(columns) if columns else 'all'} columns) ...")
     # Keep only regular season + playoffs
-    pbp = pbp[pbp["season_type"].isin(["REG", "POST"])]
+    pbp = read_pbp(seasons, columns=columns, filters={"season_type": ["REG", "POST"]})
     return pbp
 
 
@@ -199,6 +203,10 @@ def build_team_game_rows(pbp: pd.DataFrame) -> pd.DataFrame:
         if col in df.columns:
             df[col] = df[col].fillna(0).astype(int)
 
+    # nflverse PBP has no accepted_penalty column; fall back to the penalty flag
+    if "accepted_penalty" not in df.columns:
+        df["accepted_penalty"] = df["penalty"]
+
     # Success = EPA > 0
     df["success"] = (df["epa"] > 0).astype(int)
 
@@ -213,6 +221,11 @@ def build_team_game_rows(pbp: pd.DataFrame) -> pd.DataFrame:
     st_types = {"punt", "kickoff", "field_goal", "extra_point", "qb_kneel", "qb_spike"}
     df["special_teams_play"] = df["play_type"].isin(st_types).astype(int)
 
+    # Precomputed masked columns so every aggregate below is a plain groupby reduction
+    # (no per-group Python lambdas indexing back into df)
+    df["early_down_pass"] = df["pass"] * df["early_down"]
+    df["st_epa"] = df["epa"].where(df["special_teams_play"] == 1)
+
     # --- Offensive aggregation (by posteam) ---
     off = (
         df.groupby(["game_id", "posteam"], dropna=False)
@@ -223,14 +236,24 @@ def build_team_game_rows(pbp: pd.DataFrame) -> pd.DataFrame:
               explosiveness_off=("explosive", "mean"),
               pass_rate_off=("pass", "mean"),
               rush_rate_off=("rush", "mean"),
-              early_down_pass_rate=("pass", lambda s: (s * df.loc[s.index, "early_down"]).sum() / max(1, df.loc[s.index, "early_down"].sum())),
+              early_down_passes=("early_down_pass", "sum"),
+              early_downs=("early_down", "sum"),
               sacks_off=("sack", "sum"),
               penalties_off=("accepted_penalty", "sum"),
-              st_epa_off=("epa", lambda s: s[df.loc[s.index, "special_teams_play"] == 1].mean() if (df.loc[s.index, "special_teams_play"] == 1).any() else 0.0),
+              st_epa_off=("st_epa", "mean"),
+              st_plays_off=("special_teams_play", "sum"),
           )
           .reset_index()
           .rename(columns={"posteam": "team"})
     )
+    off["early_down_pass_rate"] = off["early_down_passes"] / off["early_downs"].clip(lower=1)
+    # Groups with no special teams plays get 0.0 (not NaN)
+    off["st_epa_off"] = off["st_epa_off"].where(off["st_plays_off"] > 0, 0.0)
+    off = off[[
+        "game_id", "team", "plays_off", "epa_off", "success_off", "explosiveness_off",
+        "pass_rate_off", "rush_rate_off", "early_down_pass_rate", "sacks_off",
+        "penalties_off", "st_epa_off",
+    ]]
 
     # --- Defensive aggregation (by defteam) ---
     # Here epa_def_allowed is opponent's offensive epa against this defense.
@@ -243,11 +266,14 @@ def build_team_game_rows(pbp: pd.DataFrame) -> pd.DataFrame:
               explosiveness_def_allowed=("explosive", "mean"),
               sacks_def=("sack", "sum"),     # sacks made (since sack is tied to the play regardless of posteam/defteam)
               penalties_def=("accepted_penalty", "sum"),
-              st_epa_def=("epa", lambda s: s[df.loc[s.index, "special_teams_play"] == 1].mean() if (df.loc[s.index, "special_teams_play"] == 1).any() else 0.0),
+              st_epa_def=("st_epa", "mean"),
+              st_plays_def=("special_teams_play", "sum"),
           )
           .reset_index()
           .rename(columns={"defteam": "team"})
     )
+    deff["st_epa_def"] = deff["st_epa_def"].where(deff["st_plays_def"] > 0, 0.0)
+    deff = deff.drop(columns=["st_plays_def"])
 
     # Merge offense + defense on (game_id, team)
     team_game = pd.merge(off, deff, on=["game_id", "team"], how="outer")
@@ -299,48 +325,50 @@ def join_schedule(team_game: pd.DataFrame, sched: pd.DataFrame) -> pd.DataFrame:
     return x
 
 
-def add_rolling_features(team_game_sched: pd.DataFrame, windows: Tuple[int, ...] = (3, 5)) -> pd.DataFrame:
+ROLLING_FEATURE_COLS = [
+    "net_epa", "net_success_rate", "epa_off", "success_off", "explosiveness_off", "pass_rate_off", "rush_rate_off",
+    "early_down_pass_rate", "sacks_off", "penalties_off", "st_epa_off",
+    "epa_def_allowed", "success_def_allowed", "explosiveness_def_allowed",
+    "sacks_def", "penalties_def", "st_epa_def"
+]
+
+
+def add_rolling_features(
+    team_game_sched: pd.DataFrame,
+    windows: Tuple[int, ...] = (3, 5),
+    ewm_spans: Tuple[float, ...] = (),
+) -> pd.DataFrame:
     """
-    For each team-season, compute rolling means of selected features over prior games.
+    For each team-season, compute rolling means (and optional EWM means) of selected
+    features over prior games, plus the same features for the opponent entering the matchup.
+    All windows are computed in one pass by rolling_engine (cumulative sums, no per-group apply).
     """
     df = team_game_sched.copy()
 
     df = df.sort_values(["team", "season", "game_date"]).reset_index(drop=True)
 
-    feature_cols = [
-        "net_epa", "net_success_rate", "epa_off", "success_off", "explosiveness_off", "pass_rate_off", "rush_rate_off",
-        "early_down_pass_rate", "sacks_off", "penalties_off", "st_epa_off",
-        "epa_def_allowed", "success_def_allowed", "explosiveness_def_allowed",
-        "sacks_def", "penalties_def", "st_epa_def"
-    ]
-
-    for w in windows:
-        group = df.groupby(["team", "season"], group_keys=False)
-        rolled = group[feature_cols].apply(lambda g: g.shift(1).rolling(w, min_periods=1).mean())
-        rolled = rolled.add_suffix(f"_roll{w}")
-        for col in rolled.columns:
-            df[col] = rolled[col]
+    rolled = compute_rolling_features(df, ROLLING_FEATURE_COLS, windows=windows, ewm_spans=ewm_spans)
 
     # Optional opponent rolling features (last w games for opponent entering matchup)
-    for w in windows:
-        opp_cols = [f"{c}_roll{w}" for c in feature_cols]
-        # Merge opponent features by aligning opponent row on same game
-        opp = df[["game_id", "team"] + opp_cols].copy()
-        opp = opp.rename(columns={c: f"opp_{c}" for c in opp_cols})
-        df = pd.merge(df, opp, left_on=["game_id", "opp"], right_on=["game_id", "team"], how="left", suffixes=("", "_drop"))
-        df = df.drop(columns=["team_drop"], errors="ignore")
+    rolled_with_ids = pd.concat([df[["game_id", "team", "opp"]], rolled], axis=1)
+    opp = attach_opponent_features(rolled_with_ids, list(rolled.columns))
 
     # Drop first-game rows where no history exists? We'll keep them; model can learn NA handling if imputed.
-    df = df.reset_index(drop=True)
+    df = pd.concat([df, rolled, opp], axis=1)
     return df
 
 
+def is_rolling_feature(col: str) -> bool:
+    """True for rolling/EWM form features produced by add_rolling_features (own or opponent)."""
+    return re.search(r"_(roll|ewm)[0-9.]+$", col) is not None
+
+
 def finalize_training_table(df: pd.DataFrame) -> pd.DataFrame:
     """
     Clean/impute and select final features for modeling.
     """
     # Example: simple imputation (median) for rolling features that are NA at early season
-    feature_cols = [c for c in df.columns if c.endswith(("roll3", "roll5"))]
+    feature_cols = [c for c in df.columns if is_rolling_feature(c)]
     for col in feature_cols:
         df[col] = df[col].fillna(df[col].median())
 
@@ -382,7 +410,7 @@ def create_underdog_model(df: pd.DataFrame) -> pd.DataFrame:
     ]
     
     # Rolling EPA features
-    rolling_features = [c for c in underdog_df.columns if c.endswith(("roll3", "roll5"))]
+    rolling_features = [c for c in underdog_df.columns if is_rolling_feature(c)]
     
     # Underdog-specific feature set (prioritize net EPA)
     underdog_features = [
@@ -530,17 +558,26 @@ def train_and_evaluate(df: pd.DataFrame, X_cols: List[str], y_col: str, test_sea
 
 def main():
     print("=== Loading data ===")
-    pbp = load_pbp_for_seasons(SEASONS)
     sched = load_schedule_with_lines(SEASONS)
 
-    print("=== Building team-game features ===")
-    team_game = build_team_game_rows(pbp)
+    if USE_FEATURE_STORE:
+        # Only games not already in the store are read from PBP and featurized
+        print("=== Refreshing team-game feature store ===")
+        from team_game_store import TeamGameFeatureStore
+        store = TeamGameFeatureStore(windows=(3, 5))
+        store.update(sched)
+        df_roll = store.load(SEASONS)
+    else:
+        pbp = load_pbp_for_seasons(SEASONS)
+
+        print("=== Building team-game features ===")
+        team_game = build_team_game_rows(pbp)
 
-    print("=== Joining schedule and labeling ===")
-    df = join_schedule(team_game, sched)
+        print("=== Joining schedule and labeling ===")
+        df = join_schedule(team_game, sched)
 
-    print("=== Adding rolling features ===")
-    df_roll = add_rolling_features(df, windows=(3, 5))
+        print("=== Adding rolling features ===")
+        df_roll = add_rolling_features(df, windows=(3, 5))
 
     print("=== Finalizing training table ===")
     model_df, X_cols, y_col = finalize_training_table(df_roll)
@@ -551,7 +588,9 @@ def main():
     print(f"Saved features to {SAVE_FEATURES_CSV}")
 
     print("=== Training & evaluation ===")
-    clf, metrics, test_preds = train_and_evaluate(model_df, X_cols, y_col, test_seasons=(2023, 2024))
+    # Hold out the latest season only, so earlier SEASONS remain as training data
+    # (scripts/walk_forward_cv.py runs the week-by-week evaluation)
+    clf, metrics, test_preds = train_and_evaluate(model_df, X_cols, y_col, test_seasons=TEST_SEASONS)
 
     # Save test predictions for inspection
     test_preds_out = test_preds[["season", "week", "team", "opp", "is_home", "team_line", "margin", "cover_label", "pred"]].copy()
@@ -568,7 +607,7 @@ def main():
     if len(underdog_df) > 0:
         print("=== Training Underdog Model ===")
         underdog_clf, underdog_metrics, underdog_preds = train_underdog_model(
-            underdog_df, underdog_features, underdog_y, test_seasons=(2023, 2024)
+            underdog_df, underdog_features, underdog_y, test_seasons=TEST_SEASONS
         )
         
         if underdog_clf is not None:
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Shared on-disk cache for nflverse play-by-play parquet files.
+
+Every PBP loader in the repo (starter model, 2025 EPA updates, weekly results
+analysis) goes through this module instead of downloading
+play_by_play_{season}.parquet over HTTP on every run.
+
+Layout of the cache directory:
+    objects/<sha256>.parquet   # content-addressed parquet files
+    manifest.json              # season -> sha256, ETag, Last-Modified, size, access times
+
+Behaviour:
+- A season that was fetched less than `max_age` seconds ago is served straight
+  from disk with no network traffic.
+- Older entries are revalidated with a conditional GET (If-None-Match /
+  If-Modified-Since); a 304 just refreshes the timestamp.
+- Offline mode (NFL_OFFLINE=1) never touches the network and only serves cached
+  or pre-seeded files. Files named play_by_play_{season}.parquet found in the
+  seed directories (data/, images/, repo root, NFL_DATA_DIR) are adopted into
+  the cache automatically.
+- Checksums are computed on every write; reads re-hash the object only when its
+  size or mtime no longer matches the manifest (or verify=True is passed).
+- When the total object size exceeds `max_bytes` the least recently used
+  seasons are evicted.
+- read_pbp()/PBPCache.scan() read only the requested columns and push row
+  filters (season_type, week, ...) down into the pyarrow dataset scanner.
+- The manifest is read-modified-written without a lock, so one process should
+  own the cache. Process pools resolve every season up front with
+  paths_for() (nothing in the set is evicted) and hand the workers plain file
+  paths for read_pbp_files().
+
+Environment overrides:
+    NFL_PBP_CACHE_DIR        cache directory (default: data/pbp_cache)
+    NFL_PBP_CACHE_MAX_BYTES  size bound for cached objects (default: 2 GB)
+    NFL_PBP_CACHE_MAX_AGE    seconds before revalidating with nflverse (default: 6 hours)
+    NFL_OFFLINE              set to 1 to disable all network access
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PBP_URL_TEMPLATE = "https://github.com/nflverse/nflverse-data/releases/download/pbp/play_by_play_{season}.parquet"
+PBP_FILENAME_TEMPLATE = "play_by_play_{season}.parquet"
+
+DEFAULT_CACHE_DIR = os.path.join(REPO_ROOT, "data", "pbp_cache")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+DEFAULT_MAX_AGE = 6 * 60 * 60
+DEFAULT_SEED_DIRS = [
+    os.path.join(REPO_ROOT, "data"),
+    os.path.join(REPO_ROOT, "images"),
+    REPO_ROOT,
+]
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PBPCache:
+    """Content-addressed, size-bounded cache of nflverse PBP parquet files."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        offline: Optional[bool] = None,
+        seed_dirs: Optional[List[str]] = None,
+    ):
+        self.cache_dir = cache_dir or os.environ.get("NFL_PBP_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = int(max_bytes if max_bytes is not None else os.environ.get("NFL_PBP_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.max_age = float(max_age if max_age is not None else os.environ.get("NFL_PBP_CACHE_MAX_AGE", DEFAULT_MAX_AGE))
+        self.offline = _env_flag("NFL_OFFLINE") if offline is None else offline
+
+        if seed_dirs is None:
+            seed_dirs = list(DEFAULT_SEED_DIRS)
+            if os.environ.get("NFL_DATA_DIR"):
+                seed_dirs.insert(0, os.environ["NFL_DATA_DIR"])
+        self.seed_dirs = seed_dirs
+
+        self.objects_dir = os.path.join(self.cache_dir, "objects")
+        self.manifest_path = os.path.join(self.cache_dir, "manifest.json")
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    # -----------------------------
+    # Manifest
+    # -----------------------------
+
+    def _read_manifest(self) -> Dict[str, dict]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"WARNING: PBP cache manifest unreadable ({e}); starting fresh")
+            return {}
+
+    def _write_manifest(self, manifest: Dict[str, dict]) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, f"{sha256}.parquet")
+
+    # -----------------------------
+    # Validation
+    # -----------------------------
+
+    def _is_valid(self, entry: dict, verify: bool = False) -> bool:
+        """Cheap size/mtime check, falling back to a full checksum when they differ."""
+        path = self._object_path(entry["sha256"])
+        if not os.path.exists(path):
+            return False
+        stat = os.stat(path)
+        if not verify and stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+        if _sha256_file(path) != entry["sha256"]:
+            print(f"WARNING: checksum mismatch for cached PBP object {path}; discarding")
+            os.remove(path)
+            return False
+        entry["size"] = stat.st_size
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    # -----------------------------
+    # Storing objects
+    # -----------------------------
+
+    def _store_file(self, src_path: str, sha256: Optional[str] = None, move: bool = False) -> dict:
+        """Place a file in the object store and return its manifest fields."""
+        sha256 = sha256 or _sha256_file(src_path)
+        dest = self._object_path(sha256)
+        if not os.path.exists(dest):
+            if move:
+                os.replace(src_path, dest)
+            else:
+                shutil.copyfile(src_path, dest)
+        elif move:
+            os.remove(src_path)
+        stat = os.stat(dest)
+        return {"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def seed(self, season: int, path: str) -> str:
+        """Adopt a local parquet file as the cached copy for `season`."""
+        manifest = self._read_manifest()
+        # Seeded files carry no upstream validators, so they are revalidated
+        # in full the next time the cache is allowed online.
+        entry = self._store_file(path)
+        entry.update({
+            "season": int(season),
+            "source": os.path.abspath(path),
+            "etag": None,
+            "last_modified": None,
+            "fetched_at": 0.0,
+            "last_access": time.time(),
+        })
+        manifest[str(season)] = entry
+        self._write_manifest(manifest)
+        print(f"Seeded PBP cache for {season} from {path}")
+        return self._object_path(entry["sha256"])
+
+    def _find_seed_file(self, season: int) -> Optional[str]:
+        filename = PBP_FILENAME_TEMPLATE.format(season=season)
+        for directory in self.seed_dirs:
+            candidate = os.path.join(directory, filename)
+            if os.path.exists(candidate):
+                return candidate
+        return None
+
+    # -----------------------------
+    # Network
+    # -----------------------------
+
+    def _download(self, season: int, entry: Optional[dict]) -> Optional[dict]:
+        """
+        Conditionally fetch a season from nflverse.
+
+        Returns updated manifest fields, the existing entry on 304 Not Modified,
+        or raises on network errors.
+        """
+        import requests
+
+        url = PBP_URL_TEMPLATE.format(season=season)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        print(f"Fetching PBP {season} from {url} ...")
+        with requests.get(url, headers=headers, stream=True, timeout=60) as response:
+            if response.status_code == 304 and entry:
+                print(f"PBP {season} not modified upstream; using cached copy")
+                return dict(entry, fetched_at=time.time())
+            response.raise_for_status()
+
+            digest = hashlib.sha256()
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".parquet.part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                        f.write(chunk)
+                        digest.update(chunk)
+                fields = self._store_file(tmp_path, sha256=digest.hexdigest(), move=True)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        fields.update({
+            "season": int(season),
+            "source": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        })
+        return fields
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+
+    def path_for(self, season: int, refresh: bool = False, verify: bool = False,
+                 keep: Optional[set] = None) -> str:
+        """
+        Return a local path to the parquet file for `season`, fetching or
+        revalidating it if needed. Seasons in `keep` survive the eviction pass.
+        """
+        manifest = self._read_manifest()
+        key = str(season)
+        entry = manifest.get(key)
+        if entry is not None and not self._is_valid(entry, verify=verify):
+            entry = None
+
+        if entry is None:
+            seed_path = self._find_seed_file(season)
+            if seed_path is not None:
+                self.seed(season, seed_path)
+                manifest = self._read_manifest()
+                entry = manifest[key]
+
+        stale = entry is None or refresh or (time.time() - entry.get("fetched_at", 0.0)) > self.max_age
+        if stale and not self.offline:
+            try:
+                fetched = self._download(season, entry)
+                entry = dict(entry or {}, **fetched)
+            except Exception as e:
+                if entry is None:
+                    raise FileNotFoundError(f"PBP {season} unavailable: download failed ({e}) and nothing cached") from e
+                print(f"WARNING: could not revalidate PBP {season} ({e}); using cached copy")
+
+        if entry is None:
+            raise FileNotFoundError(
+                f"PBP {season} not in cache and offline mode is on; "
+                f"seed it with PBPCache.seed() or place {PBP_FILENAME_TEMPLATE.format(season=season)} in {self.seed_dirs}"
+            )
+
+        entry["last_access"] = time.time()
+        manifest[key] = entry
+        self._write_manifest(manifest)
+        self.evict(keep={key} | set(keep or ()))
+        return self._object_path(entry["sha256"])
+
+    def paths_for(self, seasons: List[int], refresh: bool = False) -> Dict[int, str]:
+        """path_for() several seasons at once; resolving one never evicts another."""
+        keep = {str(s) for s in seasons}
+        return {int(s): self.path_for(s, refresh=refresh, keep=keep) for s in seasons}
+
+    def load(self, season: int, refresh: bool = False, **read_kwargs) -> pd.DataFrame:
+        """Read one season of PBP into a DataFrame through the cache."""
+        path = self.path_for(season, refresh=refresh)
+        return pd.read_parquet(path, engine="pyarrow", **read_kwargs)
+
+    def scan(
+        self,
+        seasons: List[int],
+        columns: Optional[List[str]] = None,
+        filters=None,
+        refresh: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Read PBP for `seasons` with column projection and predicate pushdown.
+
+        Only `columns` are decoded, and `filters` are evaluated by the pyarrow
+        dataset scanner against row-group statistics and column chunks before
+        anything is materialized in pandas. Columns that a season's file does not
+        have (older/newer nflverse schemas) are skipped with a warning.
+
+        Args:
+            seasons: Seasons to read.
+            columns: Columns to keep (None = all columns).
+            filters: Either a dict {column: value or list of values} or a list of
+                (column, op, value) tuples as accepted by pyarrow/pandas.
+            refresh: Force revalidation of each season with nflverse.
+        """
+        return read_pbp_files(self.paths_for(seasons, refresh=refresh), columns=columns, filters=filters)
+
+    def evict(self, max_bytes: Optional[int] = None, keep: Optional[set] = None) -> List[str]:
+        """Drop least recently used seasons until cached objects fit in `max_bytes`."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        keep = keep or set()
+        manifest = self._read_manifest()
+
+        # Several seasons can share one object; count each object once.
+        sizes = {e["sha256"]: e.get("size", 0) for e in manifest.values()}
+        total = sum(sizes.values())
+        evicted = []
+        for key, entry in sorted(manifest.items(), key=lambda kv: kv[1].get("last_access", 0.0)):
+            if total <= max_bytes:
+                break
+            if key in keep:
+                continue
+            del manifest[key]
+            evicted.append(key)
+            if not any(e["sha256"] == entry["sha256"] for e in manifest.values()):
+                path = self._object_path(entry["sha256"])
+                if os.path.exists(path):
+                    os.remove(path)
+                total -= sizes.get(entry["sha256"], 0)
+
+        if evicted:
+            self._write_manifest(manifest)
+            print(f"Evicted PBP seasons from cache: {', '.join(evicted)}")
+        return evicted
+
+    def available_seasons(self) -> List[int]:
+        """Seasons that can be served without a download (cached or present in a seed directory)."""
+        seasons = {int(k) for k in self._read_manifest()}
+        prefix, suffix = PBP_FILENAME_TEMPLATE.split("{season}")
+        for directory in self.seed_dirs:
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                middle = name[len(prefix):-len(suffix)] if name.startswith(prefix) and name.endswith(suffix) else ""
+                if middle.isdigit():
+                    seasons.add(int(middle))
+        return sorted(seasons)
+
+    def info(self) -> pd.DataFrame:
+        """Summarize cached seasons (size, ETag, fetch/access times)."""
+        manifest = self._read_manifest()
+        if not manifest:
+            return pd.DataFrame(columns=["season", "sha256", "size", "etag", "last_modified", "fetched_at", "last_access"])
+        return pd.DataFrame(list(manifest.values())).sort_values("season").reset_index(drop=True)
+
+
+def read_pbp_files(paths: Dict[int, str], columns: Optional[List[str]] = None, filters=None) -> pd.DataFrame:
+    """
+    PBPCache.scan() over already-resolved season -> parquet path; never touches
+    the manifest, so process-pool workers can call it concurrently.
+    """
+    import pyarrow.dataset as ds
+
+    expression = build_filter_expression(filters)
+    tables = []
+    for yr, path in paths.items():
+        dataset = ds.dataset(path, format="parquet")
+        season_columns = columns
+        if columns is not None:
+            season_columns = [c for c in columns if c in dataset.schema.names]
+            missing = [c for c in columns if c not in dataset.schema.names]
+            if missing:
+                print(f"WARNING: PBP {yr} has no column(s) {missing}; skipping them")
+        tables.append(dataset.to_table(columns=season_columns, filter=expression).to_pandas())
+    return pd.concat(tables, ignore_index=True)
+
+
+def build_filter_expression(filters):
+    """
+    Convert reader filters into a pyarrow dataset expression.
+
+    Dict form: {"season_type": ["REG", "POST"], "week": 5} -> isin / equality
+    terms combined with AND. Tuple form: [("week", "<=", 2), ...] is passed to
+    pyarrow's own DNF converter.
+    """
+    if filters is None:
+        return None
+    import pyarrow.parquet as pq
+
+    if isinstance(filters, dict):
+        terms = []
+        for col, value in filters.items():
+            if isinstance(value, (list, tuple, set)):
+                terms.append((col, "in", list(value)))
+            else:
+                terms.append((col, "==", value))
+        filters = terms
+    return pq.filters_to_expression(filters)
+
+
+_default_cache: Optional[PBPCache] = None
+
+
+def get_pbp_cache() -> PBPCache:
+    """Return the process-wide default cache (configured from the environment)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PBPCache()
+    return _default_cache
+
+
+def load_pbp(seasons: List[int], refresh: bool = False, **read_kwargs) -> pd.DataFrame:
+    """Load and concatenate PBP for several seasons through the default cache."""
+    cache = get_pbp_cache()
+    dfs = [cache.load(yr, refresh=refresh, **read_kwargs) for yr in seasons]
+    return pd.concat(dfs, ignore_index=True)
+
+
+def read_pbp(seasons: List[int], columns: Optional[List[str]] = None, filters=None, refresh: bool = False) -> pd.DataFrame:
+    """Column-projected, filtered PBP read through the default cache (see PBPCache.scan)."""
+    return get_pbp_cache().scan(seasons, columns=columns, filters=filters, refresh=refresh)
+
+
+if __name__ == "__main__":
+    import sys
+
+    cache = get_pbp_cache()
+    for arg in sys.argv[1:]:
+        print(cache.path_for(int(arg)))
+    print(cache.info().to_string(index=False))
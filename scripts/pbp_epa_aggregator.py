@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Streaming team EPA aggregator over nflverse play-by-play parquet files.
+
+pull_latest_2025_data.py, update_2025_epa_data.py and the week2 CSVs each
+computed offense/defense EPA per play with their own filters, and each loaded
+the whole season into pandas first. StreamingEPAAggregator reads the season's
+parquet file through the shared PBP cache as a stream of record batches
+(pyarrow dataset scan with the column projection and week filter pushed down)
+and folds every batch into additive per (team, week, side) sums:
+
+    plays, epa_sum, success_sum, pass_plays, pass_epa_sum, rush_plays, rush_epa_sum
+
+Memory is bounded by one batch plus ~32 teams x 18 weeks x 2 sides of sums.
+From those sums it emits per-week and cumulative tables and a table in the
+detailed_epa_data.csv schema (team, team_name, epa_off_per_play, epa_pass_off,
+epa_rush_off, epa_def_allowed_per_play, epa_pass_def_allowed,
+epa_rush_def_allowed, net_epa_per_play, last_updated, source).
+
+Play filter (one definition for every table):
+    regular season, non-null epa and posteam/defteam, and pass == 1 or rush == 1
+    (dropbacks, scrambles and designed runs; special teams, kneels and spikes
+    are excluded). success uses the nflverse `success` column (EPA > 0 when absent).
+
+The sums are saved per season under NFL_PBP_EPA_STATE_DIR (default
+data/pbp_epa_state/season=YYYY.parquet). update() re-reads only the last stored
+week (it may have been partial) and anything after it, so a weekly refresh scans
+just the new week's row groups. team_epa_from_pbp() aggregates a frame that is
+already in memory (what the two legacy scripts above now call).
+
+Usage:
+    python3 scripts/pbp_epa_aggregator.py 2025                  # incremental update + summary
+    python3 scripts/pbp_epa_aggregator.py 2025 --rebuild --through-week 5 --output data/pbp_detailed_epa_data.csv
+"""
+
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, List, Optional, Union
+
+import pandas as pd
+
+from pbp_cache import build_filter_expression, get_pbp_cache
+from team_registry import ABBR_TO_FULL_NAME
+
+if TYPE_CHECKING:
+    import pyarrow
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STATE_DIR = os.environ.get("NFL_PBP_EPA_STATE_DIR", os.path.join(REPO_ROOT, "data", "pbp_epa_state"))
+
+# PBP columns read by the aggregator
+PBP_COLUMNS = ["season_type", "week", "posteam", "defteam", "epa", "success", "pass", "rush"]
+
+KEY_COLS = ["week", "team", "side"]
+SUM_COLS = ["plays", "epa_sum", "success_sum", "pass_plays", "pass_epa_sum", "rush_plays", "rush_epa_sum"]
+
+DETAILED_COLUMNS = [
+    "team", "team_name", "epa_off_per_play", "epa_pass_off", "epa_rush_off",
+    "epa_def_allowed_per_play", "epa_pass_def_allowed", "epa_rush_def_allowed",
+    "net_epa_per_play", "last_updated", "source",
+]
+
+
+def _empty_state() -> pd.DataFrame:
+    state = pd.DataFrame(columns=KEY_COLS + SUM_COLS)
+    return state.astype({"week": "int64", "team": "object", "side": "object", **{c: "float64" for c in SUM_COLS}})
+
+
+def batch_sums(batch: pd.DataFrame) -> pd.DataFrame:
+    """Per (week, team, side) sums for one batch of plays (the aggregator's play filter applied)."""
+    plays = batch[batch["epa"].notna() & batch["posteam"].notna() & batch["defteam"].notna()]
+    is_pass = plays["pass"].fillna(0).astype(bool)
+    is_rush = plays["rush"].fillna(0).astype(bool) & ~is_pass
+    keep = is_pass | is_rush
+    plays, is_pass, is_rush = plays[keep], is_pass[keep], is_rush[keep]
+
+    epa = plays["epa"].astype("float64")
+    success = plays["success"] if "success" in plays.columns else (epa > 0)
+    values = pd.DataFrame({
+        "week": plays["week"].astype("int64"),
+        "plays": 1.0,
+        "epa_sum": epa,
+        "success_sum": success.fillna(epa > 0).astype("float64"),
+        "pass_plays": is_pass.astype("float64"),
+        "pass_epa_sum": epa.where(is_pass, 0.0),
+        "rush_plays": is_rush.astype("float64"),
+        "rush_epa_sum": epa.where(is_rush, 0.0),
+    })
+
+    sides = []
+    for side, team_col in (("off", "posteam"), ("def", "defteam")):
+        sums = values.assign(team=plays[team_col].values).groupby(["week", "team"], as_index=False)[SUM_COLS].sum()
+        sides.append(sums.assign(side=side))
+    return pd.concat(sides, ignore_index=True)[KEY_COLS + SUM_COLS]
+
+
+class StreamingEPAAggregator:
+    """Additive per team-week EPA sums for one season, updated one PBP batch at a time."""
+
+    def __init__(self, season: int, state_dir: Optional[str] = None, batch_size: int = 64 * 1024):
+        self.season = int(season)
+        self.state_dir = state_dir or DEFAULT_STATE_DIR
+        self.batch_size = batch_size
+        self.state_path = os.path.join(self.state_dir, f"season={self.season}.parquet")
+        self.state = self._load_state()
+
+    # -----------------------------
+    # State
+    # -----------------------------
+
+    def _load_state(self) -> pd.DataFrame:
+        if os.path.exists(self.state_path):
+            return pd.read_parquet(self.state_path)
+        return _empty_state()
+
+    def save(self) -> str:
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        self.state.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.state_path)
+        return self.state_path
+
+    def reset(self) -> None:
+        self.state = _empty_state()
+
+    @property
+    def weeks(self) -> List[int]:
+        return sorted(int(w) for w in self.state["week"].unique())
+
+    def drop_weeks(self, weeks: Iterable[int]) -> None:
+        self.state = self.state[~self.state["week"].isin(list(weeks))].reset_index(drop=True)
+
+    # -----------------------------
+    # Feeding plays
+    # -----------------------------
+
+    def feed(self, batch: Union[pd.DataFrame, "pyarrow.RecordBatch"]) -> None:
+        """Fold one batch of plays (pandas or pyarrow) into the running sums."""
+        if not isinstance(batch, pd.DataFrame):
+            batch = batch.to_pandas()
+        if batch.empty:
+            return
+        merged = pd.concat([self.state, batch_sums(batch)], ignore_index=True)
+        self.state = merged.groupby(KEY_COLS, as_index=False)[SUM_COLS].sum()
+
+    def feed_parquet(self, path: str, weeks: Optional[Iterable[int]] = None) -> int:
+        """Stream a PBP parquet file (optionally only `weeks`) into the sums; returns plays read."""
+        import pyarrow.dataset as ds
+
+        filters = [("season_type", "==", "REG")]
+        if weeks is not None:
+            filters.append(("week", "in", [int(w) for w in weeks]))
+        dataset = ds.dataset(path, format="parquet")
+        columns = [c for c in PBP_COLUMNS if c in dataset.schema.names]
+
+        rows = 0
+        for batch in dataset.to_batches(columns=columns, filter=build_filter_expression(filters),
+                                        batch_size=self.batch_size):
+            rows += batch.num_rows
+            self.feed(batch)
+        return rows
+
+    def update(self, weeks: Optional[Iterable[int]] = None, refresh: bool = False, save: bool = True) -> List[int]:
+        """
+        Bring the sums up to date with the cached PBP file for this season.
+
+        With `weeks`, exactly those weeks are (re)aggregated. Otherwise the last
+        stored week and everything after it are re-read, so earlier weeks are
+        never scanned again. Returns the weeks that were (re)aggregated.
+        """
+        path = get_pbp_cache().path_for(self.season, refresh=refresh)
+        if weeks is not None:
+            weeks = sorted(int(w) for w in weeks)
+            self.drop_weeks(weeks)
+        elif self.weeks:
+            last = self.weeks[-1]
+            self.drop_weeks([last])
+            weeks = list(range(last, 23))
+
+        before = set(self.weeks)
+        rows = self.feed_parquet(path, weeks)
+        updated = sorted(set(self.weeks) - before)
+        print(f"✅ Aggregated {rows} plays from PBP {self.season} (weeks {updated or 'none'})")
+        if save:
+            self.save()
+        return updated
+
+    # -----------------------------
+    # Tables
+    # -----------------------------
+
+    def weekly(self) -> pd.DataFrame:
+        """One row per (team, week): that week's and cumulative per-play EPA and success rates."""
+        wide = self.state.pivot_table(index=["team", "week"], columns="side", values=SUM_COLS, aggfunc="sum")
+        wide.columns = [f"{side}_{col}" for col, side in wide.columns]
+        wide = wide.sort_index().fillna(0.0)
+        cumulative = wide.groupby(level="team").cumsum()
+
+        out = pd.concat([_rates(wide), _rates(cumulative).add_prefix("cum_")], axis=1).reset_index()
+        out.insert(1, "season", self.season)
+        return out
+
+    def detailed_table(self, through_week: Optional[int] = None, source: Optional[str] = None) -> pd.DataFrame:
+        """Season-to-date team EPA (through `through_week`) in the detailed_epa_data.csv schema."""
+        state = self.state
+        if through_week is not None:
+            state = state[state["week"] <= through_week]
+        if state.empty:
+            return pd.DataFrame(columns=DETAILED_COLUMNS)
+        through = int(state["week"].max())
+
+        totals = state.groupby(["team", "side"])[SUM_COLS].sum().unstack("side").fillna(0.0)
+        totals.columns = [f"{side}_{col}" for col, side in totals.columns]
+        rates = _rates(totals)
+
+        table = pd.DataFrame({
+            "team": rates.index,
+            "team_name": rates.index.map(ABBR_TO_FULL_NAME),
+            "epa_off_per_play": rates["epa_off_per_play"].values,
+            "epa_pass_off": rates["epa_pass_off"].values,
+            "epa_rush_off": rates["epa_rush_off"].values,
+            "epa_def_allowed_per_play": rates["epa_def_allowed_per_play"].values,
+            "epa_pass_def_allowed": rates["epa_pass_def_allowed"].values,
+            "epa_rush_def_allowed": rates["epa_rush_def_allowed"].values,
+            "net_epa_per_play": rates["net_epa_per_play"].values,
+            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "source": source or f"nflverse_pbp_{self.season}_week{through}",
+        })
+        return table.sort_values("net_epa_per_play", ascending=False).reset_index(drop=True)
+
+
+def team_epa_from_pbp(pbp: pd.DataFrame, season: int, through_week: Optional[int] = None,
+                      source: Optional[str] = None) -> pd.DataFrame:
+    """
+    detailed_table() for an already-loaded PBP frame, aggregated in memory
+    (stored state is neither read nor saved), plus season-to-date plays and
+    success rates: plays, success_rate, plays_faced, success_rate_allowed.
+    """
+    aggregator = StreamingEPAAggregator(season)
+    aggregator.reset()
+    if "season_type" in pbp.columns:
+        pbp = pbp[pbp["season_type"] == "REG"]
+    aggregator.feed(pbp)
+
+    table = aggregator.detailed_table(through_week, source)
+    if table.empty:
+        return table
+    cumulative = aggregator.weekly()
+    if through_week is not None:
+        cumulative = cumulative[cumulative["week"] <= through_week]
+    last = cumulative.sort_values("week").groupby("team").tail(1).set_index("team")
+    volume = last[["cum_plays_off", "cum_success_rate_off", "cum_plays_def", "cum_success_rate_def_allowed"]]
+    volume.columns = ["plays", "success_rate", "plays_faced", "success_rate_allowed"]
+    return table.join(volume, on="team")
+
+
+def _ratio(num: pd.Series, den: pd.Series) -> pd.Series:
+    return num / den.where(den > 0)
+
+
+def _rates(sums: pd.DataFrame) -> pd.DataFrame:
+    """Per-play rates from off_*/def_* sum columns."""
+    rates = pd.DataFrame(index=sums.index)
+    rates["plays_off"] = sums["off_plays"]
+    rates["epa_off_per_play"] = _ratio(sums["off_epa_sum"], sums["off_plays"])
+    rates["epa_pass_off"] = _ratio(sums["off_pass_epa_sum"], sums["off_pass_plays"])
+    rates["epa_rush_off"] = _ratio(sums["off_rush_epa_sum"], sums["off_rush_plays"])
+    rates["success_rate_off"] = _ratio(sums["off_success_sum"], sums["off_plays"])
+    rates["plays_def"] = sums["def_plays"]
+    rates["epa_def_allowed_per_play"] = _ratio(sums["def_epa_sum"], sums["def_plays"])
+    rates["epa_pass_def_allowed"] = _ratio(sums["def_pass_epa_sum"], sums["def_pass_plays"])
+    rates["epa_rush_def_allowed"] = _ratio(sums["def_rush_epa_sum"], sums["def_rush_plays"])
+    rates["success_rate_def_allowed"] = _ratio(sums["def_success_sum"], sums["def_plays"])
+    rates["net_epa_per_play"] = rates["epa_off_per_play"] - rates["epa_def_allowed_per_play"]
+    return rates
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("season", type=int)
+    parser.add_argument("--weeks", type=int, nargs="*", help="re-aggregate exactly these weeks")
+    parser.add_argument("--rebuild", action="store_true", help="discard stored sums and re-read the whole season")
+    parser.add_argument("--refresh", action="store_true", help="revalidate the PBP file with nflverse first")
+    parser.add_argument("--through-week", type=int)
+    parser.add_argument("--output", help="write the detailed_epa_data-schema table to this CSV")
+    args = parser.parse_args()
+
+    aggregator = StreamingEPAAggregator(args.season)
+    if args.rebuild:
+        aggregator.reset()
+    aggregator.update(weeks=args.weeks, refresh=args.refresh)
+
+    table = aggregator.detailed_table(args.through_week)
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"✅ Saved team EPA ({len(table)} teams) to {args.output}")
+
+    print(f"\n=== {args.season} team EPA from PBP (weeks {aggregator.weeks}) ===")
+    print(table[["team", "epa_off_per_play", "epa_def_allowed_per_play", "net_epa_per_play"]].head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,12 @@ Script to pull the latest 2025 play-by-play data from nflverse
 """
 
 import pandas as pd
-import numpy as np
-import os
-from typing import Dict, List
+
+from pbp_cache import read_pbp
+from pbp_epa_aggregator import team_epa_from_pbp
+
+# Columns used by analyze_latest_data and calculate_updated_epa_metrics
+PBP_COLUMNS = ["season", "season_type", "week", "game_id", "posteam", "defteam", "epa", "success", "pass", "rush"]
 
 def pull_latest_2025_data():
     """Pull the latest 2025 play-by-play data from nflverse"""
@@ -14,36 +17,17 @@ def pull_latest_2025_data():
     print("=== Pulling Latest 2025 Data from nflverse ===")
     
     try:
-        # Try to load the latest 2025 data from nflverse
-        url = "https://github.com/nflverse/nflverse-data/releases/download/pbp/play_by_play_2025.parquet"
-        print(f"Loading latest 2025 PBP data from {url}...")
-        
-        # Use requests to handle SSL issues
-        import requests
-        import io
-        
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        # Read the parquet data
-        df = pd.read_parquet(io.BytesIO(response.content), engine="pyarrow")
+        # Force a conditional revalidation so we always see the newest release;
+        # the shared cache falls back to its local copy if nflverse is unreachable.
+        df = read_pbp([2025], columns=PBP_COLUMNS, refresh=True)
         print(f"✅ Successfully loaded {len(df)} plays from latest 2025 data")
         
         return df
         
     except Exception as e:
-        print(f"❌ Could not load latest data from nflverse: {e}")
-        print("Falling back to local data...")
-        
-        # Fallback to local data
-        local_file = "images/play_by_play_2025.parquet"
-        if os.path.exists(local_file):
-            df = pd.read_parquet(local_file, engine="pyarrow")
-            print(f"📁 Loaded {len(df)} plays from local file")
-            return df
-        else:
-            print("❌ No local data available")
-            return None
+        print(f"❌ Could not load latest data: {e}")
+        print("❌ No local data available")
+        return None
 
 def analyze_latest_data(df: pd.DataFrame):
     """Analyze what's in the latest data"""
@@ -88,83 +72,12 @@ def analyze_latest_data(df: pd.DataFrame):
     return df
 
 def calculate_updated_epa_metrics(df: pd.DataFrame):
-    """Calculate updated EPA metrics with the latest data"""
-    
-    # Filter to regular season games only
-    df = df[df["season_type"] == "REG"].copy()
+    """Calculate updated EPA metrics with the latest data (pass/rush plays, see pbp_epa_aggregator)"""
     
     print(f"\n=== Calculating Updated EPA Metrics ===")
     print(f"Analyzing {len(df)} plays from {df['week'].nunique()} weeks")
     
-    # Calculate offensive EPA per team
-    offensive_epa = df.groupby(['posteam', 'week']).agg({
-        'epa': ['sum', 'count', 'mean'],
-        'success': 'mean'
-    }).round(4)
-    
-    # Flatten column names
-    offensive_epa.columns = ['epa_sum', 'plays', 'epa_per_play', 'success_rate']
-    offensive_epa = offensive_epa.reset_index()
-    
-    # Calculate defensive EPA allowed per team
-    defensive_epa = df.groupby(['defteam', 'week']).agg({
-        'epa': ['sum', 'count', 'mean'],
-        'success': 'mean'
-    }).round(4)
-    
-    # Flatten column names
-    defensive_epa.columns = ['epa_allowed_sum', 'plays_faced', 'epa_allowed_per_play', 'success_rate_allowed']
-    defensive_epa = defensive_epa.reset_index()
-    
-    # Merge offensive and defensive stats
-    team_stats = pd.merge(
-        offensive_epa, 
-        defensive_epa, 
-        left_on=['posteam', 'week'], 
-        right_on=['defteam', 'week'], 
-        how='outer'
-    )
-    
-    # Clean up team column
-    team_stats['team'] = team_stats['posteam'].fillna(team_stats['defteam'])
-    team_stats = team_stats.drop(['posteam', 'defteam'], axis=1)
-    
-    # Calculate net EPA
-    team_stats['net_epa'] = team_stats['epa_per_play'] - team_stats['epa_allowed_per_play']
-    
-    # Calculate cumulative stats through all available weeks
-    cumulative_stats = team_stats.groupby('team').agg({
-        'epa_sum': 'sum',
-        'plays': 'sum',
-        'epa_allowed_sum': 'sum',
-        'plays_faced': 'sum',
-        'success_rate': 'mean',
-        'success_rate_allowed': 'mean'
-    }).round(4)
-    
-    # Calculate cumulative EPA per play
-    cumulative_stats['epa_off_per_play'] = cumulative_stats['epa_sum'] / cumulative_stats['plays']
-    cumulative_stats['epa_def_allowed_per_play'] = cumulative_stats['epa_allowed_sum'] / cumulative_stats['plays_faced']
-    cumulative_stats['net_epa_per_play'] = cumulative_stats['epa_off_per_play'] - cumulative_stats['epa_def_allowed_per_play']
-    
-    # Reset index to get team as column
-    cumulative_stats = cumulative_stats.reset_index()
-    
-    # Add team name mapping
-    team_mapping = {
-        'ARI': 'Cardinals', 'ATL': 'Falcons', 'BAL': 'Ravens', 'BUF': 'Bills',
-        'CAR': 'Panthers', 'CHI': 'Bears', 'CIN': 'Bengals', 'CLE': 'Browns',
-        'DAL': 'Cowboys', 'DEN': 'Broncos', 'DET': 'Lions', 'GB': 'Packers',
-        'HOU': 'Texans', 'IND': 'Colts', 'JAX': 'Jaguars', 'KC': 'Chiefs',
-        'LA': 'Rams', 'LAC': 'Chargers', 'LV': 'Raiders', 'MIA': 'Dolphins',
-        'MIN': 'Vikings', 'NE': 'Patriots', 'NO': 'Saints', 'NYG': 'Giants',
-        'NYJ': 'Jets', 'PHI': 'Eagles', 'PIT': 'Steelers', 'SF': '49ers',
-        'SEA': 'Seahawks', 'TB': 'Buccaneers', 'TEN': 'Titans', 'WAS': 'Commanders'
-    }
-    
-    cumulative_stats['team_name'] = cumulative_stats['team'].map(team_mapping)
-    
-    return cumulative_stats
+    return team_epa_from_pbp(df, 2025)
 
 def main():
     """Main function to pull and analyze latest data"""
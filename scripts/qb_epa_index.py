@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Player-level EPA index and QB substitution for injury what-ifs.
+
+The index is built once from cached nflverse play-by-play and stored as one
+small parquet table: EPA sums and play counts per (season, week, team,
+player, role), where role is
+
+    dropback   pass plays, sacks and scrambles, credited to the QB
+    rush       designed runs, credited to the ball carrier
+
+QBEPAIndex selects a window of that table (seasons, optionally through a week)
+and collapses it into arrays and dicts once, so a substitution is a handful of
+scalar operations (a few microseconds):
+
+    index = get_qb_epa_index(seasons=[2024, 2025])
+    index.substitute("CIN", "J.Browning")          # [off, pass, rush] EPA/play with Browning starting
+    adjusted = index.substitute_table(epa_df, {"CIN": "J.Browning", "NYJ": ("A.Rodgers", "T.Boyle", 0.5)})
+
+A substitution is a per-play rate difference: the replacement's EPA/play minus
+the outgoing QB's, per role, both shrunk toward replacement level (PRIOR_PLAYS
+plays at the pooled rate of low-volume QBs) so a backup with 40 dropbacks does
+not carry his raw small-sample number. Each role's difference is weighted by
+the outgoing QB's share of the team's plays in the weeks he played (about 1 for
+a starter's dropbacks, small for rushes) times `share`, the fraction of those
+plays the replacement is expected to take (default 1.0: he starts the game).
+Weeks the outgoing QB missed do not dilute the change, so a window where the
+starter sat out half the season still yields a full-game delta.
+
+Environment overrides:
+    NFL_QB_EPA_INDEX_PATH    index table (default: data/qb_epa_index.parquet)
+
+Usage:
+    python3 scripts/qb_epa_index.py build 2023 2024 2025
+    python3 scripts/qb_epa_index.py show CIN --seasons 2024 2025
+    python3 scripts/qb_epa_index.py sub CIN J.Browning --seasons 2024 2025
+    python3 scripts/qb_epa_index.py sub CIN J.Browning --share 0.5     # Browning plays half the game
+"""
+
+import os
+from typing import Dict, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from team_registry import TEAM_ABBRS, TEAM_IDS, resolve_team
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_INDEX_PATH = os.environ.get("NFL_QB_EPA_INDEX_PATH", os.path.join(REPO_ROOT, "data", "qb_epa_index.parquet"))
+
+ROLES = ["dropback", "rush"]
+PRIOR_PLAYS = 100.0           # shrinkage weight toward replacement level, in plays
+LOW_VOLUME_DROPBACKS = 150    # QBs below this many dropbacks define replacement level
+
+INDEX_PBP_COLUMNS = [
+    "season", "week", "season_type", "posteam", "epa", "pass", "rush",
+    "passer_player_id", "passer_player_name", "rusher_player_id", "rusher_player_name",
+]
+TEAM_EPA_COLUMNS = ["epa_off_per_play", "epa_pass_off", "epa_rush_off"]
+
+Substitution = Union[str, Tuple[str, str], Tuple[str, str, float]]
+
+
+# -----------------------------
+# Index table (build / store)
+# -----------------------------
+
+def index_rows_from_pbp(pbp: pd.DataFrame) -> pd.DataFrame:
+    """Per (season, week, team, player, role) play counts and EPA sums."""
+    plays = pbp[pbp["epa"].notna() & ((pbp["pass"] == 1) | (pbp["rush"] == 1)) & pbp["posteam"].notna()]
+    dropback = (plays["pass"] == 1).to_numpy()
+    # Scrambles have no passer; the QB is the rusher
+    player_id = np.where(dropback, plays["passer_player_id"].fillna(plays["rusher_player_id"]), plays["rusher_player_id"])
+    player_name = np.where(dropback, plays["passer_player_name"].fillna(plays["rusher_player_name"]), plays["rusher_player_name"])
+    rows = pd.DataFrame({
+        "season": plays["season"].to_numpy(),
+        "week": plays["week"].to_numpy(),
+        "team": plays["posteam"].to_numpy(),
+        "player_id": player_id,
+        "player_name": player_name,
+        "role": np.where(dropback, "dropback", "rush"),
+        "epa": plays["epa"].to_numpy(dtype="float64"),
+    }).dropna(subset=["player_id"])
+    table = (
+        rows.groupby(["season", "week", "team", "player_id", "role"], sort=True)
+            .agg(player_name=("player_name", "first"), plays=("epa", "size"), epa=("epa", "sum"))
+            .reset_index()
+    )
+    return table.astype({
+        "season": "int16", "week": "int8", "team": "category", "player_id": "string",
+        "player_name": "string", "role": pd.CategoricalDtype(ROLES), "plays": "int32", "epa": "float32",
+    })
+
+
+def build_index_table(seasons: Sequence[int], include_postseason: bool = False) -> pd.DataFrame:
+    """Index rows for `seasons` from the shared PBP cache (one season read at a time)."""
+    from pbp_cache import read_pbp
+
+    filters = None if include_postseason else {"season_type": "REG"}
+    frames = [index_rows_from_pbp(read_pbp([season], columns=INDEX_PBP_COLUMNS, filters=filters)) for season in seasons]
+    return pd.concat(frames, ignore_index=True)
+
+
+def save_index_table(table: pd.DataFrame, path: str = DEFAULT_INDEX_PATH) -> str:
+    """Merge `table` into the stored index (its seasons replace stored ones) and write atomically."""
+    if os.path.exists(path):
+        stored = pd.read_parquet(path)
+        table = pd.concat([stored[~stored["season"].isin(table["season"].unique())], table], ignore_index=True)
+    table = table.sort_values(["season", "week", "team", "player_id", "role"]).reset_index(drop=True)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    table.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_index_table(path: str = DEFAULT_INDEX_PATH, seasons: Optional[Sequence[int]] = None) -> pd.DataFrame:
+    filters = [("season", "in", [int(s) for s in seasons])] if seasons is not None else None
+    return pd.read_parquet(path, filters=filters)
+
+
+# -----------------------------
+# Substitution index
+# -----------------------------
+
+class QBEPAIndex:
+    """Window of the index table collapsed into per-player rates and per-team play shares."""
+
+    def __init__(self, table: pd.DataFrame, through: Optional[Tuple[int, int]] = None):
+        if through is not None:
+            season, week = through
+            table = table[(table["season"] < season) | ((table["season"] == season) & (table["week"] <= week))]
+        if table.empty:
+            raise ValueError("QB EPA index window has no plays")
+        self.seasons = sorted(int(s) for s in table["season"].unique())
+        role_idx = table["role"].astype(pd.CategoricalDtype(ROLES)).cat.codes.to_numpy()
+        team_idx = np.array([TEAM_IDS.get(resolve_team(t), -1) for t in table["team"].astype(str)], dtype=np.int64)
+        keep = team_idx >= 0
+        table, role_idx, team_idx = table[keep], role_idx[keep], team_idx[keep]
+
+        player_codes, self.player_ids = pd.factorize(table["player_id"].astype(str))
+        plays = table["plays"].to_numpy(dtype="float64")
+        epa = table["epa"].to_numpy(dtype="float64")
+        n_players, n_teams = len(self.player_ids), len(TEAM_ABBRS)
+
+        # Player totals across teams -> shrunk EPA/play per role
+        player_plays = np.zeros((n_players, len(ROLES)))
+        player_epa = np.zeros((n_players, len(ROLES)))
+        np.add.at(player_plays, (player_codes, role_idx), plays)
+        np.add.at(player_epa, (player_codes, role_idx), epa)
+        low = (player_plays[:, 0] > 0) & (player_plays[:, 0] < LOW_VOLUME_DROPBACKS)
+        self.replacement_level = np.array([
+            player_epa[low, 0].sum() / max(player_plays[low, 0].sum(), 1.0),
+            player_epa[:, 1].sum() / max(player_plays[:, 1].sum(), 1.0),
+        ])
+        self.player_plays = player_plays
+        self.rates = (player_epa + PRIOR_PLAYS * self.replacement_level) / (player_plays + PRIOR_PLAYS)
+
+        # Team totals per role and each player's plays/EPA on each team
+        self.team_plays = np.zeros((n_teams, len(ROLES)))
+        self.team_epa = np.zeros((n_teams, len(ROLES)))
+        np.add.at(self.team_plays, (team_idx, role_idx), plays)
+        np.add.at(self.team_epa, (team_idx, role_idx), epa)
+        on_team = pd.DataFrame({"team": team_idx, "player": player_codes, "role": role_idx, "plays": plays, "epa": epa})
+        on_team = on_team.groupby(["team", "player", "role"])[["plays", "epa"]].sum().unstack("role", fill_value=0.0)
+        on_team = on_team.reindex(columns=pd.MultiIndex.from_product([["plays", "epa"], range(len(ROLES))]), fill_value=0.0)
+        team_player_plays = on_team["plays"].to_numpy()
+        team_player_epa = on_team["epa"].to_numpy()
+        self._on_team: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {
+            key: (team_player_plays[i], team_player_epa[i]) for i, key in enumerate(on_team.index)
+        }
+
+        # Team plays per role in the weeks each player appeared for the team
+        weekly = pd.DataFrame({
+            "season": table["season"].to_numpy(), "week": table["week"].to_numpy(),
+            "team": team_idx, "player": player_codes, "role": role_idx, "plays": plays,
+        })
+        team_week = weekly.groupby(["season", "week", "team", "role"])["plays"].sum().unstack("role", fill_value=0.0)
+        team_week = team_week.reindex(columns=range(len(ROLES)), fill_value=0.0)
+        active = weekly[["season", "week", "team", "player"]].drop_duplicates()
+        active = active.join(team_week, on=["season", "week", "team"]).groupby(["team", "player"])[list(range(len(ROLES)))].sum()
+        self._active_team_plays: Dict[Tuple[int, int], np.ndarray] = {
+            key: row for key, row in zip(active.index, active.to_numpy(dtype="float64"))
+        }
+
+        # Starter = most dropbacks for the team in the window
+        dropbacks = on_team[("plays", 0)]
+        self.starters: Dict[int, int] = {
+            int(team): int(player) for team, player in dropbacks[dropbacks > 0].groupby(level="team").idxmax().str[1].items()
+        }
+
+        # Name lookups: player_id or display name (the name with most dropbacks wins when names collide)
+        names = table.groupby(player_codes)["player_name"].first().astype(str)
+        self.player_names = names.reindex(range(n_players)).to_numpy()
+        order = np.argsort(-player_plays.sum(axis=1), kind="stable")
+        self._lookup: Dict[str, int] = {}
+        for code in order[::-1]:
+            self._lookup[str(self.player_names[code])] = int(code)
+        self._lookup.update({pid: i for i, pid in enumerate(self.player_ids)})
+
+    # Lookups
+
+    def player(self, name: str) -> int:
+        """Index position of a player given an nflverse player_id or name ('J.Browning')."""
+        try:
+            return self._lookup[name]
+        except KeyError:
+            raise KeyError(f"Unknown player {name!r} in QB EPA index {self.seasons}") from None
+
+    def starter(self, team: str) -> str:
+        """Name of the team's primary QB (most dropbacks) in the window."""
+        return str(self.player_names[self.starters[TEAM_IDS[resolve_team(team)]]])
+
+    def team_vector(self, team: str) -> np.ndarray:
+        """[off, pass, rush] EPA/play for `team` from the index itself."""
+        t = TEAM_IDS[resolve_team(team)]
+        plays, epa = self.team_plays[t], self.team_epa[t]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.array([epa.sum() / plays.sum(), epa[0] / plays[0], epa[1] / plays[1]])
+
+    def delta(self, team: str, replacement: str, out: Optional[str] = None, share: float = 1.0) -> np.ndarray:
+        """
+        Change in [off, pass, rush] EPA/play when `replacement` takes `share` of
+        `out`'s usual plays (default: the starter's, all of them).
+
+        Raises ValueError when the substitution cannot change anything: the
+        outgoing QB is the replacement himself, or has no plays for `team` in
+        the window.
+        """
+        t = TEAM_IDS[resolve_team(team)]
+        o = self.player(out) if out is not None else self.starters[t]
+        r = self.player(replacement)
+        if o == r:
+            raise ValueError(f"{replacement} is the QB being replaced for {resolve_team(team)} in {self.seasons} "
+                             f"(the starter unless `out` is given); name the outgoing QB")
+        zeros = np.zeros(len(ROLES))
+        if (t, o) not in self._on_team:
+            raise ValueError(f"{self.player_names[o]} has no plays for {resolve_team(team)} in {self.seasons}")
+        out_plays, _ = self._on_team[(t, o)]
+        active_plays = self._active_team_plays.get((t, o), zeros)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Outgoing QB's share of the team's plays per role in the weeks he played
+            role_share = np.where(active_plays > 0, out_plays / active_plays, 0.0)
+        role_delta = float(share) * role_share * (self.rates[r] - self.rates[o])
+        total = active_plays.sum()
+        off_delta = (active_plays * role_delta).sum() / total if total > 0 else 0.0
+        return np.array([off_delta, role_delta[0], role_delta[1]])
+
+    def substitute(self, team: str, replacement: str, out: Optional[str] = None,
+                   base: Optional[np.ndarray] = None, share: float = 1.0) -> np.ndarray:
+        """QB-substituted [off, pass, rush] EPA/play; `base` defaults to the index's own team vector."""
+        base = self.team_vector(team) if base is None else np.asarray(base, dtype="float64")
+        return base + self.delta(team, replacement, out, share)
+
+    def substitute_table(self, epa: pd.DataFrame, substitutions: Mapping[str, Substitution],
+                         team_col: str = "team") -> pd.DataFrame:
+        """
+        Copy of a team EPA table (detailed_epa_data.csv layout) with QB changes applied.
+
+        `substitutions` maps team -> replacement, (out, replacement) or
+        (out, replacement, share); see delta() for `share`. Offense,
+        pass and rush EPA/play (and net EPA, when present) are shifted; a
+        qb_substitution column records what was applied.
+        """
+        out = epa.copy()
+        if "qb_substitution" not in out.columns:
+            out["qb_substitution"] = None
+        teams = out[team_col].map(resolve_team)
+        cols = [c for c in TEAM_EPA_COLUMNS if c in out.columns]
+        for team, sub in substitutions.items():
+            outgoing, replacement, share = (tuple(sub) + (1.0,))[:3] if isinstance(sub, tuple) else (None, sub, 1.0)
+            rows = teams == resolve_team(team)
+            if not rows.any():
+                print(f"⚠️  {team} not in EPA table; skipping QB substitution")
+                continue
+            change = dict(zip(TEAM_EPA_COLUMNS, self.delta(team, replacement, outgoing, share)))
+            for col in cols:
+                out.loc[rows, col] = out.loc[rows, col] + change[col]
+            if "net_epa_per_play" in out.columns:
+                out.loc[rows, "net_epa_per_play"] = out.loc[rows, "net_epa_per_play"] + change["epa_off_per_play"]
+            outgoing = outgoing or self.starter(team)
+            note = f" ({share:.0%} of snaps)" if share != 1.0 else ""
+            out.loc[rows, "qb_substitution"] = f"{outgoing} -> {replacement}{note}"
+        return out
+
+    def players(self, team: Optional[str] = None) -> pd.DataFrame:
+        """Per-player dropbacks, rushes and shrunk EPA/play (players who played for `team`, if given)."""
+        frame = pd.DataFrame({
+            "player_id": self.player_ids,
+            "player_name": self.player_names,
+            "dropbacks": self.player_plays[:, 0].astype(int),
+            "rushes": self.player_plays[:, 1].astype(int),
+            "dropback_epa": self.rates[:, 0],
+            "rush_epa": self.rates[:, 1],
+        })
+        if team is not None:
+            t = TEAM_IDS[resolve_team(team)]
+            frame = frame.iloc[sorted(p for (tt, p) in self._on_team if tt == t)]
+        return frame.sort_values("dropbacks", ascending=False).reset_index(drop=True)
+
+
+_default_index: Optional[QBEPAIndex] = None
+
+
+def get_qb_epa_index(seasons: Optional[Sequence[int]] = None, through: Optional[Tuple[int, int]] = None,
+                     path: str = DEFAULT_INDEX_PATH) -> QBEPAIndex:
+    """
+    QB index over `seasons` (default: the two latest stored seasons), building
+    missing seasons from cached PBP. The default window is cached per process.
+    """
+    global _default_index
+    default = seasons is None and through is None
+    if default and _default_index is not None:
+        return _default_index
+
+    stored = set(load_index_table(path)["season"].unique()) if os.path.exists(path) else set()
+    if seasons is None:
+        if not stored:
+            from pbp_cache import get_pbp_cache
+            stored_or_cached = get_pbp_cache().available_seasons()
+            seasons = stored_or_cached[-2:]
+        else:
+            seasons = sorted(stored)[-2:]
+    missing = [s for s in seasons if s not in stored]
+    if missing:
+        print(f"Building QB EPA index for {missing}")
+        save_index_table(build_index_table(missing), path)
+
+    index = QBEPAIndex(load_index_table(path, seasons), through=through)
+    if default:
+        _default_index = index
+    return index
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="(re)build index seasons from cached PBP")
+    build.add_argument("seasons", type=int, nargs="+")
+    show = sub.add_parser("show", help="QBs and rushers for one team")
+    show.add_argument("team")
+    show.add_argument("--seasons", type=int, nargs="*")
+    what_if = sub.add_parser("sub", help="team EPA with a replacement QB")
+    what_if.add_argument("team")
+    what_if.add_argument("replacement")
+    what_if.add_argument("--out", help="QB being replaced (default: the team's starter)")
+    what_if.add_argument("--share", type=float, default=1.0,
+                         help="fraction of the outgoing QB's snaps the replacement takes (default: 1.0)")
+    what_if.add_argument("--seasons", type=int, nargs="*")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        table = build_index_table(args.seasons)
+        path = save_index_table(table)
+        print(f"✅ Indexed {len(table)} player-week rows for {args.seasons} in {path}")
+        return
+
+    index = get_qb_epa_index(args.seasons or None)
+    if args.command == "show":
+        print(f"=== {resolve_team(args.team)} players {index.seasons} (starter: {index.starter(args.team)}) ===")
+        print(index.players(args.team).head(12).round(4).to_string(index=False))
+        return
+
+    before = index.team_vector(args.team)
+    after = index.substitute(args.team, args.replacement, args.out, share=args.share)
+    outgoing = args.out or index.starter(args.team)
+    print(f"=== {resolve_team(args.team)}: {outgoing} -> {args.replacement} ({index.seasons}) ===")
+    print(pd.DataFrame({"before": before, "after": after, "change": after - before}, index=TEAM_EPA_COLUMNS).round(4).to_string())
+
+
+if __name__ == "__main__":
+    main()
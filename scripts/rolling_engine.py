@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Rolling-window engine for team-game features.
+
+Computes "form" features over each team's prior games for many windows (and
+EWM spans) in one sorted pass, without per-group Python callbacks:
+
+- Rolling means use group-local cumulative sums of values and non-null counts;
+  the mean over the previous w games is (S[i-1] - S[i-1-w]) / (C[i-1] - C[i-1-w]).
+  Adding more windows only adds two array subtractions per window.
+- EWM means walk game position 0..max_games over a [groups x games x features]
+  array, vectorized across all groups at once.
+- Opponent features are attached with one index-aligned lookup of the
+  (game_id, opp) rows instead of a merge per window.
+
+Semantics match the original pandas code:
+    groupby(group_cols)[cols].apply(lambda g: g.shift(1).rolling(w, min_periods=1).mean())
+    groupby(group_cols)[cols].apply(lambda g: g.shift(1).ewm(span=s).mean())
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _group_layout(df: pd.DataFrame, group_cols: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Group codes and position within group for a frame already sorted by group."""
+    grouped = df.groupby(list(group_cols), sort=False, dropna=False)
+    return grouped.ngroup().to_numpy(), grouped.cumcount().to_numpy()
+
+
+def _rolling_means(values: np.ndarray, codes: np.ndarray, pos: np.ndarray, windows: Sequence[int]) -> Dict[int, np.ndarray]:
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+
+    # Group-local inclusive cumulative sums (exact per team-season, no drift across groups)
+    cum_sum = pd.DataFrame(filled).groupby(codes).cumsum().to_numpy()
+    cum_cnt = pd.DataFrame(valid.astype(np.float64)).groupby(codes).cumsum().to_numpy()
+
+    n = len(values)
+    idx = np.arange(n)
+    # Prior games end at row i-1 (shift(1)); rows at group position 0 have no history
+    has_prior = pos >= 1
+    end = np.where(has_prior, idx - 1, 0)
+    end_sum = np.where(has_prior[:, None], cum_sum[end], 0.0)
+    end_cnt = np.where(has_prior[:, None], cum_cnt[end], 0.0)
+
+    out = {}
+    for w in windows:
+        # Window covers rows i-w .. i-1; subtract the cumulative value just before it
+        has_before = pos - 1 - w >= 0
+        before = np.where(has_before, idx - 1 - w, 0)
+        win_sum = end_sum - np.where(has_before[:, None], cum_sum[before], 0.0)
+        win_cnt = end_cnt - np.where(has_before[:, None], cum_cnt[before], 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[w] = np.where(win_cnt > 0, win_sum / win_cnt, np.nan)
+    return out
+
+
+def _ewm_means(values: np.ndarray, codes: np.ndarray, pos: np.ndarray, spans: Sequence[float]) -> Dict[float, np.ndarray]:
+    n_groups = int(codes.max()) + 1 if len(codes) else 0
+    max_len = int(pos.max()) + 1 if len(pos) else 0
+    n_feat = values.shape[1]
+
+    padded = np.full((n_groups, max_len, n_feat), np.nan)
+    padded[codes, pos] = values
+    valid = ~np.isnan(padded)
+    filled = np.where(valid, padded, 0.0)
+
+    out = {}
+    for span in spans:
+        if span <= 1:
+            raise ValueError(f"EWM span must be > 1, got {span}")
+        decay = 1.0 - 2.0 / (span + 1.0)
+        # adjust=True, ignore_na=False: missing games still decay earlier weights
+        num = np.zeros((n_groups, n_feat))
+        den = np.zeros((n_groups, n_feat))
+        result = np.full((n_groups, max_len, n_feat), np.nan)
+        for p in range(max_len - 1):
+            num = filled[:, p] + decay * num
+            den = valid[:, p] + decay * den
+            with np.errstate(invalid="ignore", divide="ignore"):
+                # Value entering game p+1 is the EWM through game p (shift(1))
+                result[:, p + 1] = np.where(den > 0, num / den, np.nan)
+        out[span] = result[codes, pos]
+    return out
+
+
+def compute_rolling_features(
+    df: pd.DataFrame,
+    feature_cols: List[str],
+    windows: Sequence[int] = (3, 5),
+    ewm_spans: Sequence[float] = (),
+    group_cols: Sequence[str] = ("team", "season"),
+) -> pd.DataFrame:
+    """
+    Prior-game rolling means (`{col}_roll{w}`) and EWM means (`{col}_ewm{span}`).
+
+    `df` must already be sorted by group_cols + game order. Returns a frame
+    aligned to df.index with one column per (feature, window/span).
+    """
+    codes, pos = _group_layout(df, group_cols)
+    values = df[feature_cols].to_numpy(dtype=np.float64)
+
+    blocks = []
+    for w, arr in _rolling_means(values, codes, pos, windows).items():
+        blocks.append(pd.DataFrame(arr, index=df.index, columns=[f"{c}_roll{w}" for c in feature_cols]))
+    if ewm_spans:
+        for span, arr in _ewm_means(values, codes, pos, ewm_spans).items():
+            blocks.append(pd.DataFrame(arr, index=df.index, columns=[f"{c}_ewm{span:g}" for c in feature_cols]))
+    if not blocks:
+        return pd.DataFrame(index=df.index)
+    return pd.concat(blocks, axis=1)
+
+
+def attach_opponent_features(
+    df: pd.DataFrame,
+    cols: List[str],
+    key_col: str = "game_id",
+    team_col: str = "team",
+    opp_col: str = "opp",
+    prefix: str = "opp_",
+) -> pd.DataFrame:
+    """
+    Return `cols` of each row's opponent in the same game, as `{prefix}{col}` columns.
+
+    Uses one index lookup of (game_id, opp) against (game_id, team); rows whose
+    opponent row is missing get NaN.
+    """
+    own = pd.MultiIndex.from_arrays([df[key_col].to_numpy(), df[team_col].to_numpy()])
+    target = pd.MultiIndex.from_arrays([df[key_col].to_numpy(), df[opp_col].to_numpy()])
+    if not own.is_unique:
+        keep = ~own.duplicated(keep="first")
+        locs = np.flatnonzero(keep)[own[keep].get_indexer(target)]
+        locs = np.where(own[keep].get_indexer(target) >= 0, locs, -1)
+    else:
+        locs = own.get_indexer(target)
+
+    values = df[cols].to_numpy(dtype=np.float64)
+    found = locs >= 0
+    opp_values = np.where(found[:, None], values[np.where(found, locs, 0)], np.nan)
+    return pd.DataFrame(opp_values, index=df.index, columns=[f"{prefix}{c}" for c in cols])
@@ -3,79 +3,61 @@
 SumerSports EPA Scraper - Extract EPA data from SumerSports.com
 """
 
-import requests
 import pandas as pd
 import numpy as np
-from bs4 import BeautifulSoup
-import time
 import json
 from typing import Dict, List, Optional
 import re
 from datetime import datetime
 
+from async_fetch import AsyncFetcher, fetch_pages
+from epa_snapshot_store import append_snapshot
+from html_tables import extract_table_rows
+from team_registry import ABBR_TO_NICKNAME, FULL_NAME_TO_ABBR
+
 class SumerSportsScraper:
     """Scraper for EPA data from SumerSports.com"""
+
+    pages = {
+        'offensive': "https://sumersports.com/teams/offensive/",
+        'defensive': "https://sumersports.com/teams/defensive/",
+    }
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Referer': 'https://sumersports.com/',
-        })
+    def __init__(self, fetcher: Optional[AsyncFetcher] = None, html_backend: str = "auto"):
+        # Shared fetch layer (pooling, per-host rate limits, retries, conditional GETs)
+        self.fetcher = fetcher or AsyncFetcher()
+        self.html_backend = html_backend
         
         # Team mappings based on SumerSports data (full team names)
-        self.team_mappings = {
-            'Baltimore Ravens': 'BAL', 'Indianapolis Colts': 'IND', 'Buffalo Bills': 'BUF', 'Detroit Lions': 'DET', 'Green Bay Packers': 'GB',
-            'Tampa Bay Buccaneers': 'TB', 'Jacksonville Jaguars': 'JAX', 'New England Patriots': 'NE', 'Los Angeles Rams': 'LA', 'Los Angeles Chargers': 'LAC',
-            'Dallas Cowboys': 'DAL', 'Arizona Cardinals': 'ARI', 'San Francisco 49ers': 'SF', 'Kansas City Chiefs': 'KC', 'Philadelphia Eagles': 'PHI',
-            'Atlanta Falcons': 'ATL', 'New York Jets': 'NYJ', 'Denver Broncos': 'DEN', 'Washington Commanders': 'WAS', 'Miami Dolphins': 'MIA',
-            'Cincinnati Bengals': 'CIN', 'Pittsburgh Steelers': 'PIT', 'New Orleans Saints': 'NO', 'Seattle Seahawks': 'SEA', 'Houston Texans': 'HOU',
-            'Carolina Panthers': 'CAR', 'Chicago Bears': 'CHI', 'Las Vegas Raiders': 'LV', 'Cleveland Browns': 'CLE', 'Tennessee Titans': 'TEN',
-            'Minnesota Vikings': 'MIN', 'New York Giants': 'NYG'
-        }
+        self.team_mappings = dict(FULL_NAME_TO_ABBR)
         
         # Full team names
-        self.team_names = {
-            'BAL': 'Ravens', 'IND': 'Colts', 'BUF': 'Bills', 'DET': 'Lions', 'GB': 'Packers',
-            'TB': 'Buccaneers', 'JAX': 'Jaguars', 'NE': 'Patriots', 'LA': 'Rams', 'LAC': 'Chargers',
-            'DAL': 'Cowboys', 'ARI': 'Cardinals', 'SF': '49ers', 'KC': 'Chiefs', 'PHI': 'Eagles',
-            'ATL': 'Falcons', 'NYJ': 'Jets', 'DEN': 'Broncos', 'WAS': 'Commanders', 'MIA': 'Dolphins',
-            'CIN': 'Bengals', 'PIT': 'Steelers', 'NO': 'Saints', 'SEA': 'Seahawks', 'HOU': 'Texans',
-            'CAR': 'Panthers', 'CHI': 'Bears', 'LV': 'Raiders', 'CLE': 'Browns', 'TEN': 'Titans',
-            'MIN': 'Vikings', 'NYG': 'Giants'
-        }
+        self.team_names = dict(ABBR_TO_NICKNAME)
     
-    def scrape_offensive_epa(self) -> Optional[pd.DataFrame]:
+    def scrape_offensive_epa(self, content: Optional[bytes] = None) -> Optional[pd.DataFrame]:
         """Scrape offensive EPA data from SumerSports"""
         try:
             print("Scraping offensive EPA data from SumerSports...")
             
-            url = "https://sumersports.com/teams/offensive/"
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            if content is None:
+                result = self.fetcher.get(self.pages['offensive'])
+                result.raise_for_status()
+                content = result.content
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Cell text of the main data table (fast parsing backend, see html_tables.py)
+            table_rows = extract_table_rows(content, table_class='w-full', backend=self.html_backend)
             
-            # Find the main data table
-            table = soup.find('table', class_='w-full')
-            
-            if not table:
+            if table_rows is None:
                 print("❌ No table found on offensive page")
                 return None
             
-            rows = table.find_all('tr')[1:]  # Skip header row
+            rows = table_rows[1:]  # Skip header row
             
             data = []
-            for row in rows:
-                cells = row.find_all('td')
+            for cells in rows:
                 if len(cells) >= 4:
                     # Extract team info from first cell
-                    team_cell = cells[0]
-                    team_text = team_cell.get_text(strip=True)
+                    team_text = cells[0]
                     
                     # Extract full team name from text (e.g., "1.Baltimore Ravens" -> "Baltimore Ravens")
                     # The text format is "1.Baltimore Ravens" so we need to extract the full team name
@@ -88,13 +70,13 @@ class SumerSportsScraper:
                         if standard_abbr:
                             try:
                                 # Extract EPA/Play from third column (index 2)
-                                epa_per_play = float(cells[2].get_text(strip=True))
+                                epa_per_play = float(cells[2])
                                 
                                 # Extract Total EPA from fourth column (index 3)
-                                total_epa = float(cells[3].get_text(strip=True))
+                                total_epa = float(cells[3])
                                 
                                 # Extract Success % from fifth column (index 4)
-                                success_pct = float(cells[4].get_text(strip=True).replace('%', ''))
+                                success_pct = float(cells[4].replace('%', ''))
                                 
                                 data.append({
                                     'team': standard_abbr,
@@ -121,33 +103,30 @@ class SumerSportsScraper:
             print(f"❌ Error scraping offensive EPA: {e}")
             return None
     
-    def scrape_defensive_epa(self) -> Optional[pd.DataFrame]:
+    def scrape_defensive_epa(self, content: Optional[bytes] = None) -> Optional[pd.DataFrame]:
         """Scrape defensive EPA data from SumerSports"""
         try:
             print("Scraping defensive EPA data from SumerSports...")
             
-            url = "https://sumersports.com/teams/defensive/"
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            if content is None:
+                result = self.fetcher.get(self.pages['defensive'])
+                result.raise_for_status()
+                content = result.content
             
-            # Find the main data table
-            table = soup.find('table', class_='w-full')
+            # Cell text of the main data table (fast parsing backend, see html_tables.py)
+            table_rows = extract_table_rows(content, table_class='w-full', backend=self.html_backend)
             
-            if not table:
+            if table_rows is None:
                 print("❌ No table found on defensive page")
                 return None
             
-            rows = table.find_all('tr')[1:]  # Skip header row
+            rows = table_rows[1:]  # Skip header row
             
             data = []
-            for row in rows:
-                cells = row.find_all('td')
+            for cells in rows:
                 if len(cells) >= 4:
                     # Extract team info from first cell
-                    team_cell = cells[0]
-                    team_text = team_cell.get_text(strip=True)
+                    team_text = cells[0]
                     
                     # Extract full team name from text
                     team_match = re.search(r'\d+\.(.+)', team_text)
@@ -159,13 +138,13 @@ class SumerSportsScraper:
                         if standard_abbr:
                             try:
                                 # Extract EPA/Play from third column (index 2) - defensive EPA allowed
-                                epa_per_play = float(cells[2].get_text(strip=True))
+                                epa_per_play = float(cells[2])
                                 
                                 # Extract Total EPA from fourth column (index 3)
-                                total_epa = float(cells[3].get_text(strip=True))
+                                total_epa = float(cells[3])
                                 
                                 # Extract Success % from fifth column (index 4)
-                                success_pct = float(cells[4].get_text(strip=True).replace('%', ''))
+                                success_pct = float(cells[4].replace('%', ''))
                                 
                                 data.append({
                                     'team': standard_abbr,
@@ -221,12 +200,14 @@ class SumerSportsScraper:
         
         print("=== SumerSports EPA Scraper ===")
         
-        # Scrape offensive data
-        off_data = self.scrape_offensive_epa()
-        time.sleep(2)  # Be respectful
+        # Both pages are fetched concurrently within the per-host rate limit
+        return self.parse_pages(fetch_pages(self, self.fetcher))
+    
+    def parse_pages(self, pages: Dict[str, Optional[bytes]]) -> pd.DataFrame:
+        """Parse fetched offensive/defensive pages into one table"""
         
-        # Scrape defensive data
-        def_data = self.scrape_defensive_epa()
+        off_data = self.scrape_offensive_epa(pages['offensive']) if pages.get('offensive') else None
+        def_data = self.scrape_defensive_epa(pages['defensive']) if pages.get('defensive') else None
         
         if off_data is not None and def_data is not None:
             # Combine the data
@@ -237,25 +218,18 @@ class SumerSportsScraper:
             return pd.DataFrame()
     
     def save_epa_data(self, df: pd.DataFrame, filename: str = "sumersports_epa_data.csv"):
-        """Save EPA data to multiple formats"""
+        """Append EPA data to the snapshot store and write the latest CSV"""
         
         if df.empty:
             print("❌ No data to save")
             return
         
-        # Save as CSV
+        # Versioned snapshot; point-in-time history lives in the store (epa_snapshot_store.py)
+        append_snapshot(df, source='sumersports', scraped_at=df['last_updated'].iloc[0])
+        
+        # Latest table as CSV for the model scripts that read it
         df.to_csv(filename, index=False)
         print(f"✅ Saved EPA data to {filename}")
-        
-        # Save as JSON
-        json_filename = filename.replace('.csv', '.json')
-        df.to_json(json_filename, orient='records', indent=2, date_format='iso')
-        print(f"✅ Saved EPA data to {json_filename}")
-        
-        # Save as Parquet
-        parquet_filename = filename.replace('.csv', '.parquet')
-        df.to_parquet(parquet_filename, index=False)
-        print(f"✅ Saved EPA data to {parquet_filename}")
     
     def display_summary(self, df: pd.DataFrame):
         """Display summary of scraped EPA data"""
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Incremental team-game feature store for the starter cover model.
+
+Instead of rebuilding build_team_game_rows -> join_schedule -> add_rolling_features
+for every season on each run, completed games are stored once and each refresh only
+processes games that are not in the store yet.
+
+Layout (parquet, partitioned by season/week):
+    base/season=YYYY/week=WW/part-*.parquet       # join_schedule rows (no rolling features)
+    features/season=YYYY/week=WW/features.parquet # rows with rolling + opponent rolling features
+
+Refresh (update):
+1. Find completed schedule games whose game_id is not in the base store.
+2. Read PBP for just those games (game_id filter pushed into the parquet scan),
+   build their team-game rows and append them to base/.
+3. Recompute rolling windows only for the (team, season) pairs that got new games,
+   and rewrite only the feature partitions from each pair's first new game onward,
+   together with the opponent rows of those games (their opp_* columns).
+   Earlier rows cannot change because rolling features only look at prior games.
+
+Usage:
+    python3 scripts/team_game_store.py 2023 2024   # refresh the store for these seasons
+"""
+
+import glob
+import os
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from nfl_cover_model_starter import (
+    PBP_COLUMNS,
+    ROLLING_FEATURE_COLS,
+    build_team_game_rows,
+    join_schedule,
+)
+from rolling_engine import compute_rolling_features
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STORE_DIR = os.environ.get("NFL_FEATURE_STORE_DIR", os.path.join(REPO_ROOT, "data", "team_game_store"))
+
+KEY_COLS = ["game_id", "team"]
+
+
+def _normalize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Give every partition the same column types so parquet parts concatenate cleanly."""
+    df = df.copy()
+    for col in df.columns:
+        if col in ("season", "week", "is_home"):
+            df[col] = df[col].astype("int64")
+        elif col == "game_date":
+            df[col] = pd.to_datetime(df[col])
+        elif pd.api.types.is_bool_dtype(df[col]) or pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype("float64")
+    return df
+
+
+class TeamGameFeatureStore:
+    """Append-only store of team-game rows with incrementally maintained rolling features."""
+
+    def __init__(self, root: Optional[str] = None, windows: Tuple[int, ...] = (3, 5)):
+        self.root = root or DEFAULT_STORE_DIR
+        self.windows = tuple(windows)
+        self.base_dir = os.path.join(self.root, "base")
+        self.features_dir = os.path.join(self.root, "features")
+        os.makedirs(self.base_dir, exist_ok=True)
+        os.makedirs(self.features_dir, exist_ok=True)
+
+    # -----------------------------
+    # Partition helpers
+    # -----------------------------
+
+    @staticmethod
+    def _partition(base: str, season: int, week: Optional[int] = None) -> str:
+        path = os.path.join(base, f"season={int(season)}")
+        if week is not None:
+            path = os.path.join(path, f"week={int(week):02d}")
+        return path
+
+    def _files(self, base: str, seasons: Optional[List[int]] = None) -> List[str]:
+        if seasons is None:
+            return sorted(glob.glob(os.path.join(base, "season=*", "week=*", "*.parquet")))
+        files = []
+        for season in seasons:
+            files.extend(glob.glob(os.path.join(self._partition(base, season), "week=*", "*.parquet")))
+        return sorted(files)
+
+    @staticmethod
+    def _read(files: List[str], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        if not files:
+            return pd.DataFrame(columns=columns or [])
+        return pd.concat([pd.read_parquet(f, columns=columns) for f in files], ignore_index=True)
+
+    def stored_game_ids(self) -> set:
+        """game_ids already present in the base store (reads only the game_id column)."""
+        return set(self._read(self._files(self.base_dir), columns=["game_id"])["game_id"])
+
+    def load_base(self, seasons: Optional[List[int]] = None) -> pd.DataFrame:
+        return self._read(self._files(self.base_dir, seasons))
+
+    def load(self, seasons: Optional[List[int]] = None) -> pd.DataFrame:
+        """Return stored team-game rows with rolling features (same shape as add_rolling_features)."""
+        df = self._read(self._files(self.features_dir, seasons))
+        if len(df):
+            df = df.sort_values(["team", "season", "game_date"]).reset_index(drop=True)
+        return df
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+
+    def _append_base(self, rows: pd.DataFrame) -> None:
+        rows = _normalize_dtypes(rows)
+        for (season, week), part in rows.groupby(["season", "week"]):
+            directory = self._partition(self.base_dir, season, week)
+            os.makedirs(directory, exist_ok=True)
+            part.to_parquet(os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet"), index=False)
+
+    def _write_features(self, rows: pd.DataFrame) -> int:
+        """Replace (game_id, team) rows in the affected feature partitions; returns partitions written."""
+        rows = _normalize_dtypes(rows)
+        written = 0
+        for (season, week), part in rows.groupby(["season", "week"]):
+            directory = self._partition(self.features_dir, season, week)
+            path = os.path.join(directory, "features.parquet")
+            if os.path.exists(path):
+                existing = pd.read_parquet(path)
+                replaced = existing.set_index(KEY_COLS).index.isin(part.set_index(KEY_COLS).index)
+                part = pd.concat([existing[~replaced], part], ignore_index=True)
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = path + ".tmp"
+            part.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            written += 1
+        return written
+
+    # -----------------------------
+    # Refresh
+    # -----------------------------
+
+    def _recompute_features(self, new_rows: pd.DataFrame) -> pd.DataFrame:
+        """Rolling features for every team-season touched by `new_rows`, from its first new game on."""
+        affected = new_rows[["team", "season"]].drop_duplicates()
+        history = self.load_base(sorted(affected["season"].unique()))
+        history = history.merge(affected, on=["team", "season"], how="inner")
+
+        history = history.sort_values(["team", "season", "game_date"]).reset_index(drop=True)
+        own = compute_rolling_features(history, ROLLING_FEATURE_COLS, windows=self.windows)
+        roll_cols = list(own.columns)
+        rolled = pd.concat([history, own], axis=1)
+
+        # Rows before a team-season's first new game only look at older games, so they are unchanged
+        first_new = new_rows.groupby(["team", "season"])["game_date"].min().rename("first_new_date").reset_index()
+        rolled = rolled.merge(first_new, on=["team", "season"], how="left")
+        changed = rolled[rolled["game_date"] >= rolled["first_new_date"]].drop(columns=["first_new_date"])
+
+        # Opponent rolling features: look up the opponent's own row for the same game,
+        # preferring freshly recomputed rows over stored ones.
+        stored = self.load(sorted(changed["season"].unique()))
+        stored = stored[stored["game_id"].isin(changed["game_id"])] if len(stored) else stored
+        lookup = changed[KEY_COLS + roll_cols]
+        if len(stored):
+            lookup = pd.concat([lookup, stored[KEY_COLS + roll_cols]], ignore_index=True).drop_duplicates(KEY_COLS, keep="first")
+        opp_cols = {c: f"opp_{c}" for c in roll_cols}
+        opp = lookup.rename(columns={"team": "opp", **opp_cols})
+
+        # The other side of every changed game carries our rolling values in its opp_* columns,
+        # so its stored row is rewritten too (its own features are unchanged).
+        if len(stored):
+            changed_keys = pd.MultiIndex.from_frame(changed[KEY_COLS])
+            other_side = pd.MultiIndex.from_frame(changed[["game_id", "opp"]])
+            stored_keys = pd.MultiIndex.from_frame(stored[KEY_COLS])
+            opponents = stored[stored_keys.isin(other_side) & ~stored_keys.isin(changed_keys)]
+            opponents = opponents.drop(columns=[c for c in opp_cols.values() if c in opponents.columns])
+            changed = pd.concat([changed, opponents], ignore_index=True)
+        return changed.merge(opp, on=["game_id", "opp"], how="left")
+
+    def update(self, sched: pd.DataFrame, pbp: Optional[pd.DataFrame] = None) -> dict:
+        """
+        Add newly completed games from `sched` and refresh rolling features for affected teams.
+
+        If `pbp` is None, play-by-play is read through the PBP cache for just the new games.
+        Returns a small summary dict (new games, affected team-seasons, partitions written, seconds).
+        """
+        start = time.perf_counter()
+        completed = sched.dropna(subset=["home_score", "away_score"])
+        new_ids = sorted(set(completed["game_id"]) - self.stored_game_ids())
+        summary = {"new_games": len(new_ids), "affected_team_seasons": 0, "partitions_written": 0}
+        if not new_ids:
+            summary["seconds"] = round(time.perf_counter() - start, 3)
+            print("Feature store up to date; no new completed games")
+            return summary
+
+        new_sched = completed[completed["game_id"].isin(new_ids)]
+        if pbp is None:
+            from pbp_cache import read_pbp
+
+            pbp = read_pbp(
+                sorted(new_sched["season"].unique()),
+                columns=PBP_COLUMNS,
+                filters={"season_type": ["REG", "POST"], "game_id": new_ids},
+            )
+        else:
+            pbp = pbp[pbp["game_id"].isin(new_ids)]
+
+        team_game = build_team_game_rows(pbp)
+        new_rows = join_schedule(team_game, new_sched)
+        if not len(new_rows):
+            summary["seconds"] = round(time.perf_counter() - start, 3)
+            print(f"WARNING: no play-by-play found for {len(new_ids)} new games; nothing stored")
+            return summary
+
+        self._append_base(new_rows)
+        features = self._recompute_features(_normalize_dtypes(new_rows))
+        summary["affected_team_seasons"] = int(new_rows[["team", "season"]].drop_duplicates().shape[0])
+        summary["partitions_written"] = self._write_features(features)
+        summary["seconds"] = round(time.perf_counter() - start, 3)
+        print(
+            f"Feature store: +{summary['new_games']} games, "
+            f"{summary['affected_team_seasons']} team-seasons recomputed, "
+            f"{summary['partitions_written']} partitions written in {summary['seconds']}s"
+        )
+        return summary
+
+
+def main():
+    import sys
+
+    from nfl_cover_model_starter import SEASONS, load_schedule_with_lines
+
+    seasons = [int(a) for a in sys.argv[1:]] or SEASONS
+    store = TeamGameFeatureStore()
+    store.update(load_schedule_with_lines(seasons))
+    print(f"Stored rows: {len(store.load(seasons))}")
+
+
+if __name__ == "__main__":
+    main()
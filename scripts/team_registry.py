@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Canonical team identities shared by the scrapers, models and analyzers.
+
+Every team has a fixed integer id (its position in TEAM_ABBRS, sorted by
+nflverse abbreviation), and every spelling the repo's inputs use resolves to
+it: nflverse / sportsbook abbreviations ('LA', 'LAR'), nicknames ('Rams'),
+full names ('Los Angeles Rams') and relocated or renamed franchises
+('STL', 'St. Louis Rams', 'OAK', 'SD', 'Washington Redskins').
+
+Lookups work on the distinct values of a column only (pd.factorize) and
+return int8 ids or a categorical with TEAM_DTYPE, whose codes are the team
+ids. Joins across odds, EPA and PBP tables can then index a (32, k) array by
+team id instead of merging on object strings; see team_table()/take_by_team().
+
+Usage:
+    from team_registry import normalize_team, team_ids, to_team_categorical
+    odds["favorite_abbr"] = normalize_team(odds["favorite_team"])
+    ids = team_ids(odds["underdog_team"])          # int8, -1 when unknown
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# (nflverse abbreviation, nickname, full name), sorted by abbreviation; the
+# position in this list is the team id and must never be reordered.
+TEAMS = [
+    ('ARI', 'Cardinals', 'Arizona Cardinals'),
+    ('ATL', 'Falcons', 'Atlanta Falcons'),
+    ('BAL', 'Ravens', 'Baltimore Ravens'),
+    ('BUF', 'Bills', 'Buffalo Bills'),
+    ('CAR', 'Panthers', 'Carolina Panthers'),
+    ('CHI', 'Bears', 'Chicago Bears'),
+    ('CIN', 'Bengals', 'Cincinnati Bengals'),
+    ('CLE', 'Browns', 'Cleveland Browns'),
+    ('DAL', 'Cowboys', 'Dallas Cowboys'),
+    ('DEN', 'Broncos', 'Denver Broncos'),
+    ('DET', 'Lions', 'Detroit Lions'),
+    ('GB', 'Packers', 'Green Bay Packers'),
+    ('HOU', 'Texans', 'Houston Texans'),
+    ('IND', 'Colts', 'Indianapolis Colts'),
+    ('JAX', 'Jaguars', 'Jacksonville Jaguars'),
+    ('KC', 'Chiefs', 'Kansas City Chiefs'),
+    ('LA', 'Rams', 'Los Angeles Rams'),
+    ('LAC', 'Chargers', 'Los Angeles Chargers'),
+    ('LV', 'Raiders', 'Las Vegas Raiders'),
+    ('MIA', 'Dolphins', 'Miami Dolphins'),
+    ('MIN', 'Vikings', 'Minnesota Vikings'),
+    ('NE', 'Patriots', 'New England Patriots'),
+    ('NO', 'Saints', 'New Orleans Saints'),
+    ('NYG', 'Giants', 'New York Giants'),
+    ('NYJ', 'Jets', 'New York Jets'),
+    ('PHI', 'Eagles', 'Philadelphia Eagles'),
+    ('PIT', 'Steelers', 'Pittsburgh Steelers'),
+    ('SEA', 'Seahawks', 'Seattle Seahawks'),
+    ('SF', '49ers', 'San Francisco 49ers'),
+    ('TB', 'Buccaneers', 'Tampa Bay Buccaneers'),
+    ('TEN', 'Titans', 'Tennessee Titans'),
+    ('WAS', 'Commanders', 'Washington Commanders'),
+]
+
+TEAM_ABBRS: List[str] = [abbr for abbr, _, _ in TEAMS]
+TEAM_IDS: Dict[str, int] = {abbr: i for i, abbr in enumerate(TEAM_ABBRS)}
+NICKNAME_TO_ABBR: Dict[str, str] = {nickname: abbr for abbr, nickname, _ in TEAMS}
+FULL_NAME_TO_ABBR: Dict[str, str] = {full: abbr for abbr, _, full in TEAMS}
+ABBR_TO_NICKNAME: Dict[str, str] = {abbr: nickname for abbr, nickname, _ in TEAMS}
+ABBR_TO_FULL_NAME: Dict[str, str] = {abbr: full for abbr, _, full in TEAMS}
+
+# Categorical encoder: codes are the team ids
+TEAM_DTYPE = pd.CategoricalDtype(TEAM_ABBRS)
+
+# Other spellings -> nflverse abbreviation (sportsbooks, Pro Football Reference,
+# pre-relocation franchises and former names)
+ALIASES: Dict[str, str] = {
+    'LAR': 'LA', 'STL': 'LA', 'RAM': 'LA', 'St. Louis Rams': 'LA',
+    'SD': 'LAC', 'SDG': 'LAC', 'San Diego Chargers': 'LAC',
+    'OAK': 'LV', 'LVR': 'LV', 'RAI': 'LV', 'Oakland Raiders': 'LV',
+    'WSH': 'WAS', 'Redskins': 'WAS', 'Washington Redskins': 'WAS',
+    'Football Team': 'WAS', 'Washington Football Team': 'WAS', 'Washington': 'WAS',
+    'JAC': 'JAX', 'GNB': 'GB', 'KAN': 'KC', 'NWE': 'NE', 'NOR': 'NO', 'SFO': 'SF',
+    'TAM': 'TB', 'CRD': 'ARI', 'RAV': 'BAL', 'CLT': 'IND', 'HTX': 'HOU', 'OTI': 'TEN',
+}
+
+# Every known spelling, upper-cased, -> abbreviation
+_LOOKUP: Dict[str, str] = {}
+for _abbr, _nickname, _full in TEAMS:
+    for _name in (_abbr, _nickname, _full):
+        _LOOKUP[_name.upper()] = _abbr
+for _name, _abbr in ALIASES.items():
+    _LOOKUP[_name.upper()] = _abbr
+
+
+def resolve_team(name) -> Optional[str]:
+    """nflverse abbreviation for one spelling of a team, or None if unknown."""
+    if name is None or (isinstance(name, float) and np.isnan(name)):
+        return None
+    text = " ".join(str(name).split()).upper()
+    if text in _LOOKUP:
+        return _LOOKUP[text]
+    # "Los Angeles Rams (2-3)" / "Rams 24" style strings: try the words one by one
+    for word in text.replace("(", " ").split():
+        if word in _LOOKUP and len(word) > 3:
+            return _LOOKUP[word]
+    return None
+
+
+def normalize_team(values, keep_unknown: bool = True) -> pd.Series:
+    """
+    nflverse abbreviations for a column of team spellings.
+
+    Unknown values are passed through unchanged (or become None with
+    keep_unknown=False). Each distinct value is resolved once.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    codes, uniques = pd.factorize(series)
+    resolved = [resolve_team(u) for u in uniques]
+    if keep_unknown:
+        resolved = [r if r is not None else u for r, u in zip(resolved, uniques)]
+    lookup = np.array(resolved + [None], dtype=object)
+    return pd.Series(lookup.take(codes), index=series.index)
+
+
+def team_ids(values) -> np.ndarray:
+    """int8 team ids for a column of team spellings (-1 when unknown or missing)."""
+    series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    codes, uniques = pd.factorize(series)
+    ids = np.array([TEAM_IDS.get(resolve_team(u), -1) for u in uniques] + [-1], dtype=np.int8)
+    return ids.take(codes)
+
+
+def to_team_categorical(values) -> pd.Series:
+    """Categorical (TEAM_DTYPE) team column; categories are TEAM_ABBRS and codes the team ids."""
+    series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    return pd.Series(pd.Categorical.from_codes(team_ids(series), dtype=TEAM_DTYPE), index=series.index)
+
+
+def encode_teams(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+    """Copy of `df` with the given team columns converted to TEAM_DTYPE categoricals."""
+    out = df.copy()
+    for col in columns:
+        out[col] = to_team_categorical(out[col])
+    return out
+
+
+def team_table(df: pd.DataFrame, value_cols: Sequence[str], team_col: str = "team") -> np.ndarray:
+    """
+    (33, k) float array of `value_cols` indexed by team id.
+
+    Row 32 is all-NaN, so take_by_team() maps unknown ids (-1) to NaN. The first
+    row per team wins when `df` has duplicates.
+    """
+    table = np.full((len(TEAM_ABBRS) + 1, len(value_cols)), np.nan)
+    ids = team_ids(df[team_col])
+    values = df[list(value_cols)].to_numpy(dtype="float64")
+    keep = ids >= 0
+    ids, values = ids[keep], values[keep]
+    _, first = np.unique(ids, return_index=True)
+    table[ids[first]] = values[first]
+    return table
+
+
+def take_by_team(table: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """Rows of a team_table() for an array of team ids (-1 -> NaN row)."""
+    return table[np.where(ids < 0, len(TEAM_ABBRS), ids)]
+
+
+if __name__ == "__main__":
+    print(pd.DataFrame(TEAMS, columns=["abbr", "nickname", "full_name"]).rename_axis("team_id").to_string())
+    print(f"\n{len(ALIASES)} aliases: {', '.join(sorted(ALIASES))}")
@@ -7,6 +7,8 @@ Last Updated: October 7, 2025 from SumerSports.com
 import pandas as pd
 from datetime import datetime
 
+from epa_snapshot_store import append_snapshot
+
 def create_updated_epa_data():
     """Create updated EPA data from SumerSports (as of 10-07-2025)"""
     
@@ -119,6 +121,7 @@ def create_updated_epa_data():
     output_file = 'detailed_epa_data.csv'
     df.to_csv(output_file, index=False)
     print(f"✅ Updated EPA data saved to {output_file}")
+    append_snapshot(df, source='sumersports_detailed', scraped_at=df['last_updated'].iloc[0])
     
     # Print summary
     print(f"\n📊 Summary:")
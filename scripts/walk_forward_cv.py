@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Walk-forward cross-validation for the starter logistic cover model.
+
+train_and_evaluate() scores one season split; this harness replays the
+season the way the model would actually be used: for every week k of a test
+season, fit on all rows before it (earlier seasons plus weeks < k) and predict
+week k. Nothing from week k or later leaks into a fold:
+
+- Median imputation and standardization use training rows only (the
+  finalize_training_table() medians are computed over the whole table).
+- Pushes are excluded from both training and scoring, as in the starter.
+
+Each test season is one chain of weekly folds. Within a chain the logistic
+regression is warm-started from the previous week's coefficients, so each
+refit only moves the solution by one week of data. Chains run in parallel in
+a process pool (one season per worker).
+
+Per fold: log loss, Brier score, ATS accuracy at 0.5, row counts and solver
+iterations. Rows come from the team-game feature store (team_game_store.py),
+with the same feature set as the starter: is_home, team_line, total_line and
+every rolling / EWM feature.
+
+Usage:
+    python3 scripts/walk_forward_cv.py --seasons 2021-2024               # test 2022-2024
+    python3 scripts/walk_forward_cv.py --seasons 2021-2024 --underdogs --workers 3
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import brier_score_loss, log_loss
+
+from nfl_cover_model_starter import is_rolling_feature
+
+BASE_FEATURES = ["is_home", "team_line", "total_line"]
+Y_COL = "cover_label"
+
+
+def cv_feature_columns(df: pd.DataFrame) -> List[str]:
+    """Starter feature set: base columns plus every rolling/EWM form feature."""
+    return [c for c in BASE_FEATURES if c in df.columns] + [c for c in df.columns if is_rolling_feature(c)]
+
+
+def prepare_cv_table(df: pd.DataFrame, underdogs_only: bool = False) -> pd.DataFrame:
+    """Labeled, push-free team-game rows (underdog rows only with underdogs_only, like create_underdog_model)."""
+    out = df[(df["push"] == 0) & df[Y_COL].notna() & df["team_line"].notna()]
+    if underdogs_only:
+        out = out[out["team_line"] > 0]
+    return out.sort_values(["season", "week"]).reset_index(drop=True)
+
+
+def _fit_predict(
+    clf: LogisticRegression, train: pd.DataFrame, test: pd.DataFrame, x_cols: List[str]
+) -> Tuple[np.ndarray, int]:
+    """Impute and scale with training statistics only, fit (warm if clf allows) and predict."""
+    x_train = train[x_cols].to_numpy(dtype="float64")
+    x_test = test[x_cols].to_numpy(dtype="float64")
+    medians = np.nanmedian(x_train, axis=0)
+    medians = np.where(np.isnan(medians), 0.0, medians)
+    x_train = np.where(np.isnan(x_train), medians, x_train)
+    x_test = np.where(np.isnan(x_test), medians, x_test)
+    mean = x_train.mean(axis=0)
+    std = x_train.std(axis=0)
+    std = np.where(std > 0, std, 1.0)
+
+    clf.fit((x_train - mean) / std, train[Y_COL].to_numpy(dtype=int))
+    probs = clf.predict_proba((x_test - mean) / std)[:, 1]
+    return probs, int(np.max(clf.n_iter_))
+
+
+def run_season_folds(
+    df: pd.DataFrame,
+    season: int,
+    x_cols: Optional[List[str]] = None,
+    min_week: int = 2,
+    warm_start: bool = True,
+    C: float = 1.0,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Weekly folds for one test season.
+
+    Returns (folds, predictions): one metrics row per week and the out-of-sample
+    probability for every scored row.
+    """
+    x_cols = x_cols or cv_feature_columns(df)
+    clf = LogisticRegression(C=C, max_iter=2000, warm_start=warm_start)
+    folds, predictions = [], []
+    for week in sorted(df.loc[df["season"] == season, "week"].unique()):
+        if week < min_week:
+            continue
+        before = (df["season"] < season) | ((df["season"] == season) & (df["week"] < week))
+        train = df[before]
+        test = df[(df["season"] == season) & (df["week"] == week)]
+        if train[Y_COL].nunique() < 2 or test.empty:
+            continue
+
+        start = time.perf_counter()
+        probs, n_iter = _fit_predict(clf, train, test, x_cols)
+        y = test[Y_COL].to_numpy(dtype=int)
+        folds.append({
+            "season": season,
+            "week": int(week),
+            "n_train": len(train),
+            "n_test": len(test),
+            "log_loss": log_loss(y, probs, labels=[0, 1]),
+            "brier": brier_score_loss(y, probs),
+            "ats_accuracy": float(((probs >= 0.5) == y).mean()),
+            "n_iter": n_iter,
+            "seconds": round(time.perf_counter() - start, 3),
+        })
+        predictions.append(test[["season", "week", "game_id", "team", "opp", "team_line", Y_COL]].assign(pred=probs))
+
+    folds = pd.DataFrame(folds)
+    predictions = pd.concat(predictions, ignore_index=True) if predictions else pd.DataFrame()
+    return folds, predictions
+
+
+def _season_job(args):
+    df, season, x_cols, min_week, warm_start, C = args
+    return run_season_folds(df, season, x_cols, min_week=min_week, warm_start=warm_start, C=C)
+
+
+def walk_forward_cv(
+    df: pd.DataFrame,
+    test_seasons: Optional[Sequence[int]] = None,
+    underdogs_only: bool = False,
+    min_week: int = 2,
+    warm_start: bool = True,
+    C: float = 1.0,
+    workers: Optional[int] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Walk-forward CV over `test_seasons` (default: every season after the first).
+
+    `df` is add_rolling_features() / TeamGameFeatureStore.load() output.
+    Returns (folds, predictions) across all test seasons.
+    """
+    table = prepare_cv_table(df, underdogs_only)
+    seasons = sorted(table["season"].unique())
+    test_seasons = sorted(test_seasons) if test_seasons is not None else seasons[1:]
+    x_cols = cv_feature_columns(table)
+    # Each worker only needs the rows up to and including its test season
+    jobs = [(table[table["season"] <= s], s, x_cols, min_week, warm_start, C) for s in test_seasons]
+    if not jobs:
+        raise ValueError("Need at least two seasons (one to train on, one to test)")
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+
+    if workers <= 1:
+        results = [_season_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_season_job, jobs))
+
+    folds = pd.concat([f for f, _ in results], ignore_index=True)
+    predictions = pd.concat([p for _, p in results if len(p)], ignore_index=True)
+    return folds, predictions
+
+
+def summarize(predictions: pd.DataFrame) -> pd.DataFrame:
+    """Pooled out-of-sample metrics per test season and overall."""
+    def metrics(group: pd.DataFrame) -> pd.Series:
+        y = group[Y_COL].to_numpy(dtype=int)
+        p = group["pred"].to_numpy()
+        return pd.Series({
+            "rows": len(group),
+            "log_loss": log_loss(y, p, labels=[0, 1]),
+            "brier": brier_score_loss(y, p),
+            "ats_accuracy": float(((p >= 0.5) == y).mean()),
+        })
+
+    by_season = pd.DataFrame({season: metrics(g) for season, g in predictions.groupby("season")}).T
+    by_season.loc["all"] = metrics(predictions)
+    return by_season.rename_axis("season").reset_index()
+
+
+def _parse_seasons(spec: str) -> List[int]:
+    seasons = []
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        seasons.extend(range(int(first), int(last or first) + 1))
+    return seasons
+
+
+def main():
+    from team_game_store import TeamGameFeatureStore
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", default="2023-2024", help="seasons to load from the feature store")
+    parser.add_argument("--test-seasons", help="seasons to walk forward through (default: all but the first)")
+    parser.add_argument("--underdogs", action="store_true", help="underdog rows only (team_line > 0)")
+    parser.add_argument("--min-week", type=int, default=2)
+    parser.add_argument("--C", type=float, default=1.0, help="inverse regularization strength")
+    parser.add_argument("--no-warm-start", action="store_true")
+    parser.add_argument("--workers", type=int, help="process pool size (default: one per test season, up to CPU count)")
+    parser.add_argument("--output", help="write out-of-sample predictions to this CSV")
+    args = parser.parse_args()
+
+    seasons = _parse_seasons(args.seasons)
+    df = TeamGameFeatureStore(windows=(3, 5)).load(seasons)
+    if df.empty:
+        print(f"❌ No feature store rows for {seasons} (run: python3 scripts/team_game_store.py {' '.join(map(str, seasons))})")
+        return
+
+    start = time.perf_counter()
+    folds, predictions = walk_forward_cv(
+        df,
+        test_seasons=_parse_seasons(args.test_seasons) if args.test_seasons else None,
+        underdogs_only=args.underdogs,
+        min_week=args.min_week,
+        warm_start=not args.no_warm_start,
+        C=args.C,
+        workers=args.workers,
+    )
+    print(f"=== Walk-forward folds ({len(folds)} weeks) ===")
+    print(folds.round(4).to_string(index=False))
+    print(f"\n=== Out-of-sample summary ({time.perf_counter() - start:.1f}s) ===")
+    print(summarize(predictions).round(4).to_string(index=False))
+    if args.output:
+        predictions.to_csv(args.output, index=False)
+        print(f"✅ Saved {len(predictions)} out-of-sample predictions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Scrapers against fixture_server.py: plain fetch, 304 revalidation and offline replay.
+
+The fixtures under tests/fixtures are synthetic SumerSports pages
+(benchmark_html_parsing.synthetic_page) in fixture_server.py's layout.
+"""
+
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPO_ROOT, "scripts"))
+
+from async_fetch import AsyncFetcher, run_scrapers
+from detailed_epa_scraper import DetailedEPAScraper
+from fixture_server import serve_fixtures
+from http_cache import ResponseCache
+from sumersports_scraper import SumerSportsScraper
+
+FIXTURES_DIR = os.path.join(REPO_ROOT, "tests", "fixtures")
+OFFENSIVE_URL = SumerSportsScraper.pages["offensive"]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with serve_fixtures(FIXTURES_DIR) as (base_url, request_log):
+        monkeypatch.setenv("NFL_SCRAPER_BASE_URL", base_url)
+        yield base_url, request_log
+
+
+def make_fetcher(cache_dir, **cache_kwargs):
+    # host_overrides come from NFL_SCRAPER_BASE_URL, like every standalone scraper
+    return AsyncFetcher(rate_per_host=100, backoff=0.01, cache=ResponseCache(cache_dir, **cache_kwargs))
+
+
+def scrape(fetcher):
+    return run_scrapers([SumerSportsScraper(fetcher), DetailedEPAScraper(fetcher)], fetcher)
+
+
+def test_env_override_reaches_standalone_scrapers(server, tmp_path, monkeypatch):
+    base_url, _ = server
+    monkeypatch.setenv("NFL_HTTP_CACHE_DIR", str(tmp_path))
+    for scraper in (SumerSportsScraper(), DetailedEPAScraper()):
+        assert scraper.fetcher.resolve(OFFENSIVE_URL).startswith(base_url)
+
+
+def test_fetch_200(server, tmp_path):
+    _, request_log = server
+    parsed = scrape(make_fetcher(str(tmp_path)))
+
+    assert len(parsed["SumerSportsScraper"]) == 32
+    assert len(parsed["DetailedEPAScraper"]) == 32
+    # Both scrapers share the two pages; each is requested once, with the Referer
+    assert sorted(r["path"] for r in request_log) == ["/sumersports.com/teams/defensive/",
+                                                      "/sumersports.com/teams/offensive/"]
+    assert all(r["headers"].get("Referer") == "https://sumersports.com/" for r in request_log)
+
+
+def test_stale_cache_revalidates_with_304(server, tmp_path):
+    _, request_log = server
+    first = make_fetcher(str(tmp_path)).get(OFFENSIVE_URL)
+    assert first.status == 200
+
+    # ttl=0: every cached entry is stale and goes back to the server with its ETag
+    result = make_fetcher(str(tmp_path), ttl=0).get(OFFENSIVE_URL)
+    assert result.not_modified and result.status == 304
+    assert result.content == first.content
+    assert request_log[-1]["headers"].get("If-None-Match") == first.headers["ETag"]
+
+
+def test_304_without_stored_copy_is_an_error(server, tmp_path):
+    first = AsyncFetcher(rate_per_host=100, use_cache=False).get(OFFENSIVE_URL)
+
+    fetcher = AsyncFetcher(rate_per_host=100, use_cache=False)
+    fetcher.validators[OFFENSIVE_URL] = {"etag": first.headers["ETag"]}
+    result = fetcher.get(OFFENSIVE_URL)
+    assert result.status == 304
+    assert not result.ok and "304" in result.error
+
+
+def test_replay_serves_cache_without_network(server, tmp_path):
+    _, request_log = server
+    live = scrape(make_fetcher(str(tmp_path)))
+    requests_made = len(request_log)
+
+    replayed = scrape(make_fetcher(str(tmp_path), mode="replay"))
+    assert len(request_log) == requests_made
+    for name, df in live.items():
+        assert replayed[name].drop(columns="last_updated").equals(df.drop(columns="last_updated"))
+
+    missing = make_fetcher(str(tmp_path / "empty"), mode="replay").get(OFFENSIVE_URL)
+    assert not missing.ok
@@ -8,25 +8,27 @@ import numpy as np
 import os
 import sys
 
+# Shared data helpers live in scripts/
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models"))
+
+from pbp_cache import read_pbp
+from cover_evaluator import attach_results, team_key
+from team_registry import ABBR_TO_NICKNAME
+
+# Columns needed to extract final scores
+PBP_COLUMNS = ['game_id', 'season_type', 'week', 'away_team', 'home_team', 'away_score', 'home_score']
+
 def load_play_by_play_data():
     """Load the 2025 play-by-play data"""
     
     print("Loading play-by-play data from nflverse...")
     
     try:
-        # Load from URL to get latest data
-        import requests
-        import io
-        
-        url = "https://github.com/nflverse/nflverse-data/releases/download/pbp/play_by_play_2025.parquet"
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        df = pd.read_parquet(io.BytesIO(response.content))
+        # Revalidate against nflverse to get the latest data (served from the PBP cache when unchanged)
+        # Only the score columns are read, and the regular season filter is pushed into the scan
+        df = read_pbp([2025], columns=PBP_COLUMNS, filters={'season_type': 'REG'}, refresh=True)
         print(f"✅ Loaded {len(df)} plays from nflverse")
-        
-        # Filter to regular season only
-        df = df[df['season_type'] == 'REG'].copy()
         print(f"   Regular season plays: {len(df)}")
         print(f"   Weeks available: {sorted(df['week'].unique())}")
         
@@ -119,149 +121,50 @@ def analyze_model_performance(predictions, actual_results):
     
     print("\n=== Analyzing Model Performance ===")
     
-    # Team name mapping (from abbreviation to full name)
-    team_mapping = {
-        'ARI': 'Cardinals', 'ATL': 'Falcons', 'BAL': 'Ravens', 'BUF': 'Bills',
-        'CAR': 'Panthers', 'CHI': 'Bears', 'CIN': 'Bengals', 'CLE': 'Browns',
-        'DAL': 'Cowboys', 'DEN': 'Broncos', 'DET': 'Lions', 'GB': 'Packers',
-        'HOU': 'Texans', 'IND': 'Colts', 'JAX': 'Jaguars', 'KC': 'Chiefs',
-        'LA': 'Rams', 'LAC': 'Chargers', 'LV': 'Raiders', 'MIA': 'Dolphins',
-        'MIN': 'Vikings', 'NE': 'Patriots', 'NO': 'Saints', 'NYG': 'Giants',
-        'NYJ': 'Jets', 'PHI': 'Eagles', 'PIT': 'Steelers', 'SF': '49ers',
-        'SEA': 'Seahawks', 'TB': 'Buccaneers', 'TEN': 'Titans', 'WAS': 'Commanders'
-    }
-    
-    # Reverse mapping (full name to abbreviation) - handle both LA and LAR for Rams
-    name_to_abbrev = {v: k for k, v in team_mapping.items()}
-    
-    # For matching, we need to be flexible with Rams abbreviation
-    def find_team_abbrev(team_name, away_team, home_team):
-        """Find the matching team abbreviation"""
-        abbrev = name_to_abbrev.get(team_name)
-        if abbrev:
-            return abbrev
-        # Check if it matches either away or home by name
-        if team_mapping.get(away_team) == team_name:
-            return away_team
-        if team_mapping.get(home_team) == team_name:
-            return home_team
-        return None
-    
-    # Create a detailed results dataframe
-    results = []
-    
-    for _, pred_row in predictions.iterrows():
-        game = pred_row['Game']
-        favorite = pred_row['Favorite']
-        underdog = pred_row['Underdog']
-        spread = float(pred_row['Spread'])
-        
-        # Parse game string to get away and home team abbreviations
-        if ' @ ' in game:
-            away_abbrev, home_abbrev = game.split(' @ ')
-            
-            # Handle LAR -> LA mapping (predictions use LAR, data uses LA)
-            if away_abbrev == 'LAR':
-                away_abbrev = 'LA'
-            if home_abbrev == 'LAR':
-                home_abbrev = 'LA'
-            
-            # Convert abbreviations to full names for display
-            away_full = team_mapping.get(away_abbrev, away_abbrev)
-            home_full = team_mapping.get(home_abbrev, home_abbrev)
-            
-            # Try to find matching game in actual results
-            actual_game = None
-            for _, result_row in actual_results.iterrows():
-                if result_row['away_team'] == away_abbrev and result_row['home_team'] == home_abbrev:
-                    actual_game = result_row
-                    break
-            
-            if actual_game is None:
-                print(f"⚠️  Could not find game: {game}")
-                print(f"   Looking for: away={away_abbrev}, home={home_abbrev}")
-                continue
-            
-            away_score = int(actual_game['away_score'])
-            home_score = int(actual_game['home_score'])
-            
-            # Determine which team is favorite
-            if favorite == home_full:
-                favorite_score = home_score
-                underdog_score = away_score
-            else:
-                favorite_score = away_score
-                underdog_score = home_score
-            
-            # Determine actual cover result
-            actual_cover = determine_cover_result(
-                favorite_score, underdog_score, spread, favorite, home_full
-            )
-            
-            # Determine winner
-            if away_score > home_score:
-                actual_winner = away_full
-            elif home_score > away_score:
-                actual_winner = home_full
-            else:
-                actual_winner = "Tie"
-            
-            # Create final score string
-            final_score = f"{away_full} {away_score} - {home_full} {home_score}"
-            
-            # Check each model's prediction
-            result = {
-                'Game': game,
-                'Favorite': favorite,
-                'Underdog': underdog,
-                'Spread': spread,
-                'Total': pred_row['Total'],
-                'Final_Score': final_score,
-                'Actual_Cover': actual_cover,
-                'Actual_Winner': actual_winner
-            }
-            
-            # Helper function to compare predictions
-            # Both models and actual_cover are now from underdog perspective:
-            # "Cover" or "Yes" means underdog covered
-            # "No Cover" or "No" means favorite covered (underdog didn't cover)
-            def check_prediction(model_pred, actual_cover):
-                if model_pred == "Cover":
-                    return 1 if actual_cover == "Yes" else 0
-                elif model_pred == "No Cover":
-                    return 1 if actual_cover == "No" else 0
-                return 0
-            
-            # Model A
-            if 'Model_A_Pred' in pred_row:
-                result['Model_A_Pred'] = pred_row['Model_A_Pred']
-                result['Model_A_Conf'] = pred_row['Model_A_Conf']
-                result['Model_A_Prob'] = pred_row['Model_A_Prob']
-                result['Model_A_Correct'] = check_prediction(pred_row['Model_A_Pred'], actual_cover)
-            
-            # Model B
-            if 'Model_B_Pred' in pred_row:
-                result['Model_B_Pred'] = pred_row['Model_B_Pred']
-                result['Model_B_Conf'] = pred_row['Model_B_Conf']
-                result['Model_B_Prob'] = pred_row['Model_B_Prob']
-                result['Model_B_Correct'] = check_prediction(pred_row['Model_B_Pred'], actual_cover)
-            
-            # Model C
-            if 'Model_C_Pred' in pred_row:
-                result['Model_C_Pred'] = pred_row['Model_C_Pred']
-                result['Model_C_Conf'] = pred_row['Model_C_Conf']
-                result['Model_C_Prob'] = pred_row['Model_C_Prob']
-                result['Model_C_Correct'] = check_prediction(pred_row['Model_C_Pred'], actual_cover)
-            
-            # Model D
-            if 'Model_D_Pred' in pred_row:
-                result['Model_D_Pred'] = pred_row['Model_D_Pred']
-                result['Model_D_Conf'] = pred_row['Model_D_Conf']
-                result['Model_D_Correct'] = check_prediction(pred_row['Model_D_Pred'], actual_cover)
-            
-            results.append(result)
-    
-    results_df = pd.DataFrame(results)
+    # Team name mapping (from abbreviation to nickname)
+    team_mapping = ABBR_TO_NICKNAME
+    
+    # Join every prediction to its final score in one merge on normalized team keys
+    # (handles LAR -> LA and nickname/abbreviation differences; see models/cover_evaluator.py)
+    games = predictions[predictions['Game'].str.contains(' @ ', regex=False)].copy()
+    teams = games['Game'].str.split(' @ ', n=1, expand=True)
+    games['away_team'] = teams[0]
+    games['home_team'] = teams[1]
+    games['Spread'] = games['Spread'].astype(float)
+    evaluated = attach_results(games, actual_results)
+    
+    for game in evaluated.loc[~evaluated['matched'], 'Game']:
+        print(f"⚠️  Could not find game: {game}")
+    evaluated = evaluated[evaluated['matched']].reset_index(drop=True)
+    
+    away_full = team_key(evaluated['away_team']).map(team_mapping).fillna(evaluated['away_team'])
+    home_full = team_key(evaluated['home_team']).map(team_mapping).fillna(evaluated['home_team'])
+    away_score = evaluated['away_score'].astype(int)
+    home_score = evaluated['home_score'].astype(int)
+    
+    # Underdog perspective, as in determine_cover_result(): "Yes" unless the favorite
+    # won by more than the spread (a push counts as "Yes")
+    underdog_yes = (evaluated['underdog_margin'] + evaluated['Spread']) >= 0
+    
+    results_df = evaluated[['Game', 'Favorite', 'Underdog', 'Spread', 'Total']].copy()
+    results_df['Final_Score'] = (away_full + ' ' + away_score.astype(str) + ' - '
+                                 + home_full + ' ' + home_score.astype(str))
+    results_df['Actual_Cover'] = np.where(underdog_yes, 'Yes', 'No')
+    results_df['Actual_Winner'] = np.select(
+        [away_score > home_score, home_score > away_score], [away_full, home_full], default='Tie')
+    
+    # Both model picks and Actual_Cover are from the underdog perspective:
+    # "Cover" is correct when the underdog covered, "No Cover" when it didn't
+    for model in ['Model_A', 'Model_B', 'Model_C', 'Model_D']:
+        pred_col = f'{model}_Pred'
+        if pred_col not in evaluated.columns:
+            continue
+        for suffix in ('Pred', 'Conf', 'Prob'):
+            if f'{model}_{suffix}' in evaluated.columns:
+                results_df[f'{model}_{suffix}'] = evaluated[f'{model}_{suffix}']
+        pred = evaluated[pred_col]
+        correct = ((pred == 'Cover') & underdog_yes) | ((pred == 'No Cover') & ~underdog_yes)
+        results_df[f'{model}_Correct'] = correct.astype(int)
     
     # Save detailed results
     output_file = "week5/week5_model_predictions_vs_reality.csv"
@@ -6,6 +6,10 @@ Model A Week 7: SumerSports EPA Predictions
 import pandas as pd
 import numpy as np
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models"))
+from prediction_artifacts import write_predictions
 
 def run_model_a_week7():
     """Run Model A for Week 7 using SumerSports EPA data"""
@@ -146,6 +150,7 @@ def run_model_a_week7():
 
     # Save predictions
     week7_data.to_csv("model_a_week7_predictions.csv", index=False)
+    write_predictions(week7_data, week=7, model="A", source="week7/model_a_week7_predictions.csv")
     print(f"✅ Model A Week 7 predictions saved to: model_a_week7_predictions.csv")
 
     return week7_data
@@ -6,6 +6,10 @@ Model B v2 Week 7: Matchup-Specific EPA Predictions
 import pandas as pd
 import numpy as np
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models"))
+from prediction_artifacts import write_predictions
 
 def run_model_b_v2_week7():
     """Run Model B v2 for Week 7 using matchup-specific EPA analysis"""
@@ -168,6 +172,7 @@ def run_model_b_v2_week7():
 
     # Save predictions
     week7_data.to_csv("model_b_v2_week7_predictions.csv", index=False)
+    write_predictions(week7_data, week=7, model="B_v2", source="week7/model_b_v2_week7_predictions.csv")
     print(f"✅ Model B v2 Week 7 predictions saved to: model_b_v2_week7_predictions.csv")
 
     return week7_data
@@ -7,6 +7,10 @@ Based on Week 1-6 performance data
 import pandas as pd
 import numpy as np
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models"))
+from prediction_artifacts import write_predictions
 
 def run_model_c_week7():
     """Run Model C for Week 7 using spread-based rules with real ATS trends"""
@@ -153,6 +157,7 @@ def run_model_c_week7():
 
     # Save predictions
     week7_data.to_csv("model_c_week7_predictions.csv", index=False)
+    write_predictions(week7_data, week=7, model="C", source="week7/model_c_week7_predictions.csv")
     print(f"\n✅ Model C Week 7 predictions saved to: model_c_week7_predictions.csv")
 
     return week7_data
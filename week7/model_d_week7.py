@@ -6,6 +6,10 @@ Model D Week 7: Total Rules Predictions
 import pandas as pd
 import numpy as np
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models"))
+from prediction_artifacts import write_predictions
 
 def run_model_d_week7():
     """Run Model D for Week 7 using total-based rules"""
@@ -80,6 +84,7 @@ def run_model_d_week7():
 
     # Save predictions
     week7_data.to_csv("model_d_week7_predictions.csv", index=False)
+    write_predictions(week7_data, week=7, model="D", source="week7/model_d_week7_predictions.csv")
     print(f"\n✅ Model D Week 7 predictions saved to: model_d_week7_predictions.csv")
 
     return week7_data